@@ -0,0 +1,169 @@
+"""
+动态删种基准测试：对比 plan_delete 与原有按做种时间倒序删除的贪心方式
+
+每个快照记录一次触发动态删除阈值时，进入最后一步的候选种子（已完成、非H&R、托管）及需要释放的体积，
+并记录每个种子在随后 24 小时内实际产生的上传量（uploaded_next），以此作为独立于评分公式的损失上传：
+- 释放体积：实际释放体积相对目标体积的超出量，以及未达到目标体积的快照数
+- 损失上传：被删除种子在随后 24 小时内本可产生的上传量之和
+
+运行：python benchmarks/brushflow/benchmark_delete_planner.py [重复次数]
+重新生成快照：python benchmarks/brushflow/benchmark_delete_planner.py generate
+"""
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+# 直接导入插件目录中不依赖主程序的模块
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "plugins.v2", "brushflow"))
+
+from delete_planner import DeleteCandidate, plan_delete  # noqa: E402
+
+SNAPSHOTS_PATH = Path(__file__).parent / "fixtures" / "delete_snapshots"
+
+# 快照名 -> (候选种子数, 需要释放的体积占候选总体积的比例)
+_SNAPSHOT_SPECS = {
+    "small_range": (40, 0.5),
+    "medium_single": (200, 0.05),
+    "medium_range": (300, 0.3),
+    "large_single": (800, 0.02),
+    "large_range": (1000, 0.4),
+}
+
+_GB = 1024 ** 3
+
+
+def generate_snapshot(count: int, need_ratio: float, rnd: random.Random) -> dict:
+    """
+    按刷流种子的常见规律生成快照：上传速度随做种时间衰减，少数种子长期保持热度，
+    当前速度与随后的实际上传均在真实速度基础上叠加随机波动
+    """
+    torrents = []
+    for i in range(count):
+        size = min(max(rnd.lognormvariate(2.3, 1.0), 0.3), 120) * _GB
+        seeding_time = rnd.uniform(0.5, 30 * 24) * 3600
+        popularity = rnd.paretovariate(1.5)
+        # 真实上传速度：随做种天数衰减
+        rate = popularity * 50 * 1024 / (1 + seeding_time / 86400) ** 1.2
+        avg_upspeed = rate * rnd.uniform(1.5, 4)
+        upspeed = 0 if rnd.random() < 0.3 else rate * rnd.lognormvariate(0, 0.8)
+        uploaded = avg_upspeed * seeding_time
+        torrents.append({
+            "hash": f"{i:040x}",
+            "size": round(size),
+            "upspeed": round(upspeed),
+            "avg_upspeed": round(avg_upspeed),
+            "ratio": round(uploaded / size, 4),
+            "seeding_time": round(seeding_time),
+            "uploaded_next": round(rate * rnd.lognormvariate(0, 0.5) * 86400),
+        })
+    need_size = round(sum(torrent["size"] for torrent in torrents) * need_ratio)
+    return {"need_size": need_size, "torrents": torrents}
+
+
+def generate():
+    rnd = random.Random(42)
+    SNAPSHOTS_PATH.mkdir(parents=True, exist_ok=True)
+    for name, (count, need_ratio) in _SNAPSHOT_SPECS.items():
+        snapshot = generate_snapshot(count, need_ratio, rnd)
+        with open(SNAPSHOTS_PATH / f"{name}.json", "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+            f.write("\n")
+        print(f"已生成快照 {name}，候选种子数: {count}")
+
+
+def load_snapshots() -> dict:
+    return {path.stem: json.loads(path.read_text(encoding="utf-8"))
+            for path in sorted(SNAPSHOTS_PATH.glob("*.json"))}
+
+
+def greedy_delete(torrents: list, need_size: float) -> list:
+    """
+    原有方式：按做种时间倒序删除，直至达到目标体积
+    """
+    selected = []
+    freed = 0
+    for torrent in sorted(torrents, key=lambda t: t["seeding_time"], reverse=True):
+        if freed >= need_size:
+            break
+        selected.append(torrent["hash"])
+        freed += torrent["size"]
+    return selected
+
+
+def planner_delete(torrents: list, need_size: float) -> list:
+    candidates = [DeleteCandidate(torrent_hash=torrent["hash"],
+                                  size=torrent["size"],
+                                  recent_upspeed=torrent["upspeed"],
+                                  avg_upspeed=torrent["avg_upspeed"],
+                                  ratio=torrent["ratio"],
+                                  seeding_time=torrent["seeding_time"])
+                  for torrent in torrents]
+    return [candidate.hash for candidate in plan_delete(candidates=candidates, need_size=need_size)]
+
+
+def evaluate(torrents: list, need_size: float, hashes: list) -> dict:
+    """
+    使用快照记录的数据评估删除结果，不依赖 plan_delete 的评分
+    """
+    torrent_map = {torrent["hash"]: torrent for torrent in torrents}
+    assert len(set(hashes)) == len(hashes), "存在重复删除的种子"
+    freed = sum(torrent_map[_hash]["size"] for _hash in hashes)
+    return {
+        "count": len(hashes),
+        "freed": freed,
+        "over": freed - need_size,
+        "reached": freed >= need_size,
+        "lost": sum(torrent_map[_hash]["uploaded_next"] for _hash in hashes),
+    }
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "generate":
+        generate()
+        return
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    snapshots = load_snapshots()
+    assert snapshots, f"未找到快照：{SNAPSHOTS_PATH}"
+
+    total = {"greedy": {"over": 0, "lost": 0, "missed": 0, "elapsed": 0.0},
+             "planner": {"over": 0, "lost": 0, "missed": 0, "elapsed": 0.0}}
+    for name, snapshot in snapshots.items():
+        torrents, need_size = snapshot["torrents"], snapshot["need_size"]
+        results = {}
+        for method, func in (("greedy", greedy_delete), ("planner", planner_delete)):
+            elapsed = float("inf")
+            hashes = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                hashes = func(torrents, need_size)
+                elapsed = min(elapsed, time.perf_counter() - start)
+            result = evaluate(torrents, need_size, hashes)
+            results[method] = result
+            total[method]["over"] += result["over"]
+            total[method]["lost"] += result["lost"]
+            total[method]["missed"] += 0 if result["reached"] else 1
+            total[method]["elapsed"] += elapsed
+        # 候选总体积足够时两种方式都必须达到目标体积
+        if sum(torrent["size"] for torrent in torrents) >= need_size:
+            assert results["greedy"]["reached"] and results["planner"]["reached"], f"{name} 未达到目标体积"
+
+        greedy, planner = results["greedy"], results["planner"]
+        print(f"[{name}] 候选种子数: {len(torrents)}，目标释放: {need_size / _GB:.1f} GB")
+        for method, result in (("按做种时间", greedy), ("plan_delete", planner)):
+            print(f"  {method}: 删除 {result['count']} 个，释放 {result['freed'] / _GB:.1f} GB"
+                  f"（超出 {result['over'] / _GB:.1f} GB），损失上传 {result['lost'] / _GB:.2f} GB")
+
+    print("合计：")
+    for method, name in (("greedy", "按做种时间"), ("planner", "plan_delete")):
+        result = total[method]
+        print(f"  {name}: 超出目标 {result['over'] / _GB:.1f} GB，未达目标快照 {result['missed']} 个，"
+              f"损失上传 {result['lost'] / _GB:.2f} GB，耗时 {result['elapsed'] * 1000:.2f} ms")
+    if total["greedy"]["lost"]:
+        print(f"  plan_delete 损失上传为原有方式的 {total['planner']['lost'] / total['greedy']['lost'] * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+刷流去重基准测试：对比 BrushTaskIndex 索引判断与逐个遍历任务的线性判断
+
+模拟一次刷流：逐个判断候选种子是否重复，未重复的种子加入任务，并按比例模拟添加下载失败撤销任务，
+两种方式在每个候选种子上的判断结果需完全一致
+
+运行：python benchmarks/brushflow/benchmark_task_index.py [任务数] [候选种子数] [重复次数]
+"""
+import os
+import random
+import sys
+import time
+from typing import Optional
+
+# 直接导入插件目录中不依赖主程序的模块
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "plugins.v2", "brushflow"))
+
+from task_store import BrushTaskIndex  # noqa: E402
+
+_SITES = ["馒头", "观众", "朋友", "红叶", "猫站", "憨憨", "家园", "天空", "听听歌", "海胆"]
+_WORDS = ["The", "Last", "Of", "Us", "House", "Dragon", "Star", "Wars", "Night", "City", "Blue", "Lost",
+          "Dark", "Winter", "Ocean", "Iron", "Shadow", "Silent", "Golden", "Empire", "Secret", "Kingdom"]
+_TAGS = ["2160p", "1080p", "WEB-DL", "BluRay", "HDR10", "H.265", "DDP5.1", "Atmos"]
+
+
+def _random_title(rnd: random.Random) -> str:
+    return f"{'.'.join(rnd.sample(_WORDS, rnd.randint(2, 4)))}.S0{rnd.randint(1, 9)}" \
+           f".{'.'.join(rnd.sample(_TAGS, 3))}-Group"
+
+
+def build_tasks(count: int, rnd: random.Random) -> dict:
+    """
+    模拟刷流任务：约三成任务尚未下载完成（无做种时间）
+    """
+    tasks = {}
+    for i in range(count):
+        site_name = rnd.choice(_SITES)
+        tasks[f"hash{i}"] = {
+            "site_name": site_name,
+            "title": _random_title(rnd),
+            "page_url": f"https://{site_name}/details.php?id={i}",
+            "seed_time": None if rnd.random() < 0.3 else rnd.randint(1, 10 ** 6),
+        }
+    return tasks
+
+
+def build_candidates(count: int, tasks: dict, rnd: random.Random) -> list:
+    """
+    模拟候选种子：混合同站重复标题、同站重复详情地址、其他站点相同标题、与前面候选种子相同标题及全新种子
+    """
+    task_list = list(tasks.values())
+    candidates = []
+    for i in range(count):
+        task = rnd.choice(task_list)
+        kind = rnd.random()
+        if candidates and kind < 0.1:
+            # 与前面的候选种子相同，用于验证撤销失败任务后的判断
+            task = rnd.choice(candidates)
+            site_name = rnd.choice(_SITES)
+            title, page_url = task["title"], f"https://{site_name}/details.php?id=new{i}"
+        elif kind < 0.2:
+            site_name, title, page_url = task["site_name"], task["title"], f"https://{task['site_name']}/new/{i}"
+        elif kind < 0.3:
+            site_name, title, page_url = task["site_name"], f"{task['title']}.Repack", task["page_url"]
+        elif kind < 0.5:
+            site_name = rnd.choice([site for site in _SITES if site != task["site_name"]])
+            title, page_url = task["title"], f"https://{site_name}/details.php?id=new{i}"
+        else:
+            site_name = rnd.choice(_SITES)
+            title, page_url = _random_title(rnd), f"https://{site_name}/details.php?id=new{i}"
+        candidates.append({
+            "site_name": site_name,
+            "title": title,
+            "page_url": page_url if rnd.random() > 0.05 else None,
+        })
+    return candidates
+
+
+def linear_check(candidate: dict, torrent_tasks: dict) -> Optional[str]:
+    """
+    原有的线性判断，与旧版 __evaluate_conditions_for_brush 中的去重逻辑一致
+    """
+    site_name, title, page_url = candidate["site_name"], candidate["title"], candidate["page_url"]
+    task_key = f"{site_name}{title}"
+    if any(task_key == f"{task.get('site_name')}{task.get('title')}" for task in torrent_tasks.values()):
+        return "重复种子"
+    if page_url:
+        task_page_url = f"{site_name}{page_url}"
+        if any(task_page_url == f"{task.get('site_name')}{task.get('page_url')}" for task in
+               torrent_tasks.values()):
+            return "重复种子"
+    if title:
+        if any(site_name != f"{task.get('site_name')}" and title == f"{task.get('title')}"
+               and not task.get("seed_time") for task in torrent_tasks.values()):
+            return "其他站点存在尚未下载完成的相同种子"
+    return None
+
+
+def index_check(candidate: dict, task_index: BrushTaskIndex) -> Optional[str]:
+    """
+    索引判断，与 __evaluate_conditions_for_brush 中的去重逻辑一致
+    """
+    site_name, title, page_url = candidate["site_name"], candidate["title"], candidate["page_url"]
+    if task_index.contains_title(site_name=site_name, title=title):
+        return "重复种子"
+    if page_url:
+        if task_index.contains_page_url(site_name=site_name, page_url=page_url):
+            return "重复种子"
+    if title:
+        if task_index.has_unfinished_on_other_site(site_name=site_name, title=title):
+            return "其他站点存在尚未下载完成的相同种子"
+    return None
+
+
+def simulate(candidates: list, tasks: dict, use_index: bool, failed: set) -> list:
+    """
+    模拟一次刷流，未重复的种子加入任务，失败列表中的种子撤销
+    """
+    torrent_tasks = dict(tasks)
+    task_index = BrushTaskIndex(torrent_tasks) if use_index else None
+    reasons = []
+    for i, candidate in enumerate(candidates):
+        if use_index:
+            reason = index_check(candidate, task_index)
+        else:
+            reason = linear_check(candidate, torrent_tasks)
+        reasons.append(reason)
+        if reason:
+            continue
+        task = dict(candidate, seed_time=None)
+        torrent_tasks[f"new{i}"] = task
+        if use_index:
+            task_index.add(task)
+        if i in failed:
+            del torrent_tasks[f"new{i}"]
+            if use_index:
+                task_index.remove(task)
+    return reasons
+
+
+def main():
+    task_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    candidate_count = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    rnd = random.Random(42)
+    tasks = build_tasks(task_count, rnd)
+    candidates = build_candidates(candidate_count, tasks, rnd)
+    # 约一成新增任务模拟添加下载失败
+    failed = {i for i in range(candidate_count) if rnd.random() < 0.1}
+
+    linear_elapsed, index_elapsed = float("inf"), float("inf")
+    linear_reasons, index_reasons = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        linear_reasons = simulate(candidates, tasks, use_index=False, failed=failed)
+        linear_elapsed = min(linear_elapsed, time.perf_counter() - start)
+        start = time.perf_counter()
+        index_reasons = simulate(candidates, tasks, use_index=True, failed=failed)
+        index_elapsed = min(index_elapsed, time.perf_counter() - start)
+
+    # 两种方式对每个候选种子的判断结果应完全一致
+    assert linear_reasons == index_reasons, "去重结果不一致"
+    print(f"任务数: {len(tasks)}，候选种子数: {len(candidates)}，"
+          f"重复种子: {linear_reasons.count('重复种子')}，"
+          f"其他站点未完成: {linear_reasons.count('其他站点存在尚未下载完成的相同种子')}，"
+          f"通过: {linear_reasons.count(None)}")
+    print(f"线性遍历: {linear_elapsed * 1000:.2f} ms")
+    print(f"BrushTaskIndex（含构建）: {index_elapsed * 1000:.2f} ms（{linear_elapsed / index_elapsed:.1f}x）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+订阅标题排除匹配基准测试：对比 Aho-Corasick 自动机与逐个 in 判断
+
+运行：python benchmarks/brushflow/benchmark_title_matcher.py [订阅数] [种子数] [重复次数]
+"""
+import os
+import random
+import sys
+import time
+
+# 直接导入插件目录中不依赖主程序的模块
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "plugins.v2", "brushflow"))
+
+from title_matcher import SubscribeTitleMatcher  # noqa: E402
+
+_WORDS = ["The", "Last", "Of", "Us", "House", "Dragon", "Star", "Wars", "Night", "City", "Blue", "Lost",
+          "Dark", "Winter", "Ocean", "Iron", "Shadow", "Silent", "Golden", "Empire", "Secret", "Kingdom"]
+_CN_CHARS = "的一是不了人我在有他这中大来上个国到说们为子和你地出道也时年得就那要下以生会自"
+_TAGS = ["2160p", "1080p", "WEB-DL", "BluRay", "HDR10", "DV", "H.265", "HEVC", "DDP5.1", "Atmos", "AAC"]
+
+
+def _random_en_title(rnd: random.Random) -> str:
+    return " ".join(rnd.sample(_WORDS, rnd.randint(2, 4)))
+
+
+def _random_cn_title(rnd: random.Random) -> str:
+    return "".join(rnd.choice(_CN_CHARS) for _ in range(rnd.randint(3, 6)))
+
+
+def build_subscribe_titles(count: int, rnd: random.Random) -> list:
+    """
+    模拟订阅标题：每个订阅包含中文名、英文名、原名及若干别名
+    """
+    titles = []
+    for _ in range(count):
+        en_title = _random_en_title(rnd)
+        titles.extend([_random_cn_title(rnd), en_title, en_title.replace(" ", "."),
+                       _random_cn_title(rnd), f"{en_title} {rnd.randint(1990, 2025)}"])
+    return list(dict.fromkeys(titles))
+
+
+def build_torrents(count: int, titles: list, rnd: random.Random, hit_ratio: float = 0.05) -> list:
+    """
+    模拟站点种子列表：(标题, 副标题)，按比例包含订阅标题
+    """
+    torrents = []
+    for _ in range(count):
+        name = _random_en_title(rnd).replace(" ", ".")
+        if rnd.random() < hit_ratio:
+            name = rnd.choice(titles).replace(" ", ".")
+        title = f"{name}.S0{rnd.randint(1, 9)}.{'.'.join(rnd.sample(_TAGS, 4))}-Group"
+        description = f"{_random_cn_title(rnd)} 第{rnd.randint(1, 9)}季 全{rnd.randint(6, 24)}集 | 类型: 剧情"
+        torrents.append((title, description))
+    return torrents
+
+
+def naive_search(titles: list, *texts: str):
+    for text in texts:
+        if not text:
+            continue
+        for title in titles:
+            if title in text:
+                return title
+    return None
+
+
+def main():
+    subscribe_count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    torrent_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    rnd = random.Random(42)
+    titles = build_subscribe_titles(subscribe_count, rnd)
+    torrents = build_torrents(torrent_count, titles, rnd)
+
+    start = time.perf_counter()
+    matcher = SubscribeTitleMatcher(titles=titles)
+    build_elapsed = time.perf_counter() - start
+
+    naive_elapsed, matcher_elapsed = float("inf"), float("inf")
+    naive_hits, matcher_hits = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        naive_hits = [naive_search(titles, title, description) is not None for title, description in torrents]
+        naive_elapsed = min(naive_elapsed, time.perf_counter() - start)
+        start = time.perf_counter()
+        matcher_hits = [matcher.search(title, description) is not None for title, description in torrents]
+        matcher_elapsed = min(matcher_elapsed, time.perf_counter() - start)
+
+    # 两种方式命中的种子应完全一致
+    assert naive_hits == matcher_hits, "匹配结果不一致"
+    print(f"订阅标题数: {len(titles)}，种子数: {len(torrents)}，命中数: {sum(matcher_hits)}")
+    print(f"自动机构建: {build_elapsed * 1000:.2f} ms")
+    print(f"逐个 in 判断: {naive_elapsed * 1000:.2f} ms")
+    print(f"Aho-Corasick: {matcher_elapsed * 1000:.2f} ms（{naive_elapsed / matcher_elapsed:.1f}x）")
+
+
+if __name__ == "__main__":
+    main()
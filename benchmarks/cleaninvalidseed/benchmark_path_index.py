@@ -0,0 +1,155 @@
+"""
+无效源文件检测基准测试：
+1. 下载目录条目是否在做种：对比 ContentPathIndex 与逐个 path in content_path 判断
+2. 无效源文件大小统计：对比 get_path_size 与 Path.rglob 遍历
+
+逐个判断耗时与 种子数×条目数 成正比，默认只对抽样条目执行并按比例推算全部条目的耗时
+
+运行：python benchmarks/cleaninvalidseed/benchmark_path_index.py [种子数] [目录条目数] [逐个判断抽样数] [无效源文件数]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 直接导入插件目录中不依赖主程序的模块
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "plugins.v2", "cleaninvalidseed"))
+
+from path_index import ContentPathIndex, get_path_size  # noqa: E402
+
+_CATEGORIES = ["movie", "tv", "anime", "documentary", "music"]
+_WORDS = ["The", "Last", "Of", "Us", "House", "Dragon", "Star", "Wars", "Night", "City", "Blue", "Lost",
+          "Dark", "Winter", "Ocean", "Iron", "Shadow", "Silent", "Golden", "Empire", "Secret", "Kingdom"]
+_TAGS = ["2160p", "1080p", "WEB-DL", "BluRay", "HDR10", "DV", "H.265", "HEVC", "DDP5.1", "Atmos", "AAC"]
+_DOWNLOAD_DIR = "/downloads"
+
+
+def _random_name(rnd: random.Random, index: int) -> str:
+    return f"{'.'.join(rnd.sample(_WORDS, rnd.randint(2, 4)))}.{rnd.randint(1990, 2025)}." \
+           f"{'.'.join(rnd.sample(_TAGS, 3))}-Group{index}"
+
+
+def iter_content_paths(count: int, rnd: random.Random):
+    """
+    模拟下载器中种子的 content_path：单文件种子、多文件种子目录及剧集季目录
+    """
+    for index in range(count):
+        name = _random_name(rnd, index)
+        category = rnd.choice(_CATEGORIES)
+        kind = rnd.random()
+        if kind < 0.4:
+            yield f"{_DOWNLOAD_DIR}/{category}/{name}.mkv"
+        elif kind < 0.9:
+            yield f"{_DOWNLOAD_DIR}/{category}/{name}"
+        else:
+            yield f"{_DOWNLOAD_DIR}/{category}/{name}/Season {rnd.randint(1, 9)}"
+
+
+def build_entries(content_paths: list, count: int, rnd: random.Random, orphan_ratio: float = 0.3) -> list:
+    """
+    模拟下载目录下的顶层条目：按比例包含未做种的无效源文件，少量条目映射后的路径只与做种内容路径的中间部分相同
+    """
+    entries = []
+    for index in range(count):
+        if rnd.random() < orphan_ratio:
+            entries.append(f"{_DOWNLOAD_DIR}/{rnd.choice(_CATEGORIES)}/{_random_name(rnd, -index)}")
+            continue
+        # 剧集季目录的顶层条目为其上级目录
+        entry = rnd.choice(content_paths).rsplit("/Season ", 1)[0]
+        if rnd.random() < 0.05:
+            entry = entry[len(_DOWNLOAD_DIR):]
+        entries.append(entry)
+    return entries
+
+
+def naive_contains(content_paths: list, path: str) -> bool:
+    for content_path in content_paths:
+        if path in content_path:
+            return True
+    return False
+
+
+def build_orphan_tree(root: Path, file_count: int, rnd: random.Random, files_per_dir: int = 50) -> list:
+    """
+    生成无效源文件目录树，每个目录包含多层子目录及若干文件
+    """
+    orphans = []
+    for index in range(0, file_count, files_per_dir):
+        orphan = root / f"orphan{index}"
+        for file_index in range(min(files_per_dir, file_count - index)):
+            sub_dir = orphan / f"Season {file_index % 3}" / ("Extras" if file_index % 5 == 0 else "")
+            sub_dir.mkdir(parents=True, exist_ok=True)
+            (sub_dir / f"E{file_index}.mkv").write_bytes(b"\0" * rnd.randint(1, 4096))
+        orphans.append(orphan)
+    return orphans
+
+
+def rglob_size(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    return sum(entry.stat().st_size for entry in path.rglob("*") if entry.is_file())
+
+
+def bench_matching(torrent_count: int, entry_count: int, sample_count: int, rnd: random.Random):
+    content_paths = list(iter_content_paths(torrent_count, rnd))
+    entries = build_entries(content_paths, entry_count, rnd)
+    sample = rnd.sample(entries, min(sample_count, len(entries)))
+
+    start = time.perf_counter()
+    index = ContentPathIndex(content_paths)
+    build_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index_hits = [index.contains(entry) for entry in entries]
+    index_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    naive_hits = [naive_contains(content_paths, entry) for entry in sample]
+    naive_elapsed = (time.perf_counter() - start) * len(entries) / len(sample)
+
+    # 抽样条目两种方式的结果应完全一致
+    assert naive_hits == [index.contains(entry) for entry in sample], "匹配结果不一致"
+    print(f"种子数: {len(content_paths)}，目录条目数: {len(entries)}，无效源文件: {index_hits.count(False)}")
+    print(f"索引构建: {build_elapsed * 1000:.2f} ms")
+    print(f"逐个 in 判断（按 {len(sample)} 个抽样推算）: {naive_elapsed * 1000:.2f} ms")
+    print(f"ContentPathIndex: {index_elapsed * 1000:.2f} ms（{naive_elapsed / index_elapsed:.1f}x）")
+
+
+def bench_size(file_count: int, rnd: random.Random):
+    with tempfile.TemporaryDirectory() as root:
+        orphans = build_orphan_tree(Path(root), file_count, rnd)
+
+        start = time.perf_counter()
+        rglob_total = sum(rglob_size(orphan) for orphan in orphans)
+        rglob_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        scandir_total = sum(get_path_size(str(orphan))[0] for orphan in orphans)
+        scandir_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        limited = [get_path_size(str(orphan), max_files=10) for orphan in orphans]
+        limited_elapsed = time.perf_counter() - start
+
+    assert rglob_total == scandir_total, "统计大小不一致"
+    print(f"无效源文件目录: {len(orphans)}，文件数: {file_count}，总大小: {scandir_total} 字节")
+    print(f"Path.rglob: {rglob_elapsed * 1000:.2f} ms")
+    print(f"get_path_size: {scandir_elapsed * 1000:.2f} ms（{rglob_elapsed / scandir_elapsed:.1f}x）")
+    print(f"get_path_size 每个目录最多统计10个文件: {limited_elapsed * 1000:.2f} ms，"
+          f"未完整统计目录数: {sum(1 for _, _, completed in limited if not completed)}")
+
+
+def main():
+    torrent_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    entry_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    sample_count = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    file_count = int(sys.argv[4]) if len(sys.argv) > 4 else 10000
+    rnd = random.Random(42)
+    bench_matching(torrent_count, entry_count, sample_count, rnd)
+    bench_size(file_count, rnd)
+
+
+if __name__ == "__main__":
+    main()
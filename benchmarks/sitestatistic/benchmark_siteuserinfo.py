@@ -0,0 +1,167 @@
+"""
+站点用户数据解析基准测试：使用 fixtures 目录下保存的各站点架构页面，对比各解析步骤共享页面解析结果与每步重新解析的耗时、lxml 解析次数及文本量、预处理次数
+lxml 文档树由 libxml2 分配，tracemalloc 只能统计到 Python 对象，解析文本量即为少建的文档树规模
+
+fixtures/<架构模块名>/ 下保存首页 index.html 及其它页面，routes.json 按顺序记录 [URL包含的字符串, 页面文件]，请求时返回第一个匹配的页面
+
+运行（需已安装站点数据统计插件的 MoviePilot 环境）：
+PYTHONPATH=<MoviePilot 根目录> python benchmarks/sitestatistic/benchmark_siteuserinfo.py [重复次数] [架构模块名 ...]
+"""
+import importlib
+import inspect
+import json
+import re
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from lxml import etree
+
+from app.plugins.sitestatistic.siteuserinfo import ISiteUserInfo
+
+FIXTURES_PATH = Path(__file__).parent / "fixtures"
+
+
+class _CallCounter:
+    """
+    统计模块函数的调用次数及处理的文本长度，指定 pattern 时只统计该正则的 re.sub 调用
+    """
+
+    def __init__(self, module, name: str, pattern: str = None):
+        self.count = 0
+        self.chars = 0
+        self._module = module
+        self._name = name
+        self._pattern = pattern
+        self._func = getattr(module, name)
+
+    def __call__(self, *args, **kwargs):
+        text = args[-1] if self._pattern else args[0]
+        if not self._pattern or args[0] == self._pattern:
+            self.count += 1
+            self.chars += len(text)
+        return self._func(*args, **kwargs)
+
+    def __enter__(self):
+        setattr(self._module, self._name, self)
+        return self
+
+    def __exit__(self, *args):
+        setattr(self._module, self._name, self._func)
+
+
+_shared_get_html = ISiteUserInfo._get_html
+_shared_prepare_html_text = ISiteUserInfo._prepare_html_text
+
+
+def _uncached_prepare_html_text(_, html_text: str) -> str:
+    return re.sub(r"#\d+", "", re.sub(r"\d+px", "", html_text))
+
+
+def _uncached_get_html(self, html_text: str, prepare: bool = False):
+    if prepare:
+        html_text = self._prepare_html_text(html_text)
+    return etree.HTML(html_text)
+
+
+def load_fixture(schema: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    读取架构的首页及页面路由
+    """
+    path = FIXTURES_PATH / schema
+    routes = json.loads((path / "routes.json").read_text(encoding="utf-8"))
+    pages = [(pattern, (path / file).read_text(encoding="utf-8")) for pattern, file in routes]
+    return (path / "index.html").read_text(encoding="utf-8"), pages
+
+
+def get_schema_class(schema: str):
+    """
+    获取架构模块中定义的解析类
+    """
+    module = importlib.import_module(f"app.plugins.sitestatistic.siteuserinfo.{schema}")
+    for _, obj in inspect.getmembers(module, inspect.isclass):
+        if issubclass(obj, ISiteUserInfo) and obj is not ISiteUserInfo and obj.__module__ == module.__name__:
+            return obj
+    raise ValueError(f"{schema} 中没有站点解析类")
+
+
+def parse_once(site_class, index_html: str, pages: List[Tuple[str, str]]) -> dict:
+    """
+    使用保存的页面解析一次站点数据
+    """
+
+    def get_page_content(_, url: str, params: dict = None, headers: dict = None) -> str:
+        for pattern, content in pages:
+            if pattern in url:
+                return content
+        return ""
+
+    site_class._get_page_content = get_page_content
+    site_user_info = site_class("benchmark", "https://fixtures.example.org/", "cookie", "apikey", "token",
+                                index_html)
+    site_user_info.parse()
+    result = site_user_info.to_dict()
+    if site_user_info.err_msg:
+        raise RuntimeError(site_user_info.err_msg)
+    return result
+
+
+def bench_schema(schema: str, repeat: int) -> Dict[str, dict]:
+    """
+    分别以每步重新解析及共享解析运行，返回两种方式的耗时、解析及预处理统计、Python 内存峰值
+    """
+    site_class = get_schema_class(schema)
+    index_html, pages = load_fixture(schema)
+    if not site_class.match(index_html):
+        raise ValueError(f"{schema} 首页不匹配 {site_class.__name__}")
+    results = {}
+    expected: Optional[dict] = None
+    for mode in ("uncached", "shared"):
+        if mode == "uncached":
+            ISiteUserInfo._get_html = _uncached_get_html
+            ISiteUserInfo._prepare_html_text = _uncached_prepare_html_text
+        try:
+            # 每次预处理执行两次替换，只统计其中一次
+            with _CallCounter(etree, "HTML") as parses, _CallCounter(re, "sub", r"\d+px") as prepares:
+                result = parse_once(site_class, index_html, pages)
+            # 两种方式的解析结果应完全一致
+            if expected is None:
+                expected = result
+            elif result != expected:
+                raise AssertionError(f"{schema} 解析结果不一致")
+            elapsed = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                parse_once(site_class, index_html, pages)
+                elapsed = min(elapsed, time.perf_counter() - start)
+            tracemalloc.start()
+            parse_once(site_class, index_html, pages)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        finally:
+            # 恢复基类实现
+            ISiteUserInfo._get_html = _shared_get_html
+            ISiteUserInfo._prepare_html_text = _shared_prepare_html_text
+        results[mode] = {"ms": elapsed * 1000, "parses": parses.count, "parsed_kb": parses.chars // 1024,
+                         "prepares": prepares.count, "peak_kb": peak // 1024, "result": result}
+    return results
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    schemas = sys.argv[2:] or sorted(path.name for path in FIXTURES_PATH.iterdir() if path.is_dir())
+    print("架构 | 耗时 ms | lxml 解析次数 | lxml 解析文本 KB | 预处理次数 | Python 内存峰值 KB | 用户/上传/下载/做种")
+    for schema in schemas:
+        results = bench_schema(schema, repeat)
+        uncached, shared = results["uncached"], results["shared"]
+        info = shared["result"]
+        columns = [f"{uncached[key]:.2f} → {shared[key]:.2f}" if key == "ms" else f"{uncached[key]} → {shared[key]}"
+                   for key in ("ms", "parses", "parsed_kb", "prepares", "peak_kb")]
+        print(" | ".join([schema, *columns,
+                          f"{info.get('username')}/{info.get('upload')}/{info.get('download')}/{info.get('seeding')}"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,6 @@
 import re
 import traceback
 from datetime import datetime, timedelta
-from multiprocessing.dummy import Pool as ThreadPool
-from multiprocessing.pool import ThreadPool
 from typing import Any, List, Dict, Tuple, Optional
 from urllib.parse import urljoin
 
@@ -22,6 +20,9 @@ from app.helper.module import ModuleHelper
 from app.helper.sites import SitesHelper
 from app.log import logger
 from app.plugins import _PluginBase
+from app.plugins.autosignin.signin_engine import SigninEngine
+from app.plugins.autosignin.signin_log import SigninLog
+from app.plugins.autosignin.sites import get_site_session, is_site_cancelled
 from app.schemas.types import EventType, NotificationType
 from app.utils.http import RequestUtils
 from app.utils.site import SiteUtils
@@ -37,7 +38,7 @@ class AutoSignIn(_PluginBase):
     # 插件图标
     plugin_icon = "signin.png"
     # 插件版本
-    plugin_version = "2.6"
+    plugin_version = "2.8.3"
     # 插件作者
     plugin_author = "thsrite"
     # 作者主页
@@ -59,6 +60,10 @@ class AutoSignIn(_PluginBase):
     _scheduler: Optional[BackgroundScheduler] = None
     # 加载的模块
     _site_schema: list = []
+    # 签到记录
+    _signin_log: Optional[SigninLog] = None
+    # 签到记录保留天数
+    _history_days: int = 14
 
     # 配置属性
     _enabled: bool = False
@@ -66,6 +71,10 @@ class AutoSignIn(_PluginBase):
     _onlyonce: bool = False
     _notify: bool = False
     _queue_cnt: int = 5
+    # 单个站点超时时间（秒）
+    _site_timeout: int = 300
+    # 全部站点总超时时间（分钟）
+    _deadline: int = 30
     _sign_sites: list = []
     _login_sites: list = []
     _retry_keyword = None
@@ -90,6 +99,15 @@ class AutoSignIn(_PluginBase):
             self._onlyonce = config.get("onlyonce")
             self._notify = config.get("notify")
             self._queue_cnt = config.get("queue_cnt") or 5
+            try:
+                self._site_timeout = int(config.get("site_timeout")) \
+                    if config.get("site_timeout") not in (None, "") else 300
+            except (ValueError, TypeError):
+                self._site_timeout = 300
+            try:
+                self._deadline = int(config.get("deadline")) if config.get("deadline") not in (None, "") else 30
+            except (ValueError, TypeError):
+                self._deadline = 30
             self._sign_sites = config.get("sign_sites") or []
             self._login_sites = config.get("login_sites") or []
             self._retry_keyword = config.get("retry_keyword")
@@ -104,6 +122,10 @@ class AutoSignIn(_PluginBase):
             # 保存配置
             self.__update_config()
 
+        # 签到记录
+        self._signin_log = SigninLog(db_path=self.get_data_path() / "signin_log.db")
+        self.__migrate_history()
+
         # 加载模块
         if self._enabled or self._onlyonce:
 
@@ -141,6 +163,8 @@ class AutoSignIn(_PluginBase):
                 "cron": self._cron,
                 "onlyonce": self._onlyonce,
                 "queue_cnt": self._queue_cnt,
+                "site_timeout": self._site_timeout,
+                "deadline": self._deadline,
                 "sign_sites": self._sign_sites,
                 "login_sites": self._login_sites,
                 "retry_keyword": self._retry_keyword,
@@ -417,6 +441,40 @@ class AutoSignIn(_PluginBase):
                                         }
                                     }
                                 ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 6
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'site_timeout',
+                                            'label': '单站点超时(秒)',
+                                            'placeholder': '单个站点超过该时间记为超时（0-不限制）'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 6
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'deadline',
+                                            'label': '总超时(分钟)',
+                                            'placeholder': '超过该时间未完成的站点记为超时（0-不限制）'
+                                        }
+                                    }
+                                ]
                             }
                         ]
                     },
@@ -537,6 +595,8 @@ class AutoSignIn(_PluginBase):
             "onlyonce": False,
             "clean": False,
             "queue_cnt": 5,
+            "site_timeout": 300,
+            "deadline": 30,
             "sign_sites": [],
             "login_sites": [],
             "retry_keyword": "错误|失败"
@@ -553,122 +613,30 @@ class AutoSignIn(_PluginBase):
         """
         拼装插件详情页面，需要返回页面配置，同时附带数据
         """
-        # 获取最近14天的日期数组
-        date_list = [(datetime.now() - timedelta(days=i)).date() for i in range(14)]
-
         # 获取所有数据，包括签到和登录历史
         all_data = {
             "signin": [],  # 签到数据
             "login": []  # 登录数据
         }
         sign_dates = set()
-        sites_info = {}  # 记录站点信息
-
-        # 获取站点信息
-        site_indexers = self.sites.get_indexers()
-        for site in site_indexers:
-            if not site.get("public"):
-                sites_info[site.get("id")] = site.get("name")
-
-        # 自定义站点
-        custom_sites = self.__custom_sites()
-        for site in custom_sites:
-            sites_info[site.get("id")] = site.get("name")
 
-        # 获取常规日期格式数据
-        for day in date_list:
+        # 一次查询最近的签到记录
+        today = datetime.now().date()
+        start_date = (today - timedelta(days=self._history_days - 1)).strftime('%Y-%m-%d')
+        for record in self._signin_log.query(start_date=start_date, latest=True) if self._signin_log else []:
+            try:
+                day = datetime.strptime(record.get("date"), '%Y-%m-%d').date()
+            except (TypeError, ValueError):
+                continue
             day_str = f"{day.month}月{day.day}日"
-            day_formatted = day.strftime('%Y-%m-%d')
-
-            # 获取"月日"格式数据
-            day_data = self.get_data(day_str)
-            if day_data:
-                # 添加日期信息到每条记录
-                if isinstance(day_data, list):
-                    for record in day_data:
-                        if isinstance(record, dict):
-                            record["date"] = day_str
-                            record["day_obj"] = day
-                            # 区分签到和登录数据
-                            if "登录" in record.get("status", ""):
-                                all_data["login"].append(record)
-                            else:
-                                all_data["signin"].append(record)
-                    sign_dates.add(day_str)
-
-            # 获取"签到-yyyy-mm-dd"和"登录-yyyy-mm-dd"格式数据
-            signin_history = self.get_data(key="签到-" + day_formatted)
-            if signin_history:
-                if isinstance(signin_history, dict):
-                    # 获取完成签到的站点ID列表
-                    done_sites = signin_history.get("do", [])
-                    retry_sites = signin_history.get("retry", [])
-
-                    # 为所有已完成签到的站点创建记录
-                    for site_id in done_sites:
-                        site_id_str = str(site_id)
-                        site_name = sites_info.get(site_id_str) or sites_info.get(site_id) or f"站点ID: {site_id}"
-
-                        # 跳过需要重试的站点
-                        if site_id in retry_sites:
-                            # 为需要重试的站点添加记录
-                            status_text = "需要重试"
-                            all_data["signin"].append({
-                                "site": site_name,
-                                "status": status_text,
-                                "date": day_str,
-                                "day_obj": day,
-                                "site_id": site_id
-                            })
-                        else:
-                            # 为已完成的站点添加记录
-                            status_text = "已签到"
-                            all_data["signin"].append({
-                                "site": site_name,
-                                "status": status_text,
-                                "date": day_str,
-                                "day_obj": day,
-                                "site_id": site_id
-                            })
-
-                    sign_dates.add(day_str)
-
-            # 获取登录历史数据
-            login_history = self.get_data(key="登录-" + day_formatted)
-            if login_history:
-                if isinstance(login_history, dict):
-                    # 获取完成登录的站点ID列表
-                    done_sites = login_history.get("do", [])
-                    retry_sites = login_history.get("retry", [])
-
-                    # 为所有已完成登录的站点创建记录
-                    for site_id in done_sites:
-                        site_id_str = str(site_id)
-                        site_name = sites_info.get(site_id_str) or sites_info.get(site_id) or f"站点ID: {site_id}"
-
-                        # 跳过需要重试的站点
-                        if site_id in retry_sites:
-                            # 为需要重试的站点添加记录
-                            status_text = "登录需要重试"
-                            all_data["login"].append({
-                                "site": site_name,
-                                "status": status_text,
-                                "date": day_str,
-                                "day_obj": day,
-                                "site_id": site_id
-                            })
-                        else:
-                            # 为已完成的站点添加记录
-                            status_text = "登录成功"
-                            all_data["login"].append({
-                                "site": site_name,
-                                "status": status_text,
-                                "date": day_str,
-                                "day_obj": day,
-                                "site_id": site_id
-                            })
-
-                    sign_dates.add(day_str)
+            all_data["login" if record.get("type") == "登录" else "signin"].append({
+                "site": record.get("site") or f"站点ID: {record.get('site_id')}",
+                "status": record.get("status") or "",
+                "date": day_str,
+                "day_obj": day,
+                "site_id": record.get("site_id")
+            })
+            sign_dates.add(day_str)
 
         # 如果没有数据，显示提示信息
         if not all_data["signin"] and not all_data["login"]:
@@ -688,7 +656,7 @@ class AutoSignIn(_PluginBase):
             sign_dates_list = list(sign_dates)
             sign_dates_list.sort(reverse=True)  # 最新日期优先
         else:
-            sign_dates_list = [f"{date_list[0].month}月{date_list[0].day}日"]
+            sign_dates_list = [f"{today.month}月{today.day}日"]
 
         # 按站点分组并去重数据
         signin_site_data = {}
@@ -1311,15 +1279,12 @@ class AutoSignIn(_PluginBase):
         """
         签到逻辑
         """
-        yesterday = today - timedelta(days=1)
-        yesterday_str = yesterday.strftime('%Y-%m-%d')
-        # 删除昨天历史
-        self.del_data(key=type_str + "-" + yesterday_str)
-        self.del_data(key=f"{yesterday.month}月{yesterday.day}日")
+        # 清理过期的签到记录
+        self._signin_log.purge(keep_days=self._history_days)
 
-        # 查看今天有没有签到|登录历史
+        # 查看今天有没有签到|登录历史，站点ID -> 是否需要重试
         today = today.strftime('%Y-%m-%d')
-        today_history = self.get_data(key=type_str + "-" + today)
+        today_history = self._signin_log.get_site_states(date=today, type_str=type_str)
 
         # 查询所有站点
         all_sites = [site for site in self.sites.get_indexers() if not site.get("public")] + self.__custom_sites()
@@ -1336,14 +1301,8 @@ class AutoSignIn(_PluginBase):
                 # 关闭开关
                 self._clean = False
         else:
-            # 需要重试站点
-            retry_sites = today_history.get("retry") or []
-            # 今天已签到|登录站点
-            already_sites = today_history.get("do") or []
-
-            # 今日未签|登录站点
-            no_sites = [site for site in do_sites if
-                        site.get("id") not in already_sites or site.get("id") in retry_sites]
+            # 今日未签|登录站点及需要重试站点
+            no_sites = [site for site in do_sites if today_history.get(str(site.get("id")), True)]
 
             if not no_sites:
                 logger.info(f"今日 {today} 已{type_str}，无重新{type_str}站点，本次任务结束")
@@ -1359,33 +1318,15 @@ class AutoSignIn(_PluginBase):
 
         # 执行签到
         logger.info(f"开始执行{type_str}任务 ...")
-        if type_str == "签到":
-            with ThreadPool(min(len(do_sites), int(self._queue_cnt))) as p:
-                status = p.map(self.signin_site, do_sites)
-        else:
-            with ThreadPool(min(len(do_sites), int(self._queue_cnt))) as p:
-                status = p.map(self.login_site, do_sites)
+        engine = SigninEngine(max_workers=int(self._queue_cnt),
+                              site_timeout=max(int(self._site_timeout or 0), 0),
+                              deadline=max(int(self._deadline or 0), 0) * 60)
+        status = engine.run(sites=do_sites,
+                            handler=self.signin_site if type_str == "签到" else self.login_site,
+                            timeout_message=f"{type_str}失败，执行超时！")
 
         if status:
             logger.info(f"站点{type_str}任务完成！")
-            # 获取今天的日期
-            key = f"{datetime.now().month}月{datetime.now().day}日"
-            today_data = self.get_data(key)
-            if today_data:
-                if not isinstance(today_data, list):
-                    today_data = [today_data]
-                for s in status:
-                    today_data.append({
-                        "site": s[0],
-                        "status": s[1]
-                    })
-            else:
-                today_data = [{
-                    "site": s[0],
-                    "status": s[1]
-                } for s in status]
-            # 保存数据
-            self.save_data(key, today_data)
 
             # 命中重试词的站点id
             retry_sites = []
@@ -1446,11 +1387,13 @@ class AutoSignIn(_PluginBase):
             logger.debug(f"下次{type_str}重试站点 {retry_sites}")
 
             # 存入历史
-            self.save_data(key=type_str + "-" + today,
-                           value={
-                               "do": self._sign_sites if type_str == "签到" else self._login_sites,
-                               "retry": retry_sites
-                           })
+            retry_ids = {str(site_id) for site_id in retry_sites}
+            self._signin_log.append(type_str=type_str, records=[{
+                "site_id": site_info.get("id"),
+                "site": s[0],
+                "status": s[1],
+                "retry": str(site_info.get("id")) in retry_ids
+            } for site_info, s in zip(do_sites, status)])
 
             # 自动Cloudflare IP优选
             if self._auto_cf and int(self._auto_cf) > 0 and retry_msg and len(retry_msg) >= int(self._auto_cf):
@@ -1484,6 +1427,52 @@ class AutoSignIn(_PluginBase):
         # 保存配置
         self.__update_config()
 
+    def __migrate_history(self):
+        """
+        将历史插件数据中的签到记录迁移到签到记录，并删除历史数据
+        """
+        if self._signin_log.get_meta("migrated") == "1":
+            return
+        count = 0
+        site_names = None
+        for i in range(self._history_days):
+            day = datetime.now() - timedelta(days=i)
+            day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
+            # 今日已签到|登录的站点及需要重试的站点，先于签到结果写入，避免升级当天重复签到|登录
+            for type_str in ["签到", "登录"] if i == 0 else []:
+                type_history = self.get_data(key=f"{type_str}-{day.strftime('%Y-%m-%d')}")
+                if not isinstance(type_history, dict):
+                    continue
+                if site_names is None:
+                    site_names = {str(site.get("id")): site.get("name") for site in
+                                  [*self.sites.get_indexers(), *self.__custom_sites()]}
+                retry_ids = {str(site_id) for site_id in type_history.get("retry") or []}
+                self._signin_log.append(type_str=type_str, records=[{
+                    "site_id": site_id,
+                    "site": site_names.get(str(site_id)),
+                    "retry": str(site_id) in retry_ids
+                } for site_id in type_history.get("do") or []], date=day_start)
+            day_key = f"{day.month}月{day.day}日"
+            day_data = self.get_data(day_key)
+            if day_data:
+                if not isinstance(day_data, list):
+                    day_data = [day_data]
+                records = [record for record in day_data if isinstance(record, dict)]
+                for type_str in ["签到", "登录"]:
+                    type_records = [{
+                        "site": record.get("site"),
+                        "status": record.get("status")
+                    } for record in records if ("登录" in str(record.get("status"))) == (type_str == "登录")]
+                    self._signin_log.append(type_str=type_str, records=type_records, date=day_start)
+                    count += len(type_records)
+                self.del_data(key=day_key)
+            for type_str in ["签到", "登录"]:
+                if self.get_data(key=f"{type_str}-{day.strftime('%Y-%m-%d')}"):
+                    self.del_data(key=f"{type_str}-{day.strftime('%Y-%m-%d')}")
+        self._signin_log.set_meta("migrated", "1")
+        if count:
+            logger.info(f"已迁移 {count} 条历史签到记录")
+
     def __build_class(self, url) -> Any:
         for site_schema in self._site_schema:
             try:
@@ -1529,6 +1518,9 @@ class AutoSignIn(_PluginBase):
                 state, message = False, f"签到失败：{str(e)}"
         else:
             state, message = self.__signin_base(site_info)
+        # 已超时取消的站点结果已丢弃，不再计入站点统计
+        if is_site_cancelled():
+            return site_info.get("name"), message
         # 统计
         seconds = (datetime.now() - start_time).seconds
         domain = StringUtils.get_url_domain(site_info.get('url'))
@@ -1583,13 +1575,15 @@ class AutoSignIn(_PluginBase):
             else:
                 res = RequestUtils(cookies=site_cookie,
                                    ua=ua,
-                                   proxies=proxies
+                                   proxies=proxies,
+                                   session=get_site_session()
                                    ).get_res(url=checkin_url)
-                if not res and site_url != checkin_url:
+                if not res and site_url != checkin_url and not is_site_cancelled():
                     logger.info(f"开始站点模拟登录：{site}，地址：{site_url}...")
                     res = RequestUtils(cookies=site_cookie,
                                        ua=ua,
-                                       proxies=proxies
+                                       proxies=proxies,
+                                       session=get_site_session()
                                        ).get_res(url=site_url)
                 # 判断登录状态
                 if res and res.status_code in [200, 500, 403]:
@@ -1631,6 +1625,9 @@ class AutoSignIn(_PluginBase):
                 state, message = False, f"模拟登录失败：{str(e)}"
         else:
             state, message = self.__login_base(site_info)
+        # 已超时取消的站点结果已丢弃，不再计入站点统计
+        if is_site_cancelled():
+            return site_info.get("name"), message
         # 统计
         seconds = (datetime.now() - start_time).seconds
         domain = StringUtils.get_url_domain(site_info.get('url'))
@@ -1678,7 +1675,8 @@ class AutoSignIn(_PluginBase):
             else:
                 res = RequestUtils(cookies=site_cookie,
                                    ua=ua,
-                                   proxies=proxies
+                                   proxies=proxies,
+                                   session=get_site_session()
                                    ).get_res(url=site_url)
                 # 判断登录状态
                 if res and res.status_code in [200, 500, 403]:
@@ -1715,6 +1713,9 @@ class AutoSignIn(_PluginBase):
                 if self._scheduler.running:
                     self._scheduler.shutdown()
                 self._scheduler = None
+            if self._signin_log:
+                self._signin_log.close()
+                self._signin_log = None
         except Exception as e:
             logger.error("退出插件失败：%s" % str(e))
 
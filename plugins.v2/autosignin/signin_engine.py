@@ -0,0 +1,108 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ruamel.yaml import CommentedMap
+
+from app.log import logger
+from app.plugins.autosignin.sites import site_session
+from app.utils.string import StringUtils
+
+
+class SigninEngine(object):
+    """
+    异步签到引擎，全部站点同时排队，按全局并发数及单站点并发数调度执行
+    站点签到实现仍为同步代码，通过适配器在线程中执行，同一站点的多步请求共用一个会话
+    """
+
+    def __init__(self, max_workers: int = 5, host_limit: int = 1,
+                 site_timeout: Optional[float] = None, deadline: Optional[float] = None):
+        """
+        :param max_workers: 同时执行的站点数量
+        :param host_limit: 同一域名同时执行的数量
+        :param site_timeout: 单个站点超时时间（秒），为空则不限制。线程无法被中断，超时的站点只会设置取消标志，
+                             站点实现在下一次请求前检查（见 sites.is_site_cancelled）并尽快结束，已发出的请求仍会执行完
+        :param deadline: 全部站点执行的总超时时间（秒），为空则不限制
+        """
+        self._max_workers = max(int(max_workers or 1), 1)
+        self._host_limit = max(int(host_limit or 1), 1)
+        self._site_timeout = site_timeout or None
+        self._deadline = deadline or None
+
+    def run(self, sites: List[CommentedMap],
+            handler: Callable[[CommentedMap], Tuple[str, str]],
+            timeout_message: str = "执行超时") -> List[Tuple[str, str]]:
+        """
+        执行全部站点，按站点顺序返回 (站点名称, 结果信息)
+        :param sites: 站点信息列表
+        :param handler: 同步执行单个站点的方法
+        :param timeout_message: 站点超时时返回的结果信息
+        """
+        if not sites:
+            return []
+        loop = asyncio.new_event_loop()
+        # 超时的站点无法中断线程，线程数按站点数量创建，避免阻塞后续站点，实际并发由信号量控制
+        executor = ThreadPoolExecutor(max_workers=len(sites), thread_name_prefix="AutoSignIn")
+        # 各站点的取消标志，超时或结束时设置，通知仍在执行的站点停止后续请求
+        cancel_events = [threading.Event() for _ in sites]
+        try:
+            return loop.run_until_complete(self.__run(sites=sites,
+                                                      handler=handler,
+                                                      executor=executor,
+                                                      cancel_events=cancel_events,
+                                                      timeout_message=timeout_message))
+        finally:
+            for cancel_event in cancel_events:
+                cancel_event.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            loop.close()
+
+    async def __run(self, sites: List[CommentedMap], handler: Callable[[CommentedMap], Tuple[str, str]],
+                    executor: ThreadPoolExecutor, cancel_events: List[threading.Event],
+                    timeout_message: str) -> List[Tuple[str, str]]:
+        loop = asyncio.get_running_loop()
+        global_semaphore = asyncio.Semaphore(self._max_workers)
+        host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        async def __run_site(site_info: CommentedMap, cancel_event: threading.Event) -> Tuple[str, str]:
+            host = StringUtils.get_url_domain(site_info.get("url")) or str(site_info.get("id"))
+            host_semaphore = host_semaphores.setdefault(host, asyncio.Semaphore(self._host_limit))
+            # 先获取域名信号量，排队等待同域名站点时不占用全局并发
+            async with host_semaphore, global_semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        loop.run_in_executor(executor, self.__run_handler, handler, site_info, cancel_event),
+                        timeout=self._site_timeout)
+                except asyncio.TimeoutError:
+                    cancel_event.set()
+                    logger.warning(f"{site_info.get('name')} {timeout_message}，超过 {self._site_timeout} 秒")
+                    return site_info.get("name"), timeout_message
+
+        tasks = [loop.create_task(__run_site(site_info, cancel_event))
+                 for site_info, cancel_event in zip(sites, cancel_events)]
+        _, pending = await asyncio.wait(tasks, timeout=self._deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"已超过总超时时间 {self._deadline} 秒，{len(pending)} 个站点未完成")
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        results = []
+        for site_info, task in zip(sites, tasks):
+            if task.cancelled():
+                results.append((site_info.get("name"), timeout_message))
+            elif task.exception():
+                results.append((site_info.get("name"), f"执行失败：{str(task.exception())}"))
+            else:
+                results.append(task.result())
+        return results
+
+    @staticmethod
+    def __run_handler(handler: Callable[[CommentedMap], Tuple[str, str]],
+                      site_info: CommentedMap, cancel_event: threading.Event) -> Tuple[str, str]:
+        """
+        适配同步的站点处理方法，执行期间绑定站点会话及取消标志
+        """
+        with site_session(cancel_event=cancel_event):
+            return handler(site_info)
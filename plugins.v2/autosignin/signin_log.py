@@ -0,0 +1,124 @@
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class SigninLog(object):
+    """
+    签到记录，每个站点每次签到|登录追加一行，按日期及站点建立索引
+    """
+
+    def __init__(self, db_path: Path):
+        self._lock = threading.Lock()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS signin_log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    date TEXT NOT NULL,
+                    time REAL NOT NULL,
+                    type TEXT NOT NULL,
+                    site_id TEXT,
+                    site TEXT,
+                    status TEXT,
+                    retry INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS idx_signin_log_date ON signin_log (date, type, site);
+                CREATE INDEX IF NOT EXISTS idx_signin_log_site ON signin_log (site, date);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+
+    def append(self, type_str: str, records: Iterable[Dict[str, Any]], date: Optional[datetime] = None):
+        """
+        追加签到记录
+        :param type_str: 签到|登录
+        :param records: 记录列表，含 site_id、site、status、retry
+        :param date: 记录时间，默认为当前时间
+        """
+        date = date or datetime.now()
+        rows = [(date.strftime('%Y-%m-%d'), date.timestamp(), type_str,
+                 str(record.get("site_id")) if record.get("site_id") is not None else None,
+                 record.get("site"), record.get("status"), 1 if record.get("retry") else 0)
+                for record in records]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("""
+                INSERT INTO signin_log (date, time, type, site_id, site, status, retry)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+
+    def query(self, start_date: str, end_date: Optional[str] = None, latest: bool = False) -> List[Dict[str, Any]]:
+        """
+        按日期范围查询签到记录，按记录先后排序
+        :param start_date: 开始日期 yyyy-mm-dd
+        :param end_date: 结束日期 yyyy-mm-dd，默认不限制
+        :param latest: 每个站点每天每种类型只返回最后一条记录
+        """
+        params = (start_date, end_date or "9999-12-31")
+        if latest:
+            sql = """
+                SELECT date, time, type, site_id, site, status, retry FROM signin_log
+                WHERE id IN (SELECT MAX(id) FROM signin_log WHERE date >= ? AND date <= ?
+                             GROUP BY date, type, site)
+                ORDER BY id
+            """
+        else:
+            sql = """
+                SELECT date, time, type, site_id, site, status, retry FROM signin_log
+                WHERE date >= ? AND date <= ? ORDER BY id
+            """
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            return [{
+                "date": date,
+                "time": record_time,
+                "type": type_str,
+                "site_id": site_id,
+                "site": site,
+                "status": status,
+                "retry": bool(retry)
+            } for date, record_time, type_str, site_id, site, status, retry in cursor]
+
+    def get_site_states(self, date: str, type_str: str) -> Dict[str, bool]:
+        """
+        获取指定日期已签到|登录的站点，以最后一次记录为准
+        :return: 站点ID -> 是否需要重试
+        """
+        with self._lock:
+            cursor = self._conn.execute("""
+                SELECT site_id, retry FROM signin_log
+                WHERE date = ? AND type = ? AND site_id IS NOT NULL ORDER BY id
+            """, (date, type_str))
+            return {site_id: bool(retry) for site_id, retry in cursor}
+
+    def purge(self, keep_days: int) -> int:
+        """
+        清理保留天数之前的记录
+        """
+        before = (datetime.now() - timedelta(days=max(keep_days, 1) - 1)).strftime('%Y-%m-%d')
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM signin_log WHERE date < ?", (before,)).rowcount
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+            return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
@@ -1,9 +1,13 @@
 # -*- coding: utf-8 -*-
 import re
+import threading
 from abc import ABCMeta, abstractmethod
-from typing import Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Tuple
 
 import chardet
+from requests import Session
 from ruamel.yaml import CommentedMap
 
 from app.core.config import settings
@@ -12,6 +16,44 @@ from app.log import logger
 from app.utils.http import RequestUtils
 from app.utils.string import StringUtils
 
+# 当前站点签到流程共用的会话
+_site_session: ContextVar[Optional[Session]] = ContextVar("autosignin_site_session", default=None)
+# 当前站点签到流程的取消标志，站点超时后由签到引擎设置
+_site_cancel_event: ContextVar[Optional[threading.Event]] = ContextVar("autosignin_site_cancel_event",
+                                                                      default=None)
+
+
+@contextmanager
+def site_session(cancel_event: Optional[threading.Event] = None):
+    """
+    为当前线程中执行的站点签到流程绑定会话，同一站点的多步请求复用连接
+    :param cancel_event: 取消标志，设置后站点签到流程应尽快结束，不再发起新的请求
+    """
+    session = Session()
+    token = _site_session.set(session)
+    cancel_token = _site_cancel_event.set(cancel_event)
+    try:
+        yield session
+    finally:
+        _site_cancel_event.reset(cancel_token)
+        _site_session.reset(token)
+        session.close()
+
+
+def get_site_session() -> Optional[Session]:
+    """
+    获取当前站点签到流程的会话，未绑定时返回None
+    """
+    return _site_session.get()
+
+
+def is_site_cancelled() -> bool:
+    """
+    当前站点签到流程是否已被取消（超时）
+    """
+    cancel_event = _site_cancel_event.get()
+    return bool(cancel_event and cancel_event.is_set())
+
 
 class _ISiteSigninHandler(metaclass=ABCMeta):
     """
@@ -41,6 +83,20 @@ class _ISiteSigninHandler(metaclass=ABCMeta):
         """
         pass
 
+    @staticmethod
+    def get_session() -> Optional[Session]:
+        """
+        获取当前站点签到流程共用的会话，请求站点时传入RequestUtils以复用连接
+        """
+        return get_site_session()
+
+    @staticmethod
+    def is_cancelled() -> bool:
+        """
+        当前站点签到流程是否已超时取消，多步请求的签到实现应在每次请求前检查
+        """
+        return is_site_cancelled()
+
     @staticmethod
     def get_page_source(url: str, cookie: str, ua: str, proxy: bool, render: bool, token: str = None) -> str:
         """
@@ -53,6 +109,9 @@ class _ISiteSigninHandler(metaclass=ABCMeta):
         :param token: JWT Token
         :return: 页面源码，错误信息
         """
+        # 已超时取消的站点不再请求
+        if is_site_cancelled():
+            return ""
         if render:
             return PlaywrightHelper().get_page_source(url=url,
                                                       cookies=cookie,
@@ -70,7 +129,8 @@ class _ISiteSigninHandler(metaclass=ABCMeta):
                     "Cookie": cookie
                 }
             res = RequestUtils(headers=headers,
-                               proxies=settings.PROXY if proxy else None).get_res(url=url)
+                               proxies=settings.PROXY if proxy else None,
+                               session=get_site_session()).get_res(url=url)
             if res is not None:
                 # 使用chardet检测字符编码
                 raw_data = res.content
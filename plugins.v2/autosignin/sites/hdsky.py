@@ -73,7 +73,8 @@ class HDSky(_ISiteSigninHandler):
                                      content_type='application/x-www-form-urlencoded; charset=UTF-8',
                                      referer="https://hdsky.me/index.php",
                                      accept_type="*/*",
-                                     proxies=settings.PROXY if proxy else None
+                                     proxies=settings.PROXY if proxy else None,
+                                     session=self.get_session()
                                      ).post_res(url='https://hdsky.me/image_code_ajax.php',
                                                 data={'action': 'new'})
             if image_res and image_res.status_code == 200:
@@ -119,7 +120,8 @@ class HDSky(_ISiteSigninHandler):
                 res = RequestUtils(cookies=site_cookie,
                                    ua=ua,
                                    referer=referer,
-                                   proxies=settings.PROXY if proxy else None
+                                   proxies=settings.PROXY if proxy else None,
+                                   session=self.get_session()
                                    ).post_res(url='https://hdsky.me/showup.php', data=data)
                 if res and res.status_code == 200:
                     if json.loads(res.text)["success"]:
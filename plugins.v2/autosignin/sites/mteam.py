@@ -43,7 +43,8 @@ class MTorrent(_ISiteSigninHandler):
         res = RequestUtils(headers=headers,
                            timeout=60,
                            proxies=settings.PROXY if site_info.get("proxy") else None,
-                           referer=f"{url}index"
+                           referer=f"{url}index",
+                           session=self.get_session()
                            ).post_res(url=f"https://api.{domain}/api/member/updateLastBrowse")
         if res:
             return True, "模拟登录成功"
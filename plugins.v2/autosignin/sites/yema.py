@@ -40,7 +40,8 @@ class YemaPT(_ISiteSigninHandler):
                             timeout=15,
                             cookies=site_info.get("cookie"),
                             proxies=settings.PROXY if site_info.get("proxy") else None,
-                            referer=site_info.get('url')
+                            referer=site_info.get('url'),
+                            session=self.get_session()
                             ).get_res(urljoin(site_info.get('url'), "api/consumer/checkIn")))
 
         if res and res.json().get("success"):
@@ -67,7 +68,8 @@ class YemaPT(_ISiteSigninHandler):
                             timeout=15,
                             cookies=site_info.get("cookie"),
                             proxies=settings.PROXY if site_info.get("proxy") else None,
-                            referer=site_info.get('url')
+                            referer=site_info.get('url'),
+                            session=self.get_session()
                             ).get_res(urljoin(site_info.get('url'), "api/user/profile")))
 
         if res and res.json().get("success"):
@@ -1,19 +1,22 @@
 import base64
+import hashlib
 import json
 import random
 import re
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
-from typing import Any, List, Dict, Tuple, Optional, Union, Set
+from typing import Any, List, Dict, Tuple, Optional, Union, Set, Iterable
 from urllib.parse import urlparse, parse_qs, unquote, parse_qsl, urlencode, urlunparse
 
 import pytz
 from app.helper.sites import SitesHelper
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from bencode import bdecode, bencode
+from requests import Session
 
-from app import schemas
 from app.chain.torrents import TorrentsChain
 from app.core.config import settings
 from app.core.context import MediaInfo
@@ -25,6 +28,13 @@ from app.log import logger
 from app.modules.qbittorrent import Qbittorrent
 from app.modules.transmission import Transmission
 from app.plugins import _PluginBase
+from app.plugins.brushflow.bandwidth import BandwidthSampler
+from app.plugins.brushflow.brush_filter import BrushTorrentFilter
+from app.plugins.brushflow.delete_planner import DeleteCandidate, plan_delete
+from app.plugins.brushflow.task_store import BrushTaskStore, BrushTaskIndex
+from app.plugins.brushflow.title_matcher import SubscribeTitleMatcher
+from app.plugins.brushflow.torrent_mirror import QbTorrentMirror
+from app import schemas
 from app.schemas import NotificationType, TorrentInfo, MediaType, ServiceInfo
 from app.schemas.types import EventType
 from app.utils.http import RequestUtils
@@ -71,12 +81,18 @@ class BrushConfig:
         self.delete_except_tags = config.get("delete_except_tags")
         self.except_subscribe = config.get("except_subscribe", True)
         self.brush_sequential = config.get("brush_sequential", False)
+        self.brush_concurrent = config.get("brush_concurrent", False)
+        self.brush_workers = self.__parse_number(config.get("brush_workers"))
+        self.brush_site_timeout = self.__parse_number(config.get("brush_site_timeout"))
+        self.check_incremental = config.get("check_incremental", False)
         self.proxy_delete = config.get("proxy_delete", False)
         self.active_time_range = config.get("active_time_range")
         self.cron = config.get("cron")
         self.qb_category = config.get("qb_category")
         self.site_hr_active = config.get("site_hr_active", False)
         self.site_skip_tips = config.get("site_skip_tips", False)
+        self.bandwidth_window = self.__parse_number(config.get("bandwidth_window"))
+        self.bandwidth_interval = self.__parse_number(config.get("bandwidth_interval"))
 
         self.brush_tag = "刷流"
         # 站点独立配置
@@ -251,7 +267,7 @@ class BrushFlow(_PluginBase):
     # 插件图标
     plugin_icon = "brush.jpg"
     # 插件版本
-    plugin_version = "4.3.1"
+    plugin_version = "4.9.4"
     # 插件作者
     plugin_author = "jxxghp,InfinityPacer"
     # 作者主页
@@ -271,10 +287,22 @@ class BrushFlow(_PluginBase):
     downloader_helper = None
     # 刷流配置
     _brush_config = None
+    # 刷流任务存储
+    _task_store: Optional[BrushTaskStore] = None
+    # 带宽采样器
+    _bandwidth_sampler: Optional[BandwidthSampler] = None
+    # 预编译的站点刷流过滤器，配置变更时失效
+    _brush_filters: Dict[Optional[str], BrushTorrentFilter] = {}
+    # 插件详情页最多加载的任务数
+    _page_rows = 500
+    # qBittorrent种子状态增量镜像
+    _torrent_mirror: Optional[QbTorrentMirror] = None
     # Brush任务是否启动
     _task_brush_enable = False
     # 订阅缓存信息
     _subscribe_infos = None
+    # 订阅标题匹配器，订阅标题变化时重建
+    _subscribe_matcher: Optional[SubscribeTitleMatcher] = None
     # Brush定时
     _brush_interval = 10
     # Check定时
@@ -294,6 +322,7 @@ class BrushFlow(_PluginBase):
         self.subscribe_oper = SubscribeOper()
         self.downloader_helper = DownloaderHelper()
         self._task_brush_enable = False
+        self.__init_task_store()
 
         if not config:
             logger.info("站点刷流任务出错，无法获取插件配置")
@@ -352,6 +381,13 @@ class BrushFlow(_PluginBase):
         if not self.service_info:
             return
 
+        # 启动带宽后台采样，刷流时直接读取滚动窗口内的平均带宽
+        if self._task_brush_enable:
+            self._bandwidth_sampler = BandwidthSampler(sample_func=self.__sample_bandwidth,
+                                                       window=brush_config.bandwidth_window,
+                                                       interval=brush_config.bandwidth_interval)
+            self._bandwidth_sampler.start()
+
         # 检查是否启用了一次性任务
         if brush_config.onlyonce:
             self._scheduler = BackgroundScheduler(timezone=settings.TZ)
@@ -413,7 +449,29 @@ class BrushFlow(_PluginBase):
         pass
 
     def get_api(self) -> List[Dict[str, Any]]:
-        pass
+        """
+        获取插件API
+        [{
+            "path": "/xx",
+            "endpoint": self.xxx,
+            "methods": ["GET", "POST"],
+            "summary": "API说明"
+        }]
+        """
+        return [
+            {
+                "path": "/delete_plan",
+                "endpoint": self.delete_plan,
+                "methods": ["GET"],
+                "summary": "动态删种预演，返回删种计划但不执行删除"
+            },
+            {
+                "path": "/tasks",
+                "endpoint": self.get_tasks_page,
+                "methods": ["GET"],
+                "summary": "分页查询刷流任务，支持按站点、状态、标题筛选及排序"
+            }
+        ]
 
     def get_service(self) -> List[Dict[str, Any]]:
         """
@@ -802,8 +860,89 @@ class BrushFlow(_PluginBase):
                 'content': self.__get_total_elements()
             }
         ]
+        # 带宽采样
+        bandwidth_elements = self.__get_bandwidth_elements()
+        if bandwidth_elements:
+            elements.append({
+                'component': 'VRow',
+                'content': bandwidth_elements
+            })
         return cols, attrs, elements
 
+    def __get_bandwidth_elements(self) -> List[dict]:
+        """
+        组装带宽采样图表元素
+        """
+        if not self._bandwidth_sampler:
+            return []
+        samples = self._bandwidth_sampler.get_samples()
+        if not any(samples.values()):
+            return []
+
+        series = []
+        for name, downloader_samples in samples.items():
+            series.append({
+                'name': f'{name} 上传',
+                'data': [[int(sample[0] * 1000), round(sample[1] / 1024, 1)] for sample in downloader_samples]
+            })
+            series.append({
+                'name': f'{name} 下载',
+                'data': [[int(sample[0] * 1000), round(sample[2] / 1024, 1)] for sample in downloader_samples]
+            })
+
+        avg_upload_speed, avg_download_speed = self._bandwidth_sampler.get_average()
+        return [
+            {
+                'component': 'VCol',
+                'props': {
+                    'cols': 12
+                },
+                'content': [
+                    {
+                        'component': 'VApexChart',
+                        'props': {
+                            'height': 240,
+                            'options': {
+                                'chart': {
+                                    'type': 'line',
+                                    'toolbar': {
+                                        'show': False
+                                    }
+                                },
+                                'title': {
+                                    'text': f'带宽采样（近 {self._bandwidth_sampler.window} 秒）平均上传 '
+                                            f'{StringUtils.str_filesize(avg_upload_speed or 0)}/s，平均下载 '
+                                            f'{StringUtils.str_filesize(avg_download_speed or 0)}/s'
+                                },
+                                'xaxis': {
+                                    'type': 'datetime',
+                                    'labels': {
+                                        'datetimeUTC': False
+                                    }
+                                },
+                                'yaxis': {
+                                    'title': {
+                                        'text': 'KB/s'
+                                    }
+                                },
+                                'stroke': {
+                                    'curve': 'smooth',
+                                    'width': 2
+                                },
+                                'legend': {
+                                    'show': True
+                                },
+                                'noData': {
+                                    'text': '暂无数据'
+                                }
+                            },
+                            'series': series
+                        }
+                    }
+                ]
+            }
+        ]
+
     def get_form(self) -> Tuple[List[dict], Dict[str, Any]]:
         """
         拼装插件配置页面，需要返回两块数据：1、页面配置；2、数据结构
@@ -1194,6 +1333,49 @@ class BrushFlow(_PluginBase):
                                                 ]
                                             }
                                         ]
+                                    },
+                                    {
+                                        'component': 'VRow',
+                                        'content': [
+                                            {
+                                                'component': 'VCol',
+                                                'props': {
+                                                    'cols': 12,
+                                                    'md': 4
+                                                },
+                                                'content': [
+                                                    {
+                                                        'component': 'VTextField',
+                                                        'props': {
+                                                            'model': 'bandwidth_window',
+                                                            'label': '带宽采样窗口（秒）',
+                                                            'placeholder': '按此时长计算平均带宽',
+                                                            'type': 'number',
+                                                            "min": "1"
+                                                        }
+                                                    }
+                                                ]
+                                            },
+                                            {
+                                                'component': 'VCol',
+                                                'props': {
+                                                    'cols': 12,
+                                                    'md': 4
+                                                },
+                                                'content': [
+                                                    {
+                                                        'component': 'VTextField',
+                                                        'props': {
+                                                            'model': 'bandwidth_interval',
+                                                            'label': '带宽采样间隔（秒）',
+                                                            'placeholder': '后台采样下载器带宽的间隔',
+                                                            'type': 'number',
+                                                            "min": "1"
+                                                        }
+                                                    }
+                                                ]
+                                            }
+                                        ]
                                     }
                                 ]
                             },
@@ -1621,6 +1803,86 @@ class BrushFlow(_PluginBase):
                                                 ]
                                             }
                                         ]
+                                    },
+                                    {
+                                        'component': 'VRow',
+                                        'content': [
+                                            {
+                                                'component': 'VCol',
+                                                'props': {
+                                                    'cols': 12,
+                                                    'md': 4
+                                                },
+                                                'content': [
+                                                    {
+                                                        'component': 'VSwitch',
+                                                        'props': {
+                                                            'model': 'brush_concurrent',
+                                                            'label': '站点并发获取种子',
+                                                        }
+                                                    }
+                                                ]
+                                            },
+                                            {
+                                                'component': 'VCol',
+                                                'props': {
+                                                    'cols': 12,
+                                                    'md': 4
+                                                },
+                                                'content': [
+                                                    {
+                                                        'component': 'VTextField',
+                                                        'props': {
+                                                            'model': 'brush_workers',
+                                                            'label': '并发站点数',
+                                                            'placeholder': '同时获取种子的站点数上限',
+                                                            'type': 'number',
+                                                            "min": "1"
+                                                        }
+                                                    }
+                                                ]
+                                            },
+                                            {
+                                                'component': 'VCol',
+                                                'props': {
+                                                    'cols': 12,
+                                                    'md': 4
+                                                },
+                                                'content': [
+                                                    {
+                                                        'component': 'VTextField',
+                                                        'props': {
+                                                            'model': 'brush_site_timeout',
+                                                            'label': '站点获取超时时间（秒）',
+                                                            'placeholder': '超时后跳过该站点',
+                                                            'type': 'number',
+                                                            "min": "1"
+                                                        }
+                                                    }
+                                                ]
+                                            }
+                                        ]
+                                    },
+                                    {
+                                        'component': 'VRow',
+                                        'content': [
+                                            {
+                                                'component': 'VCol',
+                                                'props': {
+                                                    'cols': 12,
+                                                    'md': 4
+                                                },
+                                                'content': [
+                                                    {
+                                                        'component': 'VSwitch',
+                                                        'props': {
+                                                            'model': 'check_incremental',
+                                                            'label': '增量检查种子状态（仅QB）',
+                                                        }
+                                                    }
+                                                ]
+                                            }
+                                        ]
                                     }
                                 ]
                             }
@@ -1793,18 +2055,25 @@ class BrushFlow(_PluginBase):
             "delete_except_tags": f"{settings.TORRENT_TAG},H&R" if settings.TORRENT_TAG else "H&R",
             "except_subscribe": True,
             "brush_sequential": False,
+            "brush_concurrent": False,
+            "brush_workers": 5,
+            "brush_site_timeout": 60,
+            "check_incremental": False,
             "proxy_delete": False,
             "freeleech": "free",
             "hr": "yes",
+            "bandwidth_window": 60,
+            "bandwidth_interval": 5,
             "enable_site_config": False,
             "site_config": BrushConfig.get_demo_site_config()
         }
 
     def get_page(self) -> List[dict]:
-        # 种子明细
-        torrents = self.get_data("torrents") or {}
+        # 种子明细，按time倒序仅加载最近的任务，完整数据通过分页API获取
+        summary, data_list = self._task_store.query_tasks(limit=self._page_rows) \
+            if self._task_store else ({"total": 0}, [])
 
-        if not torrents:
+        if not data_list:
             return [
                 {
                     'component': 'div',
@@ -1814,10 +2083,6 @@ class BrushFlow(_PluginBase):
                     }
                 }
             ]
-        else:
-            data_list = torrents.values()
-            # 按time倒序排序
-            data_list = sorted(data_list, key=lambda x: x.get("time") or 0, reverse=True)
 
         # 表格标题
         headers = [
@@ -1830,17 +2095,29 @@ class BrushFlow(_PluginBase):
             {'title': '状态', 'key': 'status', 'sortable': True},
         ]
         # 种子数据明细
-        items = [
-            {
-                'site': data.get("site_name"),
-                'title': data.get("title"),
-                'size': StringUtils.str_filesize(data.get("size")),
-                'uploaded': StringUtils.str_filesize(data.get("uploaded") or 0),
-                'downloaded': StringUtils.str_filesize(data.get("downloaded") or 0),
-                'ratio': round(data.get('ratio') or 0, 2),
-                'status': "已删除" if data.get("deleted") else "正常"
-            } for data in data_list
-        ]
+        items = [self.__format_task_item(data) for data in data_list]
+        # 超出加载数量时提示
+        if summary.get("total", 0) > len(items):
+            captions = [
+                {
+                    'component': 'VCol',
+                    'props': {
+                        'cols': 12,
+                    },
+                    'content': [
+                        {
+                            'component': 'div',
+                            'props': {
+                                'class': 'text-caption',
+                            },
+                            'text': f'共 {summary.get("total")} 个刷流任务，当前仅显示最近 {len(items)} 个，'
+                                    f'完整数据请通过插件API /tasks 分页查询'
+                        }
+                    ]
+                }
+            ]
+        else:
+            captions = []
 
         # 拼装页面
         return [
@@ -1864,7 +2141,7 @@ class BrushFlow(_PluginBase):
                                 'props': {
                                     'cols': 12,
                                 },
-                                'content': [
+                                'content': captions + [
                                     {
                                         'component': 'VDataTableVirtual',
                                         'props': {
@@ -1886,11 +2163,67 @@ class BrushFlow(_PluginBase):
             }
         ]
 
+    @staticmethod
+    def __format_task_item(data: dict) -> dict:
+        """
+        格式化任务明细行
+        """
+        return {
+            'hash': data.get("hash"),
+            'site': data.get("site_name"),
+            'title': data.get("title"),
+            'size': StringUtils.str_filesize(data.get("size")),
+            'uploaded': StringUtils.str_filesize(data.get("uploaded") or 0),
+            'downloaded': StringUtils.str_filesize(data.get("downloaded") or 0),
+            'ratio': round(data.get('ratio') or 0, 2),
+            'status': "已删除" if data.get("deleted") else "正常"
+        }
+
+    def get_tasks_page(self, apikey: str, page: int = 1, page_size: int = 50, site: Optional[str] = None,
+                       status: Optional[str] = None, title: Optional[str] = None, sort_by: str = "time",
+                       desc: bool = True) -> schemas.Response:
+        """
+        分页查询刷流任务，可由API调用
+        :param status: normal 正常，deleted 已删除，为空时不限
+        :param sort_by: time/site/title/size/uploaded/downloaded/ratio/status
+        """
+        if apikey != settings.API_TOKEN:
+            return schemas.Response(success=False, message="API密钥错误")
+        if not self._task_store:
+            return schemas.Response(success=False, message="刷流任务存储未初始化")
+
+        page = max(1, int(page or 1))
+        page_size = min(max(1, int(page_size or 50)), 500)
+        if status == "normal":
+            deleted = False
+        elif status == "deleted":
+            deleted = True
+        else:
+            deleted = None
+        summary, data_list = self._task_store.query_tasks(site_name=site, deleted=deleted, title=title,
+                                                          sort_by=sort_by, desc=desc,
+                                                          offset=(page - 1) * page_size, limit=page_size)
+        return schemas.Response(success=True, data={
+            "page": page,
+            "page_size": page_size,
+            "total": summary.get("total"),
+            "summary": {
+                "size": StringUtils.str_filesize(summary.get("size") or 0),
+                "uploaded": StringUtils.str_filesize(summary.get("uploaded") or 0),
+                "downloaded": StringUtils.str_filesize(summary.get("downloaded") or 0)
+            },
+            "sites": self._task_store.get_site_names(),
+            "items": [self.__format_task_item(data) for data in data_list]
+        })
+
     def stop_service(self):
         """
         退出插件
         """
         try:
+            if self._bandwidth_sampler:
+                self._bandwidth_sampler.stop()
+                self._bandwidth_sampler = None
             if self._scheduler:
                 self._scheduler.remove_all_jobs()
                 if self._scheduler.running:
@@ -1919,7 +2252,7 @@ class BrushFlow(_PluginBase):
         with lock:
             logger.info(f"开始执行刷流任务 ...")
 
-            torrent_tasks: Dict[str, dict] = self.get_data("torrents") or {}
+            torrent_tasks: Dict[str, dict] = self._task_store.get_tasks()
             torrents_size = self.__calculate_seeding_torrents_size(torrent_tasks=torrent_tasks)
 
             # 判断能否通过保种体积前置条件
@@ -1951,38 +2284,48 @@ class BrushFlow(_PluginBase):
 
             logger.info(f"即将针对站点 {', '.join(site.name for site in site_infos)} 开始刷流")
 
-            # 获取订阅标题
-            subscribe_titles = self.__get_subscribe_titles()
+            # 获取订阅标题匹配器
+            subscribe_matcher = self.__get_subscribe_matcher()
+
+            # 构建重复种子索引，新增任务时同步更新
+            task_index = BrushTaskIndex(torrent_tasks=torrent_tasks)
+
+            # 开启站点并发获取种子时，先并发获取所有站点的种子列表，再按站点顺序依次处理
+            site_torrents = self.__prefetch_site_torrents(site_infos=site_infos) \
+                if brush_config.brush_concurrent else None
 
             # 处理所有站点
             for site in site_infos:
                 # 如果站点刷流没有正确响应，说明没有通过前置条件，其他站点也不需要继续刷流了
                 if not self.__brush_site_torrents(siteid=site.id, torrent_tasks=torrent_tasks,
                                                   statistic_info=statistic_info,
-                                                  subscribe_titles=subscribe_titles):
+                                                  subscribe_matcher=subscribe_matcher,
+                                                  task_index=task_index,
+                                                  torrents=site_torrents.get(site.id, [])
+                                                  if site_torrents is not None else None):
                     logger.info(f"站点 {site.name} 刷流中途结束，停止后续刷流")
                     break
                 else:
                     logger.info(f"站点 {site.name} 刷流完成")
 
-            # 保存数据
-            self.save_data("torrents", torrent_tasks)
-            # 保存统计数据
+            # 保存统计数据，任务数据已在新增时逐条写入
             self.save_data("statistic", statistic_info)
             logger.info(f"刷流任务执行完成")
 
     def __brush_site_torrents(self, siteid, torrent_tasks: Dict[str, dict], statistic_info: Dict[str, int],
-                              subscribe_titles: Set[str]) -> bool:
+                              subscribe_matcher: SubscribeTitleMatcher, task_index: BrushTaskIndex,
+                              torrents: Optional[List[TorrentInfo]] = None) -> bool:
         """
-        针对站点进行刷流
+        针对站点进行刷流，torrents 为预先获取的站点种子，为None时实时获取
         """
         siteinfo = self.site_oper.get(siteid)
         if not siteinfo:
             logger.warning(f"站点不存在：{siteid}")
             return True
 
-        logger.info(f"开始获取站点 {siteinfo.name} 的新种子 ...")
-        torrents = self.torrents_chain.browse(domain=siteinfo.domain)
+        if torrents is None:
+            logger.info(f"开始获取站点 {siteinfo.name} 的新种子 ...")
+            torrents = self.torrents_chain.browse(domain=siteinfo.domain)
         if not torrents:
             logger.info(f"站点 {siteinfo.name} 没有获取到种子")
             return True
@@ -1994,7 +2337,8 @@ class BrushFlow(_PluginBase):
 
         # 排除包含订阅的种子
         if brush_config.except_subscribe:
-            torrents = self.__filter_torrents_contains_subscribe(torrents=torrents, subscribe_titles=subscribe_titles)
+            torrents = self.__filter_torrents_contains_subscribe(torrents=torrents,
+                                                                 subscribe_matcher=subscribe_matcher)
 
         # 按发布日期降序排列
         torrents.sort(key=lambda x: x.pubdate or '', reverse=True)
@@ -2003,13 +2347,20 @@ class BrushFlow(_PluginBase):
 
         logger.info(f"正在准备种子刷流，数量 {len(torrents)}")
 
+        # 当前正在下载的任务数，仅查询一次，后续叠加本次选中的种子数
+        downloading_count = self.__get_downloading_count()
+        # 本次选中的种子及对应的刷流任务，过滤完成后统一批量添加下载
+        selected_torrents: List[Tuple[TorrentInfo, dict]] = []
+        pre_condition_passed = True
+
         # 过滤种子
         for torrent in torrents:
             # 判断能否通过刷流前置条件
-            pre_condition_passed, reason = self.__evaluate_pre_conditions_for_brush(include_network_conditions=False)
+            pre_condition_passed, reason = self.__evaluate_pre_conditions_for_brush(
+                include_network_conditions=False, downloading_count=downloading_count + len(selected_torrents))
             self.__log_brush_conditions(passed=pre_condition_passed, reason=reason)
             if not pre_condition_passed:
-                return False
+                break
 
             logger.debug(f"种子详情：{torrent}")
 
@@ -2022,17 +2373,11 @@ class BrushFlow(_PluginBase):
 
             # 判断能否通过刷流条件
             condition_passed, reason = self.__evaluate_conditions_for_brush(torrent=torrent,
-                                                                            torrent_tasks=torrent_tasks)
+                                                                            task_index=task_index)
             self.__log_brush_conditions(passed=condition_passed, reason=reason, torrent=torrent)
             if not condition_passed:
                 continue
 
-            # 添加下载任务
-            hash_string = self.__download(torrent=torrent)
-            if not hash_string:
-                logger.warning(f"{torrent.title} 添加刷流任务失败！")
-                continue
-
             # 触发刷流下载时间并保存任务信息
             torrent_task = {
                 "site": siteinfo.id,
@@ -2068,6 +2413,22 @@ class BrushFlow(_PluginBase):
                 "deleted": False,
                 "time": time.time()
             }
+            # 选中的种子先预占，同样参与后续的重复判断及保种体积计算，添加下载失败时撤销
+            task_index.add(torrent_task)
+            torrents_size += torrent.size
+            selected_torrents.append((torrent, torrent_task))
+
+        # 批量添加下载任务
+        hash_strings = self.__download_torrents(torrents=[torrent for torrent, _ in selected_torrents])
+        added_tasks = {}
+        for torrent, torrent_task in selected_torrents:
+            hash_string = hash_strings.get(id(torrent))
+            if not hash_string:
+                logger.warning(f"{torrent.title} 添加刷流任务失败！")
+                # 撤销预占的去重索引及保种体积
+                task_index.remove(torrent_task)
+                torrents_size -= torrent.size
+                continue
 
             self.eventmanager.send_event(etype=EventType.PluginTriggered, data={
                 "plugin_id": self.__class__.__name__,
@@ -2077,14 +2438,71 @@ class BrushFlow(_PluginBase):
                 "downloader": self.service_info.name
             })
             torrent_tasks[hash_string] = torrent_task
+            added_tasks[hash_string] = torrent_task
 
             # 统计数据
-            torrents_size += torrent.size
             statistic_info["count"] += 1
             logger.info(f"站点 {siteinfo.name}，新增刷流种子下载：{torrent.title}|{torrent.description}")
             self.__send_add_message(torrent)
+        self._task_store.upsert_tasks(added_tasks)
+        if selected_torrents:
+            logger.info(f"站点 {siteinfo.name} 选中 {len(selected_torrents)} 个种子，成功添加 {len(added_tasks)} 个，"
+                        f"当前做种体积 {self.__bytes_to_gb(torrents_size):.1f} GB")
 
-        return True
+        logger.info(f"站点 {siteinfo.name} 刷流条件过滤统计，{self.__get_brush_filter(siteinfo.name).summary()}")
+
+        # 如果没有通过前置条件，其他站点也不需要继续刷流了
+        return pre_condition_passed
+
+    def __prefetch_site_torrents(self, site_infos: List[Any]) -> Dict[int, List[TorrentInfo]]:
+        """
+        并发获取站点种子列表，限制并发站点数，超过站点获取超时时间的站点将被跳过
+        """
+        brush_config = self.__get_brush_config()
+        if not site_infos:
+            return {}
+
+        max_workers = max(1, min(int(brush_config.brush_workers or 5), len(site_infos)))
+        site_timeout = float(brush_config.brush_site_timeout or 60)
+        logger.info(f"开始并发获取站点种子，站点数 {len(site_infos)}，并发数 {max_workers}，"
+                    f"单站点超时时间 {site_timeout:.0f} 秒 ...")
+
+        # 记录每个站点实际开始获取的时间，排队中的站点不计入超时
+        started_times: Dict[int, float] = {}
+
+        def browse_site(site):
+            started_times[site.id] = time.time()
+            return self.torrents_chain.browse(domain=site.domain)
+
+        site_torrents: Dict[int, List[TorrentInfo]] = {}
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="BrushFlowBrowse")
+        try:
+            futures: Dict[Future, Any] = {executor.submit(browse_site, site): site for site in site_infos}
+            pending = set(futures)
+            # 兜底截止时间，避免所有并发线程均被卡住时排队站点无法开始
+            deadline = time.time() + site_timeout * ((len(site_infos) + max_workers - 1) // max_workers) + 1
+            while pending and not self._event.is_set():
+                done, pending = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    site = futures[future]
+                    try:
+                        site_torrents[site.id] = future.result() or []
+                        logger.info(f"站点 {site.name} 获取种子完成，数量 {len(site_torrents[site.id])}，"
+                                    f"耗时 {time.time() - started_times.get(site.id, time.time()):.1f} 秒")
+                    except Exception as e:
+                        logger.error(f"站点 {site.name} 获取种子失败：{e}")
+                now = time.time()
+                for future in list(pending):
+                    site = futures[future]
+                    started_time = started_times.get(site.id)
+                    if now > deadline or (started_time and now - started_time > site_timeout):
+                        pending.discard(future)
+                        future.cancel()
+                        logger.warning(f"站点 {site.name} 获取种子超时，跳过该站点")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return site_torrents
 
     def __evaluate_size_condition_for_brush(self, torrents_size: float,
                                             add_torrent_size: float = 0.0) -> Tuple[bool, Optional[str]]:
@@ -2131,13 +2549,14 @@ class BrushFlow(_PluginBase):
 
         return True, None
 
-    def __evaluate_pre_conditions_for_brush(self, include_network_conditions: bool = True) \
-            -> Tuple[bool, Optional[str]]:
+    def __evaluate_pre_conditions_for_brush(self, include_network_conditions: bool = True,
+                                            downloading_count: Optional[int] = None) -> Tuple[bool, Optional[str]]:
         """
-        前置过滤不符合条件的种子
+        前置过滤不符合条件的种子，downloading_count 为已知的下载任务数，为None时从下载器获取
         """
         reasons = [
-            ("maxdlcount", lambda config: self.__get_downloading_count() >= int(config),
+            ("maxdlcount", lambda config: (self.__get_downloading_count() if downloading_count is None
+                                           else downloading_count) >= int(config),
              lambda config: f"当前同时下载任务数已达到最大值 {config}，暂时停止新增任务")
         ]
 
@@ -2163,91 +2582,27 @@ class BrushFlow(_PluginBase):
 
         return True, None
 
-    def __evaluate_conditions_for_brush(self, torrent, torrent_tasks) -> Tuple[bool, Optional[str]]:
+    def __evaluate_conditions_for_brush(self, torrent, task_index: BrushTaskIndex) -> Tuple[bool, Optional[str]]:
         """
         过滤不符合条件的种子
         """
-        brush_config = self.__get_brush_config(torrent.site_name)
-
         # 排除重复种子
         # 默认根据标题和站点名称进行排除
-        task_key = f"{torrent.site_name}{torrent.title}"
-        if any(task_key == f"{task.get('site_name')}{task.get('title')}" for task in torrent_tasks.values()):
+        if task_index.contains_title(site_name=torrent.site_name, title=torrent.title):
             return False, "重复种子"
 
         # 部分站点标题会上新时携带后缀，这里进一步根据种子详情地址进行排除
         if torrent.page_url:
-            task_page_url = f"{torrent.site_name}{torrent.page_url}"
-            if any(task_page_url == f"{task.get('site_name')}{task.get('page_url')}" for task in
-                   torrent_tasks.values()):
+            if task_index.contains_page_url(site_name=torrent.site_name, page_url=torrent.page_url):
                 return False, "重复种子"
 
         # 不同站点如果遇到相同种子，判断前一个种子是否已经在做种，否则排除处理
         if torrent.title:
-            if any(torrent.site_name != f"{task.get('site_name')}" and torrent.title == f"{task.get('title')}"
-                   and not task.get("seed_time") for task in torrent_tasks.values()):
+            if task_index.has_unfinished_on_other_site(site_name=torrent.site_name, title=torrent.title):
                 return False, "其他站点存在尚未下载完成的相同种子"
 
-        # 促销条件
-        if brush_config.freeleech and torrent.downloadvolumefactor != 0:
-            return False, "非免费种子"
-        if brush_config.freeleech == "2xfree" and torrent.uploadvolumefactor != 2:
-            return False, "非双倍上传种子"
-
-        # H&R
-        if brush_config.hr == "yes" and torrent.hit_and_run:
-            return False, "存在H&R"
-
-        # 包含规则
-        if brush_config.include and not (
-                re.search(brush_config.include, torrent.title, re.I) or re.search(brush_config.include,
-                                                                                  torrent.description, re.I)):
-            return False, "不符合包含规则"
-
-        # 排除规则
-        if brush_config.exclude and (
-                re.search(brush_config.exclude, torrent.title, re.I) or re.search(brush_config.exclude,
-                                                                                  torrent.description, re.I)):
-            return False, "符合排除规则"
-
-        # 种子大小（GB）
-        if brush_config.size:
-            sizes = [float(size) * 1024 ** 3 for size in brush_config.size.split("-")]
-            if len(sizes) == 1 and torrent.size < sizes[0]:
-                return False, f"种子大小 {self.__bytes_to_gb(torrent.size):.1f} GB，不符合条件"
-            elif len(sizes) > 1 and not sizes[0] <= torrent.size <= sizes[1]:
-                return False, f"种子大小 {self.__bytes_to_gb(torrent.size):.1f} GB，不在指定范围内"
-
-        # 做种人数
-        if brush_config.seeder:
-            seeders_range = [float(n) for n in brush_config.seeder.split("-")]
-            # 检查是否仅指定了一个数字，即做种人数需要小于等于该数字
-            if len(seeders_range) == 1:
-                # 当做种人数大于该数字时，不符合条件
-                if torrent.seeders > seeders_range[0]:
-                    return False, f"做种人数 {torrent.seeders}，超过单个指定值"
-            # 如果指定了一个范围
-            elif len(seeders_range) > 1:
-                # 检查做种人数是否在指定的范围内（包括边界）
-                if not (seeders_range[0] <= torrent.seeders <= seeders_range[1]):
-                    return False, f"做种人数 {torrent.seeders}，不在指定范围内"
-
-        # 发布时间
-        pubdate_minutes = self.__get_pubminutes(torrent.pubdate)
-        # 已支持独立站点配置，取消单独适配站点时区逻辑，可通过配置项「pubtime」自行适配
-        # pubdate_minutes = self.__adjust_site_pubminutes(pubdate_minutes, torrent)
-        if brush_config.pubtime:
-            pubtimes = [float(n) for n in brush_config.pubtime.split("-")]
-            if len(pubtimes) == 1:
-                # 单个值：选择发布时间小于等于该值的种子
-                if pubdate_minutes > pubtimes[0]:
-                    return False, f"发布时间 {torrent.pubdate}，{pubdate_minutes:.0f} 分钟前，不符合条件"
-            else:
-                # 范围值：选择发布时间在范围内的种子
-                if not (pubtimes[0] <= pubdate_minutes <= pubtimes[1]):
-                    return False, f"发布时间 {torrent.pubdate}，{pubdate_minutes:.0f} 分钟前，不在指定范围内"
-
-        return True, None
+        # 促销、H&R、大小、做种人数、发布时间、包含及排除规则
+        return self.__get_brush_filter(torrent.site_name).evaluate(torrent)
 
     @staticmethod
     def __log_brush_conditions(passed: bool, reason: str, torrent: Any = None):
@@ -2275,11 +2630,11 @@ class BrushFlow(_PluginBase):
 
         with lock:
             logger.info("开始检查刷流下载任务 ...")
-            torrent_tasks: Dict[str, dict] = self.get_data("torrents") or {}
-            unmanaged_tasks: Dict[str, dict] = self.get_data("unmanaged") or {}
+            torrent_tasks: Dict[str, dict] = self._task_store.get_tasks()
+            unmanaged_tasks: Dict[str, dict] = self._task_store.get_tasks(BrushTaskStore.UNMANAGED)
 
             downloader = self.downloader
-            seeding_torrents, error = downloader.get_torrents()
+            seeding_torrents, error = self.__get_check_torrents()
             if error:
                 logger.warning("连接下载器出错，将在下个时间周期重试")
                 return
@@ -2301,7 +2656,8 @@ class BrushFlow(_PluginBase):
             check_torrents = [seeding_torrents_dict[th] for th in torrent_check_hashes if th in seeding_torrents_dict]
 
             # 先更新刷流任务的最新状态，上下传，分享率
-            self.__update_torrent_tasks_state(torrents=check_torrents, torrent_tasks=torrent_tasks)
+            changed_hashes = self.__update_torrent_tasks_state(torrents=check_torrents, torrent_tasks=torrent_tasks)
+            self.__save_tasks(torrent_tasks=torrent_tasks, hashes=changed_hashes)
 
             # 更新刷流任务列表中在下载器中删除的种子为删除状态
             self.__update_undeleted_torrents_missing_in_downloader(torrent_tasks, torrent_check_hashes, check_torrents)
@@ -2355,20 +2711,46 @@ class BrushFlow(_PluginBase):
                         for torrent_hash in need_delete_hashes:
                             torrent_tasks[torrent_hash]["deleted"] = True
                             torrent_tasks[torrent_hash]["deleted_time"] = time.time()
+                        self.__save_tasks(torrent_tasks=torrent_tasks, hashes=need_delete_hashes)
 
             # 归档数据
             self.__auto_archive_tasks(torrent_tasks=torrent_tasks)
 
-            self.__update_and_save_statistic_info(torrent_tasks)
-
-            self.save_data("torrents", torrent_tasks)
+            self.__update_and_save_statistic_info()
 
             logger.info("刷流下载任务检查完成")
 
-    def __update_torrent_tasks_state(self, torrents: List[Any], torrent_tasks: Dict[str, dict]):
+    def __get_check_torrents(self) -> Tuple[Optional[List[Any]], bool]:
         """
-        更新刷流任务的最新状态，上下传，分享率
+        获取下载器中的全部种子，qBittorrent开启增量检查时从本地镜像增量同步，否则获取全量种子列表
         """
+        downloader = self.downloader
+        brush_config = self.__get_brush_config()
+        if not brush_config.check_incremental \
+                or not self.downloader_helper.is_downloader("qbittorrent", service=self.service_info):
+            self._torrent_mirror = None
+            return downloader.get_torrents()
+
+        if not self._torrent_mirror:
+            self._torrent_mirror = QbTorrentMirror()
+        torrents = self._torrent_mirror.sync(qbc=downloader.qbc)
+        if torrents is None:
+            logger.warning("增量同步种子状态失败，回退为获取全量种子列表")
+            return downloader.get_torrents()
+
+        mirror = self._torrent_mirror
+        if mirror.last_full_update:
+            logger.info(f"已全量同步下载器种子状态，共 {len(torrents)} 个种子")
+        else:
+            logger.info(f"已增量同步下载器种子状态，共 {len(torrents)} 个种子，"
+                        f"变化 {mirror.last_changed} 个，移除 {mirror.last_removed} 个")
+        return torrents, False
+
+    def __update_torrent_tasks_state(self, torrents: List[Any], torrent_tasks: Dict[str, dict]) -> List[str]:
+        """
+        更新刷流任务的最新状态，上下传，分享率，返回发生变化的任务Hash
+        """
+        changed_hashes = []
         for torrent in torrents:
             torrent_hash = self.__get_hash(torrent)
             torrent_task = torrent_tasks.get(torrent_hash, None)
@@ -2379,12 +2761,17 @@ class BrushFlow(_PluginBase):
             torrent_info = self.__get_torrent_info(torrent)
 
             # 更新上传量、下载量
-            torrent_task.update({
+            torrent_state = {
                 "downloaded": torrent_info.get("downloaded"),
                 "uploaded": torrent_info.get("uploaded"),
                 "ratio": torrent_info.get("ratio"),
                 "seeding_time": torrent_info.get("seeding_time"),
-            })
+            }
+            if any(torrent_task.get(key) != value for key, value in torrent_state.items()):
+                torrent_task.update(torrent_state)
+                changed_hashes.append(torrent_hash)
+
+        return changed_hashes
 
     def __update_seeding_tasks_based_on_tags(self, torrent_tasks: Dict[str, dict], unmanaged_tasks: Dict[str, dict],
                                              seeding_torrents_dict: Dict[str, Any]):
@@ -2398,6 +2785,9 @@ class BrushFlow(_PluginBase):
         added_tasks = []
         reset_tasks = []
         removed_tasks = []
+        # 需要按行保存的任务
+        changed_hashes = []
+        removed_hashes = []
         # 基于 seeding_torrents_dict 的信息更新或添加到 torrent_tasks
         for torrent_hash, torrent in seeding_torrents_dict.items():
             tags = self.__get_label(torrent=torrent)
@@ -2411,6 +2801,7 @@ class BrushFlow(_PluginBase):
                         torrent_task = unmanaged_tasks.pop(torrent_hash)
                         torrent_tasks[torrent_hash] = torrent_task
                         added_tasks.append(torrent_task)
+                        changed_hashes.append(torrent_hash)
                         logger.info(f"站点 {torrent_task.get('site_name')}，"
                                     f"刷流任务种子再次加入：{torrent_task.get('title')}|{torrent_task.get('description')}")
                     else:
@@ -2418,6 +2809,7 @@ class BrushFlow(_PluginBase):
                         torrent_task = self.__convert_torrent_info_to_task(torrent)
                         torrent_tasks[torrent_hash] = torrent_task
                         added_tasks.append(torrent_task)
+                        changed_hashes.append(torrent_hash)
                         logger.info(f"站点 {torrent_task.get('site_name')}，"
                                     f"刷流任务种子加入：{torrent_task.get('title')}|{torrent_task.get('description')}")
                 # 包含刷流标签又在刷流任务中，这里额外处理一个特殊逻辑，就是种子在刷流任务中可能被标记删除但实际上又还在下载器中，这里进行重置
@@ -2426,6 +2818,7 @@ class BrushFlow(_PluginBase):
                     if torrent_task.get("deleted"):
                         torrent_task["deleted"] = False
                         reset_tasks.append(torrent_task)
+                        changed_hashes.append(torrent_hash)
                         logger.info(
                             f"站点 {torrent_task.get('site_name')}，在下载器中找到已标记删除的刷流任务对应的种子信息，"
                             f"更新刷流任务状态为正常：{torrent_task.get('title')}|{torrent_task.get('description')}")
@@ -2436,11 +2829,12 @@ class BrushFlow(_PluginBase):
                     torrent_task = torrent_tasks.pop(torrent_hash)
                     unmanaged_tasks[torrent_hash] = torrent_task
                     removed_tasks.append(torrent_task)
+                    removed_hashes.append(torrent_hash)
                     logger.info(f"站点 {torrent_task.get('site_name')}，"
                                 f"刷流任务种子移除：{torrent_task.get('title')}|{torrent_task.get('description')}")
 
-        self.save_data("torrents", torrent_tasks)
-        self.save_data("unmanaged", unmanaged_tasks)
+        self.__save_tasks(torrent_tasks=torrent_tasks, hashes=changed_hashes)
+        self._task_store.move_tasks(hashes=removed_hashes, bucket=BrushTaskStore.UNMANAGED)
 
         # 发送汇总消息
         if added_tasks:
@@ -2454,31 +2848,6 @@ class BrushFlow(_PluginBase):
                                                             reason="在下载器中找到已标记删除的刷流任务对应的种子信息",
                                                             torrent_tasks=reset_tasks)
 
-    def __group_torrents_by_proxy_delete(self, torrents: List[Any], torrent_tasks: Dict[str, dict]):
-        """
-        根据是否启用动态删种进行分组
-        """
-        proxy_delete_torrents = []
-        not_proxy_delete_torrents = []
-
-        for torrent in torrents:
-            torrent_hash = self.__get_hash(torrent)
-            torrent_task = torrent_tasks.get(torrent_hash, None)
-
-            # 如果找不到种子任务，说明不在管理的种子范围内，直接跳过
-            if not torrent_task:
-                continue
-
-            site_name = torrent_task.get("site_name", "")
-
-            brush_config = self.__get_brush_config(site_name)
-            if brush_config.proxy_delete:
-                proxy_delete_torrents.append(torrent)
-            else:
-                not_proxy_delete_torrents.append(torrent)
-
-        return proxy_delete_torrents, not_proxy_delete_torrents
-
     def __evaluate_conditions_for_delete(self, site_name: str, torrent_info: dict, torrent_task: dict) \
             -> Tuple[bool, str]:
         """
@@ -2573,42 +2942,119 @@ class BrushFlow(_PluginBase):
 
         return delete_hashes
 
-    def __delete_torrent_for_evaluate_proxy_pre_conditions(self, torrents: List[Any],
-                                                           torrent_tasks: Dict[str, dict]) -> List:
+    def __build_proxy_delete_plan(self, torrents: List[Any], torrent_tasks: Dict[str, dict]) -> Optional[dict]:
         """
-        根据动态删除前置条件排除H&R种子后删除种子并获取已删除列表
+        计算动态删种计划，仅计算需要删除的种子及原因，不执行删除及消息推送
         """
-        delete_hashes = []
+        brush_config = self.__get_brush_config()
+
+        # 如果没有启用动态删除或没有设置删除阈值，则不执行删除操作
+        if not (brush_config.proxy_delete and brush_config.delete_size_range):
+            return None
 
+        # 每个种子仅计算一次Hash及种子信息，不在管理范围内的种子直接跳过
+        torrent_items = []
         for torrent in torrents:
             torrent_hash = self.__get_hash(torrent)
             torrent_task = torrent_tasks.get(torrent_hash, None)
-            # 如果找不到种子任务，说明不在管理的种子范围内，直接跳过
             if not torrent_task:
                 continue
+            torrent_items.append((torrent_hash, torrent_task, self.__get_torrent_info(torrent=torrent)))
 
-            # 如果是H&R种子，前置条件中不进行处理
-            if torrent_task.get('hit_and_run', False):
-                continue
+        # 解析删除阈值范围
+        sizes = [float(size) * 1024 ** 3 for size in brush_config.delete_size_range.split("-")]
+        min_size = sizes[0]  # 至少需要达到的做种体积
+        max_size = sizes[1] if len(sizes) > 1 else sizes[0]  # 触发删除操作的做种体积上限
 
-            site_name = torrent_task.get("site_name", "")
-            torrent_title = torrent_task.get("title", "")
-            torrent_desc = torrent_task.get("description", "")
+        # 计算当前总做种体积
+        total_torrent_size = self.__calculate_seeding_torrents_size(torrent_tasks=torrent_tasks)
 
-            torrent_info = self.__get_torrent_info(torrent)
+        plan = {
+            "seeding_size": total_torrent_size,
+            "min_size": min_size,
+            "max_size": max_size,
+            # 是否为区间删除
+            "size_range": len(sizes) > 1,
+            # 是否触发了动态删除阈值
+            "triggered": False,
+            "items": []
+        }
+        delete_hashes = set()
+
+        def add_item(_stage: str, _hash: str, _task: dict, _info: dict, _reason: str) -> float:
+            delete_hashes.add(_hash)
+            plan["items"].append({
+                "hash": _hash,
+                "stage": _stage,
+                "site_name": _task.get("site_name", ""),
+                "title": _task.get("title", ""),
+                "description": _task.get("description", ""),
+                "size": _info.get("total_size") or 0,
+                "reason": _reason
+            })
+            return _info.get("total_size") or 0
 
-            # 删除种子的具体实现可能会根据实际情况略有不同
-            should_delete, reason = self.__evaluate_proxy_pre_conditions_for_delete(site_name=site_name,
-                                                                                    torrent_info=torrent_info)
+        # 不管做种体积是否超过阈值，先执行排除H&R种子后满足前置删除条件的种子
+        for torrent_hash, torrent_task, torrent_info in torrent_items:
+            if torrent_task.get("hit_and_run", False):
+                continue
+            should_delete, reason = self.__evaluate_proxy_pre_conditions_for_delete(
+                site_name=torrent_task.get("site_name", ""), torrent_info=torrent_info)
             if should_delete:
-                delete_hashes.append(torrent_hash)
-                self.__send_delete_message(site_name=site_name, torrent_title=torrent_title, torrent_desc=torrent_desc,
-                                           reason=reason)
-                logger.info(f"站点：{site_name}，{reason}，删除种子：{torrent_title}|{torrent_desc}")
-            else:
-                logger.debug(f"站点：{site_name}，{reason}，不删除种子：{torrent_title}|{torrent_desc}")
+                total_torrent_size -= add_item("pre", torrent_hash, torrent_task, torrent_info, reason)
+        plan["pre_delete_size"] = plan["seeding_size"] - total_torrent_size
 
-        return delete_hashes
+        # 当总体积未超过最大阈值时，不需要执行删除操作
+        if total_torrent_size < max_size:
+            plan["remaining_size"] = total_torrent_size
+            return plan
+        plan["triggered"] = True
+
+        # 即使开了动态删除，但是也有可能部分站点单独设置了关闭，先处理不需要托管的种子，按设置的规则进行删除
+        # 删除非托管种子后仍未达到最小体积要求，再按设置的规则处理托管种子
+        for proxy_delete in (False, True):
+            if proxy_delete and total_torrent_size <= min_size:
+                break
+            for torrent_hash, torrent_task, torrent_info in torrent_items:
+                if torrent_hash in delete_hashes:
+                    continue
+                site_name = torrent_task.get("site_name", "")
+                if bool(self.__get_brush_config(site_name).proxy_delete) != proxy_delete:
+                    continue
+                should_delete, reason = self.__evaluate_conditions_for_delete(site_name=site_name,
+                                                                              torrent_info=torrent_info,
+                                                                              torrent_task=torrent_task)
+                if should_delete:
+                    reason = "触发动态删除阈值，" + reason if proxy_delete else reason
+                    total_torrent_size -= add_item("rule", torrent_hash, torrent_task, torrent_info, reason)
+
+        # 仍然超过最小阈值时，在已完成的托管种子中排除H&R种子，选择损失上传最少的种子组合进行删除
+        if total_torrent_size > min_size:
+            candidates = {}
+            for torrent_hash, torrent_task, torrent_info in torrent_items:
+                if torrent_hash in delete_hashes or torrent_task.get("hit_and_run", False) \
+                        or not torrent_info.get("completed") \
+                        or not self.__get_brush_config(torrent_task.get("site_name", "")).proxy_delete:
+                    continue
+                candidates[torrent_hash] = (torrent_task, torrent_info)
+            planned = plan_delete(candidates=[DeleteCandidate(torrent_hash=torrent_hash,
+                                                              size=torrent_info.get("total_size"),
+                                                              recent_upspeed=torrent_info.get("upspeed"),
+                                                              avg_upspeed=torrent_info.get("avg_upspeed"),
+                                                              ratio=torrent_info.get("ratio"),
+                                                              seeding_time=torrent_info.get("seeding_time"))
+                                              for torrent_hash, (_, torrent_info) in candidates.items()],
+                                  need_size=total_torrent_size - min_size)
+            for candidate in planned:
+                torrent_task, torrent_info = candidates[candidate.hash]
+                total_torrent_size -= candidate.size
+                reason = (f"触发动态删除阈值，系统自动删除，做种时间 {candidate.seeding_time / 3600:.1f} 小时，"
+                          f"平均上传速度 {candidate.upload_rate / 1024:.1f} KB/s，"
+                          f"当前做种体积 {self.__bytes_to_gb(total_torrent_size):.1f} GB")
+                add_item("planner", candidate.hash, torrent_task, torrent_info, reason)
+
+        plan["remaining_size"] = total_torrent_size
+        return plan
 
     def __delete_torrent_for_proxy(self, torrents: List[Any], torrent_tasks: Dict[str, dict]) -> List:
         """
@@ -2616,140 +3062,74 @@ class BrushFlow(_PluginBase):
         - 不管做种体积是否超过设定的动态删除阈值，默认优先执行排除H&R种子后满足「下载超时时间」的种子
         - 上述规则执行完成后，当做种体积依旧超过设定的动态删除阈值时，继续执行下述种子删除规则
         - 优先删除满足用户设置删除规则的全部种子，即便在删除过程中已经低于了阈值下限，也会继续删除
-        - 若删除后还没有达到阈值，则在已完成种子中排除H&R种子后按做种时间倒序进行删除
+        - 若删除后还没有达到阈值，则在已完成种子中排除H&R种子后，选择能降至阈值下限且损失上传最少的种子组合进行删除
         - 动态删除阈值：100，当做种体积 > 100G 时，则开始删除种子，直至降低至 100G
         - 动态删除阈值：50-100，当做种体积 > 100G 时，则开始删除种子，直至降至为 50G
         """
-        brush_config = self.__get_brush_config()
-
-        # 如果没有启用动态删除或没有设置删除阈值，则不执行删除操作
-        if not (brush_config.proxy_delete and brush_config.delete_size_range):
+        plan = self.__build_proxy_delete_plan(torrents=torrents, torrent_tasks=torrent_tasks)
+        if not plan:
             return []
 
-        # 获取种子信息Map
-        torrent_info_map = {self.__get_hash(torrent): self.__get_torrent_info(torrent=torrent) for torrent in torrents}
-
-        # 计算当前总做种体积
-        total_torrent_size = self.__calculate_seeding_torrents_size(torrent_tasks=torrent_tasks)
+        logger.info(f"当前做种体积 {self.__bytes_to_gb(plan['seeding_size']):.1f} GB，"
+                    f"满足动态删除前置条件的种子体积 {self.__bytes_to_gb(plan['pre_delete_size']):.1f} GB")
 
-        logger.info(
-            f"当前做种体积 {self.__bytes_to_gb(total_torrent_size):.1f} GB，正在准备计算满足动态前置删除条件的种子")
+        for item in plan["items"]:
+            # 如果是区间删除，一次性删除的数据过多，取消消息推送
+            if item["stage"] != "planner" or not plan["size_range"]:
+                self.__send_delete_message(site_name=item["site_name"], torrent_title=item["title"],
+                                           torrent_desc=item["description"], reason=item["reason"])
+            logger.info(f"站点：{item['site_name']}，{item['reason']}，删除种子：{item['title']}|{item['description']}")
 
-        # 执行排除H&R种子后满足前置删除条件的种子
-        pre_delete_hashes = self.__delete_torrent_for_evaluate_proxy_pre_conditions(torrents=torrents,
-                                                                                    torrent_tasks=torrent_tasks) or []
+        need_delete_hashes = [item["hash"] for item in plan["items"]]
 
-        # 如果存在前置删除种子，这里进行额外判断，总做种体积排除前置删除种子的体积
-        if pre_delete_hashes:
-            pre_delete_total_size = sum(torrent_info_map[self.__get_hash(torrent)].get("total_size", 0)
-                                        for torrent in torrents if self.__get_hash(torrent) in pre_delete_hashes)
-            total_torrent_size = total_torrent_size - pre_delete_total_size
-            torrents = [torrent for torrent in torrents if self.__get_hash(torrent) not in pre_delete_hashes]
+        if not plan["triggered"]:
             logger.info(
-                f"满足动态删除前置条件的种子共 {len(pre_delete_hashes)} 个，体积 {self.__bytes_to_gb(pre_delete_total_size):.1f} GB，"
-                f"删除种子后，当前做种体积 {self.__bytes_to_gb(total_torrent_size):.1f} GB")
-        else:
-            logger.info(f"没有找到任何满足动态删除前置条件的种子")
-
-        # 解析删除阈值范围
-        sizes = [float(size) * 1024 ** 3 for size in brush_config.delete_size_range.split("-")]
-        min_size = sizes[0]  # 至少需要达到的做种体积
-        max_size = sizes[1] if len(sizes) > 1 else sizes[0]  # 触发删除操作的做种体积上限
-
-        # 判断是否为区间删除
-        proxy_size_range = len(sizes) > 1
-
-        # 当总体积未超过最大阈值时，不需要执行删除操作
-        if total_torrent_size < max_size:
-            logger.info(
-                f"当前做种体积 {self.__bytes_to_gb(total_torrent_size):.1f} GB，上限 {self.__bytes_to_gb(max_size):.1f} GB，"
-                f"下限 {self.__bytes_to_gb(min_size):.1f} GB，未进一步触发动态删除")
-            return pre_delete_hashes or []
-        else:
-            logger.info(
-                f"当前做种体积 {self.__bytes_to_gb(total_torrent_size):.1f} GB，上限 {self.__bytes_to_gb(max_size):.1f} GB，"
-                f"下限 {self.__bytes_to_gb(min_size):.1f} GB，进一步触发动态删除")
-
-        need_delete_hashes = []
-        need_delete_hashes.extend(pre_delete_hashes)
-
-        # 即使开了动态删除，但是也有可能部分站点单独设置了关闭，这里根据种子托管进行分组，先处理不需要托管的种子，按设置的规则进行删除
-        proxy_delete_torrents, not_proxy_delete_torrents = self.__group_torrents_by_proxy_delete(torrents=torrents,
-                                                                                                 torrent_tasks=torrent_tasks)
-        logger.info(f"托管种子数 {len(proxy_delete_torrents)}，未托管种子数 {len(not_proxy_delete_torrents)}")
-        if not_proxy_delete_torrents:
-            not_proxy_delete_hashes = self.__delete_torrent_for_evaluate_conditions(torrents=not_proxy_delete_torrents,
-                                                                                    torrent_tasks=torrent_tasks) or []
-            need_delete_hashes.extend(not_proxy_delete_hashes)
-            total_torrent_size -= sum(
-                torrent_info_map[self.__get_hash(torrent)].get("total_size", 0) for torrent in not_proxy_delete_torrents
-                if self.__get_hash(torrent) in not_proxy_delete_hashes)
-
-        # 如果删除非托管种子后仍未达到最小体积要求，则处理托管种子
-        if total_torrent_size > min_size and proxy_delete_torrents:
-            proxy_delete_hashes = self.__delete_torrent_for_evaluate_conditions(torrents=proxy_delete_torrents,
-                                                                                torrent_tasks=torrent_tasks,
-                                                                                proxy_delete=True) or []
-            need_delete_hashes.extend(proxy_delete_hashes)
-            total_torrent_size -= sum(
-                torrent_info_map[self.__get_hash(torrent)].get("total_size", 0) for torrent in proxy_delete_torrents if
-                self.__get_hash(torrent) in proxy_delete_hashes)
-
-        # 在完成初始删除步骤后，如果总体积仍然超过最小阈值，则进一步找到已完成种子并排除HR种子后按做种时间正序进行删除
-        if total_torrent_size > min_size:
-            # 重新计算当前的种子列表，排除已删除的种子
-            remaining_hashes = list(
-                {self.__get_hash(torrent) for torrent in proxy_delete_torrents} - set(need_delete_hashes))
-            # 这里根据排除后的种子列表，再次从下载器中找到已完成的任务
-            downloader = self.downloader
-            completed_torrents = downloader.get_completed_torrents(ids=remaining_hashes)
-            remaining_hashes = {self.__get_hash(torrent) for torrent in completed_torrents}
-            remaining_torrents = [(_hash, torrent_info_map[_hash]) for _hash in remaining_hashes]
-
-            # 准备一个列表，用于存放满足条件的种子，即非HR种子且有明确做种时间
-            filtered_torrents = [(_hash, info['seeding_time']) for _hash, info in remaining_torrents if
-                                 not torrent_tasks[_hash].get("hit_and_run", False)]
-            sorted_torrents = sorted(filtered_torrents, key=lambda x: x[1], reverse=True)
-
-            # 进行额外的删除操作，直到满足最小阈值或没有更多种子可删除
-            for torrent_hash, _ in sorted_torrents:
-                if total_torrent_size <= min_size:
-                    break
-                torrent_task = torrent_tasks.get(torrent_hash, None)
-                torrent_info = torrent_info_map.get(torrent_hash, None)
-                if not torrent_task or not torrent_info:
-                    continue
-
-                need_delete_hashes.append(torrent_hash)
-                total_torrent_size -= torrent_info.get("total_size", 0)
+                f"当前做种体积 {self.__bytes_to_gb(plan['remaining_size']):.1f} GB，"
+                f"上限 {self.__bytes_to_gb(plan['max_size']):.1f} GB，"
+                f"下限 {self.__bytes_to_gb(plan['min_size']):.1f} GB，未进一步触发动态删除")
+            return need_delete_hashes
 
-                site_name = torrent_task.get("site_name", "")
-                torrent_title = torrent_task.get("title", "")
-                torrent_desc = torrent_task.get("description", "")
-                seeding_time = torrent_task.get("seeding_time", 0)
-                if seeding_time:
-                    reason = (f"触发动态删除阈值，系统自动删除，做种时间 {seeding_time / 3600:.1f} 小时，"
-                              f"当前做种体积 {self.__bytes_to_gb(total_torrent_size):.1f} GB")
-                    # 如果是区间删除，一次性删除的数据过多，取消消息推送
-                    if not proxy_size_range:
-                        self.__send_delete_message(site_name=site_name, torrent_title=torrent_title,
-                                                   torrent_desc=torrent_desc,
-                                                   reason=reason)
-                    logger.info(f"站点：{site_name}，{reason}，删除种子：{torrent_title}|{torrent_desc}")
-
-        delete_sites = {torrent_tasks[hash_key].get('site_name', '') for hash_key in need_delete_hashes if
-                        hash_key in torrent_tasks}
+        delete_sites = {item["site_name"] for item in plan["items"]}
         msg = (f"站点：{'，'.join(delete_sites)}\n内容：已完成 {len(need_delete_hashes)} 个种子删除，"
-               f"当前做种体积 {self.__bytes_to_gb(total_torrent_size):.1f} GB\n原因：触发动态删除阈值，系统自动删除")
+               f"当前做种体积 {self.__bytes_to_gb(plan['remaining_size']):.1f} GB\n原因：触发动态删除阈值，系统自动删除")
         logger.info(msg)
 
         # 如果是区间删除，这里则进行统一推送
-        if proxy_size_range:
+        if plan["size_range"]:
             self.__send_message(title="【刷流任务种子删除】", text=msg)
 
         # 返回所有需要删除的种子的哈希列表
         return need_delete_hashes
 
+    def delete_plan(self, apikey: str) -> schemas.Response:
+        """
+        动态删种预演，返回当前的动态删种计划，不执行删除，可由API调用
+        """
+        if apikey != settings.API_TOKEN:
+            return schemas.Response(success=False, message="API密钥错误")
+
+        brush_config = self.__get_brush_config()
+        if not brush_config or not brush_config.downloader or not self.downloader:
+            return schemas.Response(success=False, message="下载器未配置")
+        if not (brush_config.proxy_delete and brush_config.delete_size_range):
+            return schemas.Response(success=False, message="未开启动态删种或未设置动态删除阈值")
+
+        seeding_torrents, error = self.downloader.get_torrents()
+        if error:
+            return schemas.Response(success=False, message="连接下载器出错")
+
+        # 与定时检查保持一致，仅计划下载器中存在且未被排除标签的刷流任务
+        torrent_tasks = self._task_store.get_tasks()
+        check_torrents = [torrent for torrent in seeding_torrents if self.__get_hash(torrent) in torrent_tasks]
+        check_torrents = self.__filter_torrents_by_tag(torrents=check_torrents,
+                                                       exclude_tag=brush_config.delete_except_tags)
+
+        plan = self.__build_proxy_delete_plan(torrents=check_torrents, torrent_tasks=torrent_tasks)
+        return schemas.Response(success=True,
+                                message=f"动态删种计划共 {len(plan['items'])} 个种子，"
+                                        f"删除后做种体积 {self.__bytes_to_gb(plan['remaining_size']):.1f} GB",
+                                data=plan)
+
     def __update_undeleted_torrents_missing_in_downloader(self, torrent_tasks, torrent_check_hashes, torrents):
         """
         处理已经被删除，但是任务记录中还没有被标记删除的种子
@@ -2778,6 +3158,8 @@ class BrushFlow(_PluginBase):
             logger.info(
                 f"站点：{site_name}，无法在下载器中找到对应种子信息，更新刷流任务状态为已删除，种子：{torrent_title}|{torrent_desc}")
 
+        self.__save_tasks(torrent_tasks=torrent_tasks, hashes=undeleted_hashes)
+
         self.__log_and_send_torrent_task_update_message(title="【刷流任务状态更新】", status="更新刷流状态为已删除",
                                                         reason="无法在下载器中找到对应的种子信息",
                                                         torrent_tasks=delete_tasks)
@@ -2816,44 +3198,22 @@ class BrushFlow(_PluginBase):
 
     # endregion
 
-    def __update_and_save_statistic_info(self, torrent_tasks):
+    def __update_and_save_statistic_info(self):
         """
         更新并保存统计信息
         """
-        total_count, total_uploaded, total_downloaded, total_deleted = 0, 0, 0, 0
-        active_uploaded, active_downloaded, active_count, total_unarchived = 0, 0, 0, 0
-
         statistic_info = self.__get_statistic_info()
-        archived_tasks = self.get_data("archived") or {}
-        combined_tasks = {**torrent_tasks, **archived_tasks}
-
-        for task in combined_tasks.values():
-            if task.get("deleted", False):
-                total_deleted += 1
-            total_downloaded += task.get("downloaded", 0)
-            total_uploaded += task.get("uploaded", 0)
-
-        # 计算torrent_tasks中未标记为删除的活跃任务的统计信息，及待归档的任务数
-        for task in torrent_tasks.values():
-            if not task.get("deleted", False):
-                active_uploaded += task.get("uploaded", 0)
-                active_downloaded += task.get("downloaded", 0)
-                active_count += 1
-            else:
-                total_unarchived += 1
+
+        # 刷流任务及归档任务的统计信息直接由任务存储聚合得到
+        task_statistic = self._task_store.get_statistic()
+        total_count, total_deleted = task_statistic.get("count"), task_statistic.get("deleted")
+        total_uploaded, total_downloaded = task_statistic.get("uploaded"), task_statistic.get("downloaded")
+        active_count, total_unarchived = task_statistic.get("active"), task_statistic.get("unarchived")
+        active_uploaded = task_statistic.get("active_uploaded")
+        active_downloaded = task_statistic.get("active_downloaded")
 
         # 更新统计信息
-        total_count = len(combined_tasks)
-        statistic_info.update({
-            "uploaded": total_uploaded,
-            "downloaded": total_downloaded,
-            "deleted": total_deleted,
-            "unarchived": total_unarchived,
-            "count": total_count,
-            "active": active_count,
-            "active_uploaded": active_uploaded,
-            "active_downloaded": active_downloaded
-        })
+        statistic_info.update(task_statistic)
 
         logger.info(f"刷流任务统计数据，总任务数：{total_count}，活跃任务数：{active_count}，已删除：{total_deleted}，"
                     f"待归档：{total_unarchived}，"
@@ -2863,7 +3223,6 @@ class BrushFlow(_PluginBase):
                     f"总下载量：{StringUtils.str_filesize(total_downloaded)}")
 
         self.save_data("statistic", statistic_info)
-        self.save_data("torrents", torrent_tasks)
 
     def __get_brush_config(self, sitename: str = None) -> BrushConfig:
         """
@@ -2871,6 +3230,43 @@ class BrushFlow(_PluginBase):
         """
         return self._brush_config if not sitename else self._brush_config.get_site_config(sitename=sitename)
 
+    def __get_brush_filter(self, sitename: str = None) -> BrushTorrentFilter:
+        """
+        获取站点预编译的刷流过滤器，不存在时根据站点配置编译
+        """
+        brush_filter = self._brush_filters.get(sitename)
+        if not brush_filter:
+            brush_filter = BrushTorrentFilter(brush_config=self.__get_brush_config(sitename=sitename),
+                                              get_pubminutes=self.__get_pubminutes)
+            self._brush_filters[sitename] = brush_filter
+            logger.debug(f"站点 {sitename or '全局'} 刷流过滤规则已编译：{'，'.join(brush_filter.rule_names)}")
+        return brush_filter
+
+    def __init_task_store(self):
+        """
+        初始化刷流任务存储，首次使用时从历史插件数据迁移
+        """
+        if not self._task_store:
+            self._task_store = BrushTaskStore(db_path=self.get_data_path() / "tasks.db")
+
+        if self._task_store.is_migrated():
+            return
+
+        legacy_data = {key: self.get_data(key) for key in BrushTaskStore.LEGACY_KEYS}
+        count = self._task_store.migrate(legacy_data=legacy_data)
+        # 迁移完成后清理历史插件数据
+        for key, value in legacy_data.items():
+            if value is not None:
+                self.del_data(key=key)
+        logger.info(f"刷流任务数据迁移完成，共迁移 {count} 条任务记录")
+
+    def __save_tasks(self, torrent_tasks: Dict[str, dict], hashes: Iterable[str]):
+        """
+        按行保存发生变化的刷流任务
+        """
+        self._task_store.upsert_tasks({torrent_hash: torrent_tasks[torrent_hash]
+                                       for torrent_hash in hashes if torrent_hash in torrent_tasks})
+
     def __validate_and_fix_config(self, config: dict = None) -> bool:
         """
         检查并修正配置值
@@ -2896,7 +3292,11 @@ class BrushFlow(_PluginBase):
             "seed_inactivetime": "未活动时间",
             "up_speed": "单任务上传限速",
             "dl_speed": "单任务下载限速",
-            "auto_archive_days": "自动清理记录天数"
+            "auto_archive_days": "自动清理记录天数",
+            "bandwidth_window": "带宽采样窗口",
+            "bandwidth_interval": "带宽采样间隔",
+            "brush_workers": "并发站点数",
+            "brush_site_timeout": "站点获取超时时间"
         }
 
         config_range_number_attr_to_desc = {
@@ -2940,6 +3340,9 @@ class BrushFlow(_PluginBase):
         if brush_config is None:
             return
 
+        # 配置变更后，预编译的刷流过滤器需要重新编译
+        self._brush_filters = {}
+
         # 创建一个将配置属性名称映射到BrushConfig属性值的字典
         config_mapping = {
             "onlyonce": brush_config.onlyonce,
@@ -2974,12 +3377,18 @@ class BrushFlow(_PluginBase):
             "delete_except_tags": brush_config.delete_except_tags,
             "except_subscribe": brush_config.except_subscribe,
             "brush_sequential": brush_config.brush_sequential,
+            "brush_concurrent": brush_config.brush_concurrent,
+            "brush_workers": brush_config.brush_workers,
+            "brush_site_timeout": brush_config.brush_site_timeout,
+            "check_incremental": brush_config.check_incremental,
             "proxy_delete": brush_config.proxy_delete,
             "active_time_range": brush_config.active_time_range,
             "cron": brush_config.cron,
             "qb_category": brush_config.qb_category,
             "enable_site_config": brush_config.enable_site_config,
             "site_config": brush_config.site_config,
+            "bandwidth_window": brush_config.bandwidth_window,
+            "bandwidth_interval": brush_config.bandwidth_interval,
             "_tabs": self._tabs
         }
 
@@ -3074,22 +3483,62 @@ class BrushFlow(_PluginBase):
             logger.error(f"Error while resetting downloader URL for torrent: {torrent_url}. Error: {str(e)}")
             return torrent_url
 
-    def __download(self, torrent: TorrentInfo) -> Optional[str]:
+    def __download_torrents(self, torrents: List[TorrentInfo]) -> Dict[int, str]:
+        """
+        批量添加下载任务，返回 {id(种子): 种子Hash}
+        """
+        if not torrents:
+            return {}
+
+        downloader = self.downloader
+        if not downloader:
+            return {}
+
+        # 并发获取种子文件内容
+        contents = self.__fetch_torrent_contents(torrents=torrents)
+
+        if self.downloader_helper.is_downloader("qbittorrent", service=self.service_info):
+            return self.__qb_add_torrents(torrents=torrents, contents=contents)
+        elif self.downloader_helper.is_downloader("transmission", service=self.service_info):
+            return self.__tr_add_torrents(torrents=torrents, contents=contents)
+        return {}
+
+    def __fetch_torrent_contents(self, torrents: List[TorrentInfo]) \
+            -> Dict[int, Tuple[Union[str, bytes], Optional[str]]]:
         """
-        添加下载任务
+        并发获取种子文件内容，同一站点复用会话连接，返回 {id(种子): (种子内容或下载地址, cookie)}
+        """
+        sessions: Dict[str, Session] = {torrent.site_name: Session() for torrent in torrents}
+        contents = {}
+        try:
+            with ThreadPoolExecutor(max_workers=min(len(torrents), 5),
+                                    thread_name_prefix="BrushFlowDownload") as executor:
+                futures = {executor.submit(self.__get_torrent_content, torrent, sessions[torrent.site_name]): torrent
+                           for torrent in torrents}
+                for future, torrent in futures.items():
+                    try:
+                        torrent_content, cookies = future.result()
+                    except Exception as e:
+                        logger.error(f"获取种子文件失败：{torrent.title}，错误详情: {e}")
+                        continue
+                    if torrent_content:
+                        contents[id(torrent)] = (torrent_content, cookies)
+        finally:
+            for session in sessions.values():
+                session.close()
+        return contents
+
+    def __get_torrent_content(self, torrent: TorrentInfo, session: Session = None) \
+            -> Tuple[Optional[Union[str, bytes]], Optional[str]]:
+        """
+        获取种子文件内容，获取失败时返回下载地址交由下载器下载
         """
         if not torrent.enclosure:
             logger.error(f"获取下载链接失败：{torrent.title}")
-            return None
+            return None, None
 
         brush_config = self.__get_brush_config(torrent.site_name)
 
-        # 上传限速
-        up_speed = int(brush_config.up_speed) if brush_config.up_speed else None
-        # 下载限速
-        down_speed = int(brush_config.dl_speed) if brush_config.dl_speed else None
-        # 保存地址
-        download_dir = brush_config.save_path or None
         # 获取下载链接
         torrent_content = torrent.enclosure
         # proxies
@@ -3105,74 +3554,197 @@ class BrushFlow(_PluginBase):
             cookies = None
         if not torrent_content:
             logger.error(f"获取下载链接失败：{torrent.title}")
-            return None
+            return None, None
 
         if brush_config.site_skip_tips:
             torrent_content = self.__reset_download_url(torrent_url=torrent_content, site_id=torrent.site)
             logger.debug(f"站点 {torrent.site_name} 已启用自动跳过提示，种子下载地址更新为 {torrent_content}")
 
+        # 如果种子地址不是磁力地址，则请求种子到内存再传入下载器
+        if not torrent_content.startswith("magnet"):
+            response = RequestUtils(cookies=cookies,
+                                    proxies=proxies,
+                                    ua=torrent.site_ua,
+                                    session=session).get_res(url=torrent_content)
+            if response and response.ok:
+                torrent_content = response.content
+            else:
+                logger.error("尝试通过MP下载种子失败，继续尝试传递种子地址到下载器进行下载")
+        return torrent_content, cookies
+
+    def __qb_add_torrents(self, torrents: List[TorrentInfo],
+                          contents: Dict[int, Tuple[Union[str, bytes], Optional[str]]]) -> Dict[int, str]:
+        """
+        批量添加qBittorrent下载任务
+        - 已获取到种子文件的，在本地计算种子Hash，同一站点的种子一次性添加
+        - 仅有下载地址的，逐个添加并打上独立的临时标签
+        - 所有种子共用一个批次标签，最终通过一次种子列表查询确认添加结果
+        - v1/v2混合种子在libtorrent 2下的Hash为截断的v2 Hash，本地Hash未命中时按名称及大小匹配
+        """
         downloader = self.downloader
         if not downloader:
-            return None
+            return {}
+
+        batch_tag = StringUtils.generate_random_str(10)
+        # 种子Hash -> id(种子)
+        hash_torrents: Dict[str, int] = {}
+        # (种子名称, 种子大小) -> 本地计算的种子Hash
+        name_size_hashes: Dict[Tuple[str, int], str] = {}
+        # 临时标签 -> id(种子)
+        tag_torrents: Dict[str, int] = {}
+
+        # 同一站点的刷流配置相同，按站点分组添加
+        site_torrents: Dict[str, List[TorrentInfo]] = {}
+        for torrent in torrents:
+            if id(torrent) in contents:
+                site_torrents.setdefault(torrent.site_name, []).append(torrent)
 
-        if self.downloader_helper.is_downloader("qbittorrent", service=self.service_info):
+        for site_name, group_torrents in site_torrents.items():
+            brush_config = self.__get_brush_config(site_name)
             # 限速值转为bytes
-            up_speed = up_speed * 1024 if up_speed else None
-            down_speed = down_speed * 1024 if down_speed else None
-            # 生成随机Tag
-            tag = StringUtils.generate_random_str(10)
-            # 如果开启代理下载以及种子地址不是磁力地址，则请求种子到内存再传入下载器
-            if not torrent_content.startswith("magnet"):
-                response = RequestUtils(cookies=cookies,
-                                        proxies=proxies,
-                                        ua=torrent.site_ua).get_res(url=torrent_content)
-                if response and response.ok:
-                    torrent_content = response.content
-                else:
-                    logger.error("尝试通过MP下载种子失败，继续尝试传递种子地址到下载器进行下载")
-            if torrent_content:
-                state = downloader.add_torrent(content=torrent_content,
-                                               download_dir=download_dir,
-                                               cookie=cookies,
-                                               category=brush_config.qb_category,
-                                               tag=["已整理", brush_config.brush_tag, tag],
-                                               upload_limit=up_speed,
-                                               download_limit=down_speed)
-                if not state:
-                    return None
-                else:
-                    # 获取种子Hash
-                    torrent_hash = downloader.get_torrent_id_by_tag(tags=tag)
-                    if not torrent_hash:
-                        logger.error(f"{brush_config.downloader} 获取种子Hash失败，详细信息请查看 README")
-                        return None
-                    return torrent_hash
-            return None
+            up_speed = int(brush_config.up_speed) * 1024 if brush_config.up_speed else None
+            down_speed = int(brush_config.dl_speed) * 1024 if brush_config.dl_speed else None
+            add_params = {
+                "download_dir": brush_config.save_path or None,
+                "category": brush_config.qb_category,
+                "upload_limit": up_speed,
+                "download_limit": down_speed
+            }
 
-        elif self.downloader_helper.is_downloader("transmission", service=self.service_info):
-            # 如果开启代理下载以及种子地址不是磁力地址，则请求种子到内存再传入下载器
-            if not torrent_content.startswith("magnet"):
-                response = RequestUtils(cookies=cookies,
-                                        proxies=proxies,
-                                        ua=torrent.site_ua).get_res(url=torrent_content)
-                if response and response.ok:
-                    torrent_content = response.content
-                else:
-                    logger.error("尝试通过MP下载种子失败，继续尝试传递种子地址到下载器进行下载")
-            if torrent_content:
-                torrent = downloader.add_torrent(content=torrent_content,
-                                                 download_dir=download_dir,
-                                                 cookie=cookies,
-                                                 labels=["已整理", brush_config.brush_tag])
-                if not torrent:
-                    return None
-                else:
-                    if brush_config.up_speed or brush_config.dl_speed:
-                        downloader.change_torrent(hash_string=torrent.hashString,
-                                                  upload_limit=up_speed,
-                                                  download_limit=down_speed)
-                    return torrent.hashString
-        return None
+            torrent_files = []
+            for torrent in group_torrents:
+                torrent_content, cookies = contents[id(torrent)]
+                torrent_hash, torrent_name, torrent_size = self.__get_torrent_hash(torrent_content)
+                if torrent_hash:
+                    hash_torrents[torrent_hash] = id(torrent)
+                    if torrent_name:
+                        name_size_hashes[(torrent_name, torrent_size)] = torrent_hash
+                    torrent_files.append(torrent_content)
+                    continue
+                # 无法在本地计算Hash的，逐个添加并通过临时标签确认Hash
+                tag = StringUtils.generate_random_str(10)
+                if downloader.add_torrent(content=torrent_content,
+                                          cookie=cookies,
+                                          tag=["已整理", brush_config.brush_tag, batch_tag, tag],
+                                          **add_params):
+                    tag_torrents[tag] = id(torrent)
+
+            if torrent_files and not downloader.add_torrent(content=torrent_files,
+                                                            tag=["已整理", brush_config.brush_tag, batch_tag],
+                                                            **add_params):
+                logger.error(f"站点 {site_name} 批量添加 {len(torrent_files)} 个种子失败")
+                for torrent_hash in [h for h, t in hash_torrents.items()
+                                     if t in {id(torrent) for torrent in group_torrents}]:
+                    hash_torrents.pop(torrent_hash)
+                name_size_hashes = {key: h for key, h in name_size_hashes.items() if h in hash_torrents}
+
+        if not hash_torrents and not tag_torrents:
+            return {}
+
+        # 通过批次标签确认添加结果，下载器添加种子需要时间，最多重试10次
+        results: Dict[int, str] = {}
+        for _ in range(10):
+            time.sleep(1)
+            added_torrents, error = downloader.get_torrents(tags=batch_tag)
+            if error:
+                continue
+            for torrent in added_torrents or []:
+                torrent_hash = torrent.get("hash")
+                if torrent_hash in hash_torrents:
+                    results[hash_torrents[torrent_hash]] = torrent_hash
+                    continue
+                matched = False
+                for tag in self.__get_label(torrent=torrent):
+                    if tag in tag_torrents:
+                        results[tag_torrents[tag]] = torrent_hash
+                        matched = True
+                        break
+                if matched:
+                    continue
+                # 本地Hash未命中（如v1/v2混合种子），按名称及大小匹配
+                local_hash = name_size_hashes.get((torrent.get("name"), torrent.get("total_size")))
+                if local_hash:
+                    results[hash_torrents[local_hash]] = torrent_hash
+            if len(results) >= len(hash_torrents) + len(tag_torrents):
+                break
+
+        # 移除临时标签
+        self.__qb_remove_torrents_tags(torrent_hashes=list(results.values()), tags=[batch_tag, *tag_torrents.keys()])
+        if len(results) < len(hash_torrents) + len(tag_torrents):
+            logger.error(f"{self.__get_brush_config().downloader} 部分种子获取Hash失败，详细信息请查看 README")
+        return results
+
+    def __tr_add_torrents(self, torrents: List[TorrentInfo],
+                          contents: Dict[int, Tuple[Union[str, bytes], Optional[str]]]) -> Dict[int, str]:
+        """
+        添加Transmission下载任务，Transmission添加后直接返回种子Hash
+        """
+        downloader = self.downloader
+        if not downloader:
+            return {}
+
+        results: Dict[int, str] = {}
+        for torrent in torrents:
+            if id(torrent) not in contents:
+                continue
+            torrent_content, cookies = contents[id(torrent)]
+            brush_config = self.__get_brush_config(torrent.site_name)
+            # 上传限速
+            up_speed = int(brush_config.up_speed) if brush_config.up_speed else None
+            # 下载限速
+            down_speed = int(brush_config.dl_speed) if brush_config.dl_speed else None
+            added_torrent = downloader.add_torrent(content=torrent_content,
+                                                   download_dir=brush_config.save_path or None,
+                                                   cookie=cookies,
+                                                   labels=["已整理", brush_config.brush_tag])
+            if not added_torrent:
+                continue
+            if brush_config.up_speed or brush_config.dl_speed:
+                downloader.change_torrent(hash_string=added_torrent.hashString,
+                                          upload_limit=up_speed,
+                                          download_limit=down_speed)
+            results[id(torrent)] = added_torrent.hashString
+        return results
+
+    @staticmethod
+    def __get_torrent_hash(content: Union[str, bytes]) -> Tuple[Optional[str], Optional[str], int]:
+        """
+        根据种子文件内容在本地计算种子Hash（v1），同时返回种子名称及大小，无法计算时Hash为None
+        """
+        if not isinstance(content, bytes):
+            return None, None, 0
+        try:
+            torrent = bdecode(content)
+            info = torrent.get("info") if isinstance(torrent, dict) else None
+            # 纯v2种子的Hash计算方式不同，交由下载器确认
+            if not info or "pieces" not in info:
+                return None, None, 0
+            name = info.get("name")
+            if isinstance(name, bytes):
+                name = name.decode("utf-8", errors="ignore")
+            if "files" in info:
+                size = sum(file.get("length", 0) for file in info.get("files") or [])
+            else:
+                size = info.get("length", 0)
+            return hashlib.sha1(bencode(info)).hexdigest(), name, size
+        except Exception as e:
+            logger.debug(f"本地计算种子Hash失败：{e}")
+            return None, None, 0
+
+    def __qb_remove_torrents_tags(self, torrent_hashes: List[str], tags: List[str]):
+        """
+        移除并删除临时标签
+        """
+        downloader = self.downloader
+        if not downloader or not downloader.qbc or not tags:
+            return
+
+        try:
+            if torrent_hashes:
+                downloader.qbc.torrents_remove_tags(tags=tags, torrent_hashes=torrent_hashes)
+            downloader.qbc.torrents_delete_tags(tags=tags)
+        except Exception as err:
+            logger.error(f"移除临时标签失败：{str(err)}")
 
     def __qb_torrents_reannounce(self, torrent_hashes: List[str]):
         """强制重新汇报"""
@@ -3338,6 +3910,10 @@ class BrushFlow(_PluginBase):
             tags = torrent.get("tags")
             # tracker
             tracker = torrent.get("tracker")
+            # 当前上传速度 Byte/s
+            upspeed = torrent.get("upspeed") or 0
+            # 是否已完成
+            completed = (torrent.get("progress") or 0) >= 1
         # TR
         else:
             # ID
@@ -3382,6 +3958,10 @@ class BrushFlow(_PluginBase):
             tags = torrent.get("tags")
             # tracker
             tracker = torrent.get("tracker")
+            # 当前上传速度 Byte/s
+            upspeed = torrent.rate_upload or 0
+            # 是否已完成
+            completed = (torrent.progress or 0) >= 100
 
         return {
             "hash": torrent_id,
@@ -3397,7 +3977,9 @@ class BrushFlow(_PluginBase):
             "add_time": add_time,
             "add_on": add_on,
             "tags": tags,
-            "tracker": tracker
+            "tracker": tracker,
+            "upspeed": upspeed,
+            "completed": completed
         }
 
     def __log_and_notify_error(self, message):
@@ -3501,57 +4083,47 @@ class BrushFlow(_PluginBase):
         获取任务中的种子总大小
         """
         # 读取种子记录
-        task_info = self.get_data("torrents") or {}
+        task_info = self._task_store.get_tasks()
         if not task_info:
             return 0
         total_size = sum([task.get("size") or 0 for task in task_info.values()])
         return total_size
 
-    def __get_average_bandwidth(self, sample_count: int = 5, interval: float = 3.0) \
-            -> Tuple[Optional[float], Optional[float]]:
-        """
-        多次采样上传和下载带宽，取平均值
-        """
-        upload_speeds = []
-        download_speeds = []
-        start_time = time.time()
-        for _ in range(sample_count):
-            downloader_info = self.__get_downloader_info()
-            if downloader_info:
-                upload_speeds.append(downloader_info.upload_speed or 0)
-                download_speeds.append(downloader_info.download_speed or 0)
-            # 采样间隔
-            time.sleep(interval)
-        end_time = time.time()
-        total_duration = end_time - start_time
-        if not upload_speeds or not download_speeds:
+    def __get_average_bandwidth(self) -> Tuple[Optional[float], Optional[float]]:
+        """
+        获取后台采样窗口内的平均上传和下载带宽
+        """
+        sampler = self._bandwidth_sampler
+        if not sampler:
+            return None, None
+        # 采样服务刚启动尚无样本时，立即采样一次
+        if not sampler.has_samples():
+            sampler.sample()
+        avg_upload_speed, avg_download_speed = sampler.get_average()
+        if avg_upload_speed is None or avg_download_speed is None:
             return None, None
-        avg_upload_speed = sum(upload_speeds) / len(upload_speeds) if upload_speeds else 0
-        avg_download_speed = sum(download_speeds) / len(download_speeds) if download_speeds else 0
         logger.debug(f"平均上传带宽 {StringUtils.str_filesize(avg_upload_speed)}, "
                      f"平均下载带宽 {StringUtils.str_filesize(avg_download_speed)}, "
-                     f"采样次数={sample_count}, 时长={total_duration:.2f} 秒")
+                     f"采样窗口={sampler.window} 秒")
         return avg_upload_speed, avg_download_speed
 
-    def __get_downloader_info(self) -> schemas.DownloaderInfo:
+    def __sample_bandwidth(self) -> Dict[str, Tuple[float, float]]:
         """
-        获取下载器实时信息（所有下载器）
+        采样所有下载器的实时上传、下载速度
         """
-        ret_info = schemas.DownloaderInfo()
-
-        downloader = self.downloader
-        if not downloader:
-            return ret_info
-
-        transfer_infos = self.chain.run_module("downloader_info")
-        if transfer_infos:
-            for transfer_info in transfer_infos:
-                ret_info.download_speed += transfer_info.download_speed
-                ret_info.upload_speed += transfer_info.upload_speed
-                ret_info.download_size += transfer_info.download_size
-                ret_info.upload_size += transfer_info.upload_size
-
-        return ret_info
+        speeds = {}
+        services = self.downloader_helper.get_services() or {}
+        for name, service in services.items():
+            if not service or not service.instance or service.instance.is_inactive():
+                continue
+            transfer_info = service.instance.transfer_info()
+            if not transfer_info:
+                continue
+            if self.downloader_helper.is_downloader("qbittorrent", service=service):
+                speeds[name] = (transfer_info.get("up_info_speed") or 0, transfer_info.get("dl_info_speed") or 0)
+            else:
+                speeds[name] = (transfer_info.upload_speed or 0, transfer_info.download_speed or 0)
+        return speeds
 
     def __get_downloading_count(self) -> int:
         """
@@ -3691,8 +4263,18 @@ class BrushFlow(_PluginBase):
         unique_titles = {title for titles in self._subscribe_infos.values() for title in titles}
         return unique_titles
 
+    def __get_subscribe_matcher(self) -> SubscribeTitleMatcher:
+        """
+        获取订阅标题匹配器，订阅标题没有变化时复用已构建的匹配器
+        """
+        subscribe_titles = self.__get_subscribe_titles()
+        if self._subscribe_matcher is None or self._subscribe_matcher.titles != frozenset(subscribe_titles):
+            self._subscribe_matcher = SubscribeTitleMatcher(titles=subscribe_titles)
+            logger.debug(f"订阅标题匹配器已重建，共 {len(self._subscribe_matcher)} 个标题")
+        return self._subscribe_matcher
+
     @staticmethod
-    def __filter_torrents_contains_subscribe(torrents: Any, subscribe_titles: Set[str]):
+    def __filter_torrents_contains_subscribe(torrents: Any, subscribe_matcher: SubscribeTitleMatcher):
         # 初始化两个列表，一个用于收集未被排除的种子，一个用于记录被排除的种子
         included_torrents = []
         excluded_torrents = []
@@ -3703,7 +4285,7 @@ class BrushFlow(_PluginBase):
             title = torrent.title or ''
             description = torrent.description or ''
 
-            if any(subscribe_title in title or subscribe_title in description for subscribe_title in subscribe_titles):
+            if subscribe_matcher.search(title, description):
                 # 如果种子的标题或描述包含订阅标题中的任一项，则记录为被排除
                 excluded_torrents.append(torrent)
                 logger.info(f"命中订阅内容，排除种子：{title}|{description}")
@@ -3762,9 +4344,6 @@ class BrushFlow(_PluginBase):
             logger.info("自动归档记录天数小于等于0，取消自动归档")
             return
 
-        # 用于存储已删除的数据
-        archived_tasks: Dict[str, dict] = self.get_data("archived") or {}
-
         current_time = time.time()
         archive_threshold_seconds = self._brush_config.auto_archive_days * 86400  # 将天数转换为秒数
 
@@ -3778,29 +4357,25 @@ class BrushFlow(_PluginBase):
             if (value.get("deleted") and isinstance(deleted_time, (int, float)) and
                     current_time - deleted_time > archive_threshold_seconds):
                 keys_to_delete.add(key)
-                archived_tasks[key] = value
                 continue
 
             # 场景 2: 检查没有明确删除时间的历史数据
             if value.get("deleted") and deleted_time is None:
                 keys_to_delete.add(key)
-                archived_tasks[key] = value
                 continue
 
         # 从原始字典中移除已删除的条目
         for key in keys_to_delete:
             del torrent_tasks[key]
 
-        self.save_data("archived", archived_tasks)
+        self._task_store.move_tasks(hashes=keys_to_delete, bucket=BrushTaskStore.ARCHIVED)
 
     def __clear_tasks(self):
         """
         清除统计数据
         彻底重置所有刷流数据，如当前还存在正在做种的刷流任务，待定时检查任务执行后，会自动纳入刷流管理
         """
-        self.save_data("torrents", {})
-        self.save_data("archived", {})
-        self.save_data("unmanaged", {})
+        self._task_store.clear()
         self.save_data("statistic", {})
 
     def __get_statistic_info(self) -> Dict[str, int]:
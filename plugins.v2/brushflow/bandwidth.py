@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from app.log import logger
+
+
+class BandwidthSampler:
+    """
+    下载器带宽后台采样器，按下载器在滚动窗口内记录上传、下载速度
+    """
+
+    def __init__(self, sample_func: Callable[[], Dict[str, Tuple[float, float]]],
+                 window: int = 60, interval: int = 5):
+        """
+        :param sample_func: 采样函数，返回 {下载器名称: (上传速度, 下载速度)}
+        :param window: 滚动窗口时长（秒）
+        :param interval: 采样间隔（秒）
+        """
+        self._sample_func = sample_func
+        self._interval = max(1, int(interval or 5))
+        self._window = max(self._interval, int(window or 60))
+        self._maxlen = max(1, self._window // self._interval)
+        # 下载器名称 -> [(采样时间, 上传速度, 下载速度)]
+        self._samples: Dict[str, Deque[Tuple[float, float, float]]] = {}
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def window(self) -> int:
+        return self._window
+
+    @property
+    def interval(self) -> int:
+        return self._interval
+
+    def start(self):
+        """
+        启动后台采样线程
+        """
+        if self._thread and self._thread.is_alive():
+            return
+        self._event.clear()
+        self._thread = threading.Thread(target=self.__run, name="BrushFlowBandwidthSampler", daemon=True)
+        self._thread.start()
+        logger.info(f"带宽采样服务启动，采样间隔 {self._interval} 秒，窗口时长 {self._window} 秒")
+
+    def stop(self):
+        """
+        停止后台采样线程
+        """
+        self._event.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self._interval + 1)
+        self._thread = None
+
+    def __run(self):
+        while not self._event.is_set():
+            self.sample()
+            self._event.wait(self._interval)
+
+    def sample(self):
+        """
+        立即采样一次
+        """
+        try:
+            speeds = self._sample_func() or {}
+        except Exception as e:
+            logger.error(f"带宽采样失败：{e}")
+            return
+        now = time.time()
+        with self._lock:
+            for name, (upload_speed, download_speed) in speeds.items():
+                samples = self._samples.get(name)
+                if samples is None:
+                    samples = self._samples[name] = deque(maxlen=self._maxlen)
+                samples.append((now, upload_speed or 0, download_speed or 0))
+
+    def __get_window_samples(self) -> Dict[str, List[Tuple[float, float, float]]]:
+        """
+        获取窗口时长内的有效样本
+        """
+        expire_time = time.time() - self._window
+        with self._lock:
+            return {name: [sample for sample in samples if sample[0] >= expire_time]
+                    for name, samples in self._samples.items()}
+
+    def has_samples(self) -> bool:
+        """
+        窗口时长内是否存在有效样本
+        """
+        return any(self.__get_window_samples().values())
+
+    def get_average(self) -> Tuple[Optional[float], Optional[float]]:
+        """
+        获取所有下载器的平均上传、下载带宽之和
+        """
+        window_samples = {name: samples for name, samples in self.__get_window_samples().items() if samples}
+        if not window_samples:
+            return None, None
+        avg_upload_speed = sum(sum(sample[1] for sample in samples) / len(samples)
+                               for samples in window_samples.values())
+        avg_download_speed = sum(sum(sample[2] for sample in samples) / len(samples)
+                                 for samples in window_samples.values())
+        return avg_upload_speed, avg_download_speed
+
+    def get_samples(self) -> Dict[str, List[Tuple[float, float, float]]]:
+        """
+        获取各下载器窗口时长内的样本
+        """
+        return self.__get_window_samples()
@@ -0,0 +1,159 @@
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.log import logger
+
+
+class BrushTorrentFilter:
+    """
+    刷流种子过滤器，将刷流配置预编译为按开销排序的规则链，并记录各规则排除的种子数
+    """
+
+    def __init__(self, brush_config: Any, get_pubminutes: Callable[[str], float]):
+        """
+        :param brush_config: 站点对应的刷流配置
+        :param get_pubminutes: 计算种子发布时间距今分钟数的函数
+        """
+        self._get_pubminutes = get_pubminutes
+        # [(规则名称, 规则函数)]，规则函数返回不通过的原因，通过时返回None
+        self._rules: List[Tuple[str, Callable[[Any], Optional[str]]]] = []
+        # 检查的种子数
+        self.checked = 0
+        # 规则名称 -> 排除的种子数
+        self.hits: Dict[str, int] = {}
+        self.__compile(brush_config)
+
+    @property
+    def rule_names(self) -> List[str]:
+        return [name for name, _ in self._rules]
+
+    @staticmethod
+    def __parse_range(value: Any) -> List[float]:
+        """
+        解析数字或数字范围，如 '5'、'5-10'
+        """
+        return [float(n) for n in str(value).split("-")]
+
+    @staticmethod
+    def __compile_pattern(pattern: str) -> Optional[re.Pattern]:
+        """
+        预编译正则表达式，表达式无效时返回None
+        """
+        try:
+            return re.compile(pattern, re.I)
+        except re.error as e:
+            logger.error(f"刷流规则正则表达式 {pattern} 无效，错误详情: {e}")
+            return None
+
+    def __compile(self, config: Any):
+        """
+        按开销从低到高编译规则链
+        """
+        # 促销
+        if config.freeleech:
+            double_upload = config.freeleech == "2xfree"
+
+            def freeleech_rule(torrent) -> Optional[str]:
+                if torrent.downloadvolumefactor != 0:
+                    return "非免费种子"
+                if double_upload and torrent.uploadvolumefactor != 2:
+                    return "非双倍上传种子"
+                return None
+
+            self._rules.append(("促销", freeleech_rule))
+
+        # H&R
+        if config.hr == "yes":
+            self._rules.append(("H&R", lambda torrent: "存在H&R" if torrent.hit_and_run else None))
+
+        # 种子大小（GB）
+        if config.size:
+            sizes = [size * 1024 ** 3 for size in self.__parse_range(config.size)]
+
+            def size_rule(torrent) -> Optional[str]:
+                if len(sizes) == 1 and torrent.size < sizes[0]:
+                    return f"种子大小 {torrent.size / 1024 ** 3:.1f} GB，不符合条件"
+                elif len(sizes) > 1 and not sizes[0] <= torrent.size <= sizes[1]:
+                    return f"种子大小 {torrent.size / 1024 ** 3:.1f} GB，不在指定范围内"
+                return None
+
+            self._rules.append(("种子大小", size_rule))
+
+        # 做种人数
+        if config.seeder:
+            seeders_range = self.__parse_range(config.seeder)
+
+            def seeder_rule(torrent) -> Optional[str]:
+                # 仅指定了一个数字时，做种人数需要小于等于该数字
+                if len(seeders_range) == 1:
+                    if torrent.seeders > seeders_range[0]:
+                        return f"做种人数 {torrent.seeders}，超过单个指定值"
+                # 指定范围时，做种人数需要在范围内（包括边界）
+                elif not (seeders_range[0] <= torrent.seeders <= seeders_range[1]):
+                    return f"做种人数 {torrent.seeders}，不在指定范围内"
+                return None
+
+            self._rules.append(("做种人数", seeder_rule))
+
+        # 发布时间
+        if config.pubtime:
+            pubtimes = self.__parse_range(config.pubtime)
+
+            def pubtime_rule(torrent) -> Optional[str]:
+                pubdate_minutes = self._get_pubminutes(torrent.pubdate)
+                if len(pubtimes) == 1:
+                    # 单个值：选择发布时间小于等于该值的种子
+                    if pubdate_minutes > pubtimes[0]:
+                        return f"发布时间 {torrent.pubdate}，{pubdate_minutes:.0f} 分钟前，不符合条件"
+                # 范围值：选择发布时间在范围内的种子
+                elif not (pubtimes[0] <= pubdate_minutes <= pubtimes[1]):
+                    return f"发布时间 {torrent.pubdate}，{pubdate_minutes:.0f} 分钟前，不在指定范围内"
+                return None
+
+            self._rules.append(("发布时间", pubtime_rule))
+
+        # 包含规则
+        if config.include:
+            include = self.__compile_pattern(config.include)
+
+            def include_rule(torrent) -> Optional[str]:
+                if not include:
+                    return "包含规则无效"
+                if include.search(torrent.title or "") or include.search(torrent.description or ""):
+                    return None
+                return "不符合包含规则"
+
+            self._rules.append(("包含规则", include_rule))
+
+        # 排除规则
+        if config.exclude:
+            exclude = self.__compile_pattern(config.exclude)
+
+            def exclude_rule(torrent) -> Optional[str]:
+                if not exclude:
+                    return "排除规则无效"
+                if exclude.search(torrent.title or "") or exclude.search(torrent.description or ""):
+                    return "符合排除规则"
+                return None
+
+            self._rules.append(("排除规则", exclude_rule))
+
+    def evaluate(self, torrent: Any) -> Tuple[bool, Optional[str]]:
+        """
+        依次执行规则链，返回是否通过及不通过的原因
+        """
+        self.checked += 1
+        for name, rule in self._rules:
+            reason = rule(torrent)
+            if reason:
+                self.hits[name] = self.hits.get(name, 0) + 1
+                return False, reason
+        return True, None
+
+    def summary(self) -> str:
+        """
+        规则排除统计摘要，按排除数量倒序
+        """
+        hits = "，".join(f"{name} {count}" for name, count in
+                        sorted(self.hits.items(), key=lambda item: item[1], reverse=True))
+        return f"累计检查 {self.checked} 个种子，规则排除：{hits or '无'}"
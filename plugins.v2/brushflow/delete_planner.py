@@ -0,0 +1,80 @@
+from typing import List
+
+
+class DeleteCandidate:
+    """
+    动态删种候选种子，评分仅在创建时计算一次
+    """
+
+    __slots__ = ("hash", "size", "upload_rate", "ratio", "seeding_time", "cost")
+
+    def __init__(self, torrent_hash: str, size: float, recent_upspeed: float, avg_upspeed: float,
+                 ratio: float, seeding_time: float):
+        """
+        :param torrent_hash: 种子Hash
+        :param size: 删除后释放的体积
+        :param recent_upspeed: 当前上传速度
+        :param avg_upspeed: 平均上传速度
+        :param ratio: 分享率
+        :param seeding_time: 做种时间
+        """
+        self.hash = torrent_hash
+        self.size = max(float(size or 0), 0)
+        # 当前速度与平均速度各占一半，平滑瞬时波动
+        self.upload_rate = 0.5 * max(float(recent_upspeed or 0), 0) + 0.5 * max(float(avg_upspeed or 0), 0)
+        self.ratio = max(float(ratio or 0), 0)
+        self.seeding_time = seeding_time or 0
+        # 删除后预期损失的上传，分享率越高说明收益越充分，继续做种的边际价值越低
+        self.cost = self.upload_rate / (1 + self.ratio)
+
+    def to_dict(self) -> dict:
+        return {
+            "hash": self.hash,
+            "size": self.size,
+            "upload_rate": self.upload_rate,
+            "ratio": self.ratio,
+            "seeding_time": self.seeding_time,
+            "cost": self.cost
+        }
+
+
+def plan_delete(candidates: List[DeleteCandidate], need_size: float) -> List[DeleteCandidate]:
+    """
+    选择释放体积不少于 need_size 且预期损失上传最少的种子组合（覆盖型背包的近似解），复杂度 O(n log n)
+    - 按单位体积损失升序选择，直至达到目标体积
+    - 按损失降序剔除去掉后仍能达到目标体积的多余种子
+    - 与能单独达到目标体积且损失最小的单个种子比较，取损失更少者
+    全部候选都不足以达到目标体积时，返回全部候选
+    """
+    if need_size <= 0:
+        return []
+
+    items = [candidate for candidate in candidates if candidate.size > 0]
+    # 损失相同时优先删除体积大、做种时间长的种子
+    items.sort(key=lambda c: (c.cost / c.size, -c.size, -c.seeding_time))
+
+    selected = []
+    freed = 0
+    for candidate in items:
+        if freed >= need_size:
+            break
+        selected.append(candidate)
+        freed += candidate.size
+    if freed < need_size:
+        return selected
+
+    # 剔除多余的种子
+    removed = set()
+    for candidate in sorted(selected, key=lambda c: (c.cost, c.size), reverse=True):
+        if freed - candidate.size >= need_size:
+            freed -= candidate.size
+            removed.add(candidate.hash)
+    if removed:
+        selected = [candidate for candidate in selected if candidate.hash not in removed]
+
+    # 单个种子即可达到目标体积时，比较损失
+    single = min((candidate for candidate in items if candidate.size >= need_size),
+                 key=lambda c: (c.cost, c.size), default=None)
+    if single and (single.cost, single.size) < (sum(c.cost for c in selected), freed):
+        return [single]
+    return selected
@@ -0,0 +1,346 @@
+import json
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Any, Set, Tuple
+
+
+class BrushTaskStore:
+    """
+    刷流任务存储，按种子Hash逐行保存任务数据，替代单个插件数据JSON
+    """
+
+    # 任务分组，与历史插件数据的键保持一致
+    ACTIVE = "torrents"
+    ARCHIVED = "archived"
+    UNMANAGED = "unmanaged"
+
+    # 参与迁移的历史插件数据，后面的分组优先级更高
+    LEGACY_KEYS = (ARCHIVED, UNMANAGED, ACTIVE)
+
+    # 分页查询允许的排序字段 -> 数据库列
+    SORT_COLUMNS = {
+        "time": "time",
+        "site": "site_name",
+        "title": "title",
+        "size": "size",
+        "uploaded": "uploaded",
+        "downloaded": "downloaded",
+        "ratio": "COALESCE(json_extract(data, '$.ratio'), 0)",
+        "status": "deleted"
+    }
+
+    def __init__(self, db_path: Path):
+        self._lock = threading.RLock()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self.__init_schema()
+
+    def __init_schema(self):
+        """
+        初始化表结构及索引
+        """
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    hash TEXT PRIMARY KEY,
+                    bucket TEXT NOT NULL,
+                    site TEXT,
+                    site_name TEXT,
+                    title TEXT,
+                    page_url TEXT,
+                    size INTEGER NOT NULL DEFAULT 0,
+                    uploaded INTEGER NOT NULL DEFAULT 0,
+                    downloaded INTEGER NOT NULL DEFAULT 0,
+                    deleted INTEGER NOT NULL DEFAULT 0,
+                    time REAL,
+                    deleted_time REAL,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_tasks_bucket_deleted ON tasks (bucket, deleted);
+                CREATE INDEX IF NOT EXISTS idx_tasks_site ON tasks (site_name, site);
+                CREATE INDEX IF NOT EXISTS idx_tasks_time ON tasks (time);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+
+    @staticmethod
+    def __to_row(torrent_hash: str, bucket: str, task: dict) -> tuple:
+        """
+        将任务转换为数据库行
+        """
+        site = task.get("site")
+        return (
+            torrent_hash,
+            bucket,
+            str(site) if site is not None else None,
+            task.get("site_name"),
+            task.get("title"),
+            task.get("page_url"),
+            task.get("size") or 0,
+            task.get("uploaded") or 0,
+            task.get("downloaded") or 0,
+            1 if task.get("deleted") else 0,
+            task.get("time"),
+            task.get("deleted_time"),
+            json.dumps(task, ensure_ascii=False)
+        )
+
+    def __upsert_rows(self, rows: List[tuple]):
+        """
+        批量写入数据库行
+        """
+        self._conn.executemany("""
+            INSERT INTO tasks (hash, bucket, site, site_name, title, page_url, size, uploaded, downloaded,
+                               deleted, time, deleted_time, data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(hash) DO UPDATE SET
+                bucket = excluded.bucket, site = excluded.site, site_name = excluded.site_name,
+                title = excluded.title, page_url = excluded.page_url, size = excluded.size,
+                uploaded = excluded.uploaded, downloaded = excluded.downloaded, deleted = excluded.deleted,
+                time = excluded.time, deleted_time = excluded.deleted_time, data = excluded.data
+        """, rows)
+
+    def get_meta(self, key: str) -> Optional[str]:
+        """
+        获取元数据
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+            return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        """
+        保存元数据
+        """
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def is_migrated(self) -> bool:
+        """
+        是否已经完成历史插件数据迁移
+        """
+        return self.get_meta("migrated") == "1"
+
+    def migrate(self, legacy_data: Dict[str, Optional[Dict[str, dict]]]) -> int:
+        """
+        一次性从历史插件数据迁移任务，legacy_data 的键为 torrents/archived/unmanaged
+        """
+        count = 0
+        with self._lock, self._conn:
+            for bucket in self.LEGACY_KEYS:
+                tasks = legacy_data.get(bucket) or {}
+                rows = [self.__to_row(torrent_hash, bucket, task) for torrent_hash, task in tasks.items() if task]
+                self.__upsert_rows(rows)
+                count += len(rows)
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated', '1')")
+        return count
+
+    def get_tasks(self, bucket: str = ACTIVE) -> Dict[str, dict]:
+        """
+        获取指定分组的全部任务
+        """
+        with self._lock:
+            cursor = self._conn.execute("SELECT hash, data FROM tasks WHERE bucket = ?", (bucket,))
+            return {torrent_hash: json.loads(data) for torrent_hash, data in cursor}
+
+    def get_task(self, torrent_hash: str) -> Optional[dict]:
+        """
+        根据Hash获取单个任务
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM tasks WHERE hash = ?", (torrent_hash,)).fetchone()
+            return json.loads(row[0]) if row else None
+
+    def upsert_tasks(self, tasks: Dict[str, dict], bucket: str = ACTIVE):
+        """
+        按行写入任务，仅序列化传入的任务
+        """
+        if not tasks:
+            return
+        rows = [self.__to_row(torrent_hash, bucket, task) for torrent_hash, task in tasks.items() if task]
+        with self._lock, self._conn:
+            self.__upsert_rows(rows)
+
+    def move_tasks(self, hashes: Iterable[str], bucket: str):
+        """
+        将任务移动到其他分组
+        """
+        params = [(bucket, torrent_hash) for torrent_hash in hashes]
+        if not params:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE tasks SET bucket = ? WHERE hash = ?", params)
+
+    def query_tasks(self, bucket: str = ACTIVE, site_name: Optional[str] = None, deleted: Optional[bool] = None,
+                    title: Optional[str] = None, sort_by: str = "time", desc: bool = True,
+                    offset: int = 0, limit: int = 50) -> Tuple[Dict[str, Any], List[dict]]:
+        """
+        分页查询任务，返回筛选结果的汇总数据及当前页任务
+        :param sort_by: 排序字段，见 SORT_COLUMNS
+        """
+        conditions, params = ["bucket = ?"], [bucket]
+        if site_name:
+            conditions.append("site_name = ?")
+            params.append(site_name)
+        if deleted is not None:
+            conditions.append("deleted = ?")
+            params.append(1 if deleted else 0)
+        if title:
+            escaped = title.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            conditions.append("title LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        where = " AND ".join(conditions)
+        order_column = self.SORT_COLUMNS.get(sort_by) or self.SORT_COLUMNS["time"]
+        order = "DESC" if desc else "ASC"
+        with self._lock:
+            summary = self._conn.execute(f"""
+                SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(uploaded), 0), COALESCE(SUM(downloaded), 0)
+                FROM tasks WHERE {where}
+            """, params).fetchone()
+            cursor = self._conn.execute(f"""
+                SELECT hash, data FROM tasks WHERE {where}
+                ORDER BY {order_column} {order}, hash {order} LIMIT ? OFFSET ?
+            """, [*params, max(0, int(limit)), max(0, int(offset))])
+            rows = [{**json.loads(data), "hash": torrent_hash} for torrent_hash, data in cursor]
+        return {
+            "total": summary[0],
+            "size": summary[1],
+            "uploaded": summary[2],
+            "downloaded": summary[3]
+        }, rows
+
+    def get_site_names(self, bucket: str = ACTIVE) -> List[str]:
+        """
+        获取任务涉及的站点名称
+        """
+        with self._lock:
+            cursor = self._conn.execute("SELECT DISTINCT site_name FROM tasks WHERE bucket = ? AND site_name IS NOT NULL "
+                                        "ORDER BY site_name", (bucket,))
+            return [row[0] for row in cursor]
+
+    def clear(self):
+        """
+        清除全部任务
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM tasks")
+
+    def get_seeding_size(self) -> int:
+        """
+        获取未删除的刷流任务种子总大小
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM tasks WHERE bucket = ? AND deleted = 0",
+                                     (self.ACTIVE,)).fetchone()
+            return row[0] if row else 0
+
+    def get_statistic(self) -> Dict[str, Any]:
+        """
+        基于索引聚合统计数据，不需要加载任务内容
+        """
+        with self._lock:
+            total = self._conn.execute("""
+                SELECT COUNT(*), COALESCE(SUM(deleted), 0), COALESCE(SUM(uploaded), 0), COALESCE(SUM(downloaded), 0)
+                FROM tasks WHERE bucket IN (?, ?)
+            """, (self.ACTIVE, self.ARCHIVED)).fetchone()
+            active = self._conn.execute("""
+                SELECT COALESCE(SUM(1 - deleted), 0), COALESCE(SUM(deleted), 0),
+                       COALESCE(SUM(CASE WHEN deleted = 0 THEN uploaded ELSE 0 END), 0),
+                       COALESCE(SUM(CASE WHEN deleted = 0 THEN downloaded ELSE 0 END), 0)
+                FROM tasks WHERE bucket = ?
+            """, (self.ACTIVE,)).fetchone()
+        return {
+            "count": total[0],
+            "deleted": total[1],
+            "uploaded": total[2],
+            "downloaded": total[3],
+            "active": active[0],
+            "unarchived": active[1],
+            "active_uploaded": active[2],
+            "active_downloaded": active[3]
+        }
+
+    def close(self):
+        """
+        关闭数据库连接
+        """
+        with self._lock:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+
+
+class BrushTaskIndex:
+    """
+    刷流任务去重索引，每次刷流时构建一次，新增任务时同步更新，按任务计数以便撤销预占的任务
+    """
+
+    def __init__(self, torrent_tasks: Optional[Dict[str, dict]] = None):
+        # 站点+标题 -> 任务数
+        self._title_keys: Counter = Counter()
+        # 站点+详情地址 -> 任务数
+        self._page_url_keys: Counter = Counter()
+        # 标题 -> 存在尚未下载完成任务的站点及任务数
+        self._unfinished_title_sites: Dict[str, Counter] = {}
+        for task in (torrent_tasks or {}).values():
+            self.add(task)
+
+    def add(self, task: dict):
+        """
+        将任务加入索引
+        """
+        site_name = task.get("site_name")
+        self._title_keys[f"{site_name}{task.get('title')}"] += 1
+        self._page_url_keys[f"{site_name}{task.get('page_url')}"] += 1
+        if not task.get("seed_time"):
+            self._unfinished_title_sites.setdefault(f"{task.get('title')}", Counter())[f"{site_name}"] += 1
+
+    def remove(self, task: dict):
+        """
+        将之前加入的任务移出索引，用于撤销添加下载失败的任务
+        """
+        site_name = task.get("site_name")
+        self.__decrease(self._title_keys, f"{site_name}{task.get('title')}")
+        self.__decrease(self._page_url_keys, f"{site_name}{task.get('page_url')}")
+        if not task.get("seed_time"):
+            title = f"{task.get('title')}"
+            sites = self._unfinished_title_sites.get(title)
+            if sites is not None:
+                self.__decrease(sites, f"{site_name}")
+                if not sites:
+                    del self._unfinished_title_sites[title]
+
+    @staticmethod
+    def __decrease(counter: Counter, key: str):
+        if counter[key] > 1:
+            counter[key] -= 1
+        else:
+            counter.pop(key, None)
+
+    def contains_title(self, site_name: str, title: str) -> bool:
+        """
+        是否存在站点和标题相同的任务
+        """
+        return f"{site_name}{title}" in self._title_keys
+
+    def contains_page_url(self, site_name: str, page_url: str) -> bool:
+        """
+        是否存在站点和详情地址相同的任务
+        """
+        return f"{site_name}{page_url}" in self._page_url_keys
+
+    def has_unfinished_on_other_site(self, site_name: str, title: str) -> bool:
+        """
+        其他站点是否存在尚未下载完成的相同标题任务
+        """
+        sites = self._unfinished_title_sites.get(title)
+        if not sites:
+            return False
+        return len(sites) > 1 or site_name not in sites
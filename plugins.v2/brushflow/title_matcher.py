@@ -0,0 +1,73 @@
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+
+class SubscribeTitleMatcher:
+    """
+    订阅标题多模式匹配器（Aho-Corasick自动机），构建一次后单次遍历文本即可判断是否包含任一订阅标题
+    """
+
+    def __init__(self, titles: Iterable[str]):
+        self.titles = frozenset(title for title in titles if title)
+        # 状态转移表，下标为状态
+        self._goto: List[Dict[str, int]] = [{}]
+        # 失败指针
+        self._fail: List[int] = [0]
+        # 到达该状态时命中的订阅标题（含经失败指针可达的后缀），未命中为None
+        self._output: List[Optional[str]] = [None]
+        self.__build()
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def __build(self):
+        """
+        构建字典树及失败指针
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        for title in self.titles:
+            state = 0
+            for char in title:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    fail.append(0)
+                    output.append(None)
+                state = next_state
+            # 同一状态只需记录一个命中的标题
+            if output[state] is None:
+                output[state] = title
+
+        # 按层级广度优先计算失败指针，第一层状态的失败指针均指向根节点
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                if output[next_state] is None:
+                    output[next_state] = output[fail[next_state]]
+
+    def search(self, *texts: Optional[str]) -> Optional[str]:
+        """
+        依次在文本中查找订阅标题，返回第一个命中的标题，未命中返回None
+        """
+        if not self.titles:
+            return None
+        goto, fail, output = self._goto, self._fail, self._output
+        for text in texts:
+            if not text:
+                continue
+            state = 0
+            for char in text:
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+                if output[state] is not None:
+                    return output[state]
+        return None
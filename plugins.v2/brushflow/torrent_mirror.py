@@ -0,0 +1,70 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+from app.log import logger
+
+
+class QbTorrentMirror:
+    """
+    qBittorrent种子状态本地镜像，基于 sync/maindata 的 rid 协议增量同步，仅拉取发生变化的字段
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 种子Hash -> 种子信息，字段与 torrents/info 接口一致
+        self._torrents: Dict[str, dict] = {}
+        # 最近一次同步的响应ID
+        self._rid = 0
+        # 当前同步使用的客户端，客户端变化时需要重新全量同步
+        self._client_id: Optional[int] = None
+        # 最近一次同步是否为全量同步
+        self.last_full_update = False
+        # 最近一次同步中发生变化及被移除的种子数
+        self.last_changed = 0
+        self.last_removed = 0
+
+    def reset(self):
+        """
+        清空镜像，下次同步时重新全量获取
+        """
+        with self._lock:
+            self._torrents = {}
+            self._rid = 0
+            self._client_id = None
+
+    def sync(self, qbc: Any) -> Optional[List[dict]]:
+        """
+        增量同步种子状态并返回全部种子，同步失败时返回None
+        """
+        if not qbc:
+            return None
+        with self._lock:
+            if self._client_id != id(qbc):
+                self._torrents = {}
+                self._rid = 0
+                self._client_id = id(qbc)
+            try:
+                maindata = qbc.sync_maindata(rid=self._rid)
+            except Exception as e:
+                logger.error(f"增量同步种子状态失败：{e}")
+                self._torrents = {}
+                self._rid = 0
+                return None
+
+            changed_torrents = maindata.get("torrents") or {}
+            removed_hashes = maindata.get("torrents_removed") or []
+            # 服务端要求全量更新（首次同步或rid已失效），丢弃本地镜像
+            self.last_full_update = bool(maindata.get("full_update")) or not self._rid
+            if self.last_full_update:
+                self._torrents = {}
+            for torrent_hash, fields in changed_torrents.items():
+                torrent = self._torrents.get(torrent_hash)
+                if torrent is None:
+                    torrent = self._torrents[torrent_hash] = {"hash": torrent_hash}
+                torrent.update(fields)
+            for torrent_hash in removed_hashes:
+                self._torrents.pop(torrent_hash, None)
+            self._rid = maindata.get("rid") or 0
+            self.last_changed = len(changed_torrents)
+            self.last_removed = len(removed_hashes)
+            return list(self._torrents.values())
@@ -1,6 +1,7 @@
 import glob
 import os
 import shutil
+import threading
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -19,6 +20,7 @@ from typing import Any, List, Dict, Tuple, Optional
 from app.log import logger
 from app.schemas import NotificationType
 from app.helper.downloader import DownloaderHelper
+from app.plugins.cleaninvalidseed.path_index import ContentPathIndex, get_path_size
 
 class CleanInvalidSeed(_PluginBase):
     # 插件名称
@@ -28,7 +30,7 @@ class CleanInvalidSeed(_PluginBase):
     # 插件图标
     plugin_icon = "clean_a.png"
     # 插件版本
-    plugin_version = "2.0"
+    plugin_version = "2.1.2"
     # 插件作者
     plugin_author = "DzAvril"
     # 作者主页
@@ -56,6 +58,10 @@ class CleanInvalidSeed(_PluginBase):
     _exclude_categories = ""
     _exclude_labels = ""
     _more_logs = False
+    # 统计单个无效源文件大小时最多遍历的文件数
+    _size_file_limit = 100000
+    # 退出事件
+    _event = threading.Event()
     # 定时器
     _scheduler: Optional[BackgroundScheduler] = None
     _error_msg = [
@@ -582,10 +588,8 @@ class CleanInvalidSeed(_PluginBase):
             mp_path, qb_path = path.split(":")
             source_path_map[mp_path] = qb_path
             source_paths.append(mp_path)
-        # 所有做种源文件路径
-        content_path_set = set()
-        for torrent in all_torrents:
-            content_path_set.add(torrent.content_path)
+        # 所有做种源文件路径索引
+        content_path_index = ContentPathIndex(torrent.content_path for torrent in all_torrents)
 
         message = "检测未做种无效源文件：\n"
         for source_path_str in source_paths:
@@ -604,6 +608,9 @@ class CleanInvalidSeed(_PluginBase):
             for file in source_path.iterdir():
                 source_files.append(file)
             for source_file in source_files:
+                if self._event.is_set():
+                    logger.info("检测无效源文件任务停止")
+                    return
                 skip = False
                 for key_word in exclude_key_words:
                     if key_word in source_file.name:
@@ -616,12 +623,7 @@ class CleanInvalidSeed(_PluginBase):
                 qb_path = (str(source_file)).replace(
                     source_path_str, source_path_map[source_path_str]
                 )
-                # todo: 优化性能
-                is_exist = False
-                for content_path in content_path_set:
-                    if qb_path in content_path:
-                        is_exist = True
-                        break
+                is_exist = content_path_index.contains(qb_path)
 
                 if not is_exist:
                     deleted_file_cnt += 1
@@ -647,13 +649,11 @@ class CleanInvalidSeed(_PluginBase):
         logger.info("检测无效源文件任务结束")
 
     def get_size(self, path: Path):
-        total_size = 0
-        if path.is_file():
-            return path.stat().st_size
-        # rglob 方法用于递归遍历所有文件和目录
-        for entry in path.rglob("*"):
-            if entry.is_file():
-                total_size += entry.stat().st_size
+        total_size, file_count, completed = get_path_size(str(path),
+                                                         max_files=self._size_file_limit,
+                                                         event=self._event)
+        if not completed:
+            logger.warning(f"{path} 文件数超过 {self._size_file_limit} 或任务已停止，仅统计了 {file_count} 个文件的大小")
         return total_size
 
     def get_form(self) -> Tuple[List[dict], Dict[str, Any]]:
@@ -996,7 +996,9 @@ class CleanInvalidSeed(_PluginBase):
             if self._scheduler:
                 self._scheduler.remove_all_jobs()
                 if self._scheduler.running:
+                    self._event.set()
                     self._scheduler.shutdown()
+                    self._event.clear()
                 self._scheduler = None
         except Exception as e:
             logger.error("退出插件失败：%s" % str(e))
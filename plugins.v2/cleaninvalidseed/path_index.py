@@ -0,0 +1,94 @@
+import os
+import threading
+from bisect import bisect_left
+from typing import Iterable, Iterator, Optional, Tuple
+
+
+class ContentPathIndex:
+    """
+    做种内容路径索引，判断路径是否为任一做种内容路径的一部分，结果与逐个执行 path in content_path 一致
+    以 / 开头的路径只可能从做种内容路径的开头或某个 / 处开始匹配，对这些位置起的后缀排序后二分查找前缀
+    其它路径未命中前缀时再在合并后的路径文本中查找子串
+    """
+
+    # 路径分隔符
+    _PATH_SEPARATOR = "/"
+    # 合并路径文本的分隔符
+    _SEPARATOR = "\n"
+
+    def __init__(self, content_paths: Iterable[Optional[str]]):
+        self._paths = sorted({path for path in content_paths if path})
+        self._suffixes = sorted({path[index:] for path in self._paths
+                                 for index in self.__separator_indexes(path)})
+        self._joined = self._SEPARATOR.join(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    @classmethod
+    def __separator_indexes(cls, path: str) -> Iterator[int]:
+        """
+        路径开头及各分隔符所在位置
+        """
+        yield 0
+        index = path.find(cls._PATH_SEPARATOR, 1)
+        while index != -1:
+            yield index
+            index = path.find(cls._PATH_SEPARATOR, index + 1)
+
+    def contains(self, path: str) -> bool:
+        """
+        是否存在包含该路径的做种内容路径
+        """
+        if not self._paths:
+            return False
+        # 前缀匹配：以path开头的后缀中最小的一个排在二分查找位置
+        index = bisect_left(self._suffixes, path)
+        if index < len(self._suffixes) and self._suffixes[index].startswith(path):
+            return True
+        # 以分隔符开头的路径已覆盖全部可能的匹配位置
+        if path.startswith(self._PATH_SEPARATOR):
+            return False
+        # 路径本身含分隔符时无法使用合并文本，逐个判断
+        if self._SEPARATOR in path:
+            return any(path in content_path for content_path in self._paths)
+        return path in self._joined
+
+
+def get_path_size(path: str, max_files: int = 0,
+                  event: Optional[threading.Event] = None) -> Tuple[int, int, bool]:
+    """
+    使用 os.scandir 遍历统计文件或目录占用空间，不跟随目录符号链接
+    :param path: 文件或目录路径
+    :param max_files: 最多统计的文件数，0为不限制
+    :param event: 退出事件，设置后停止统计
+    :return: 总大小, 统计的文件数, 是否完整统计
+    """
+    try:
+        if not os.path.isdir(path):
+            return (os.stat(path).st_size, 1, True) if os.path.isfile(path) else (0, 0, True)
+    except OSError:
+        return 0, 0, True
+    total_size = 0
+    file_count = 0
+    stack = [path]
+    while stack:
+        if event and event.is_set():
+            return total_size, file_count, False
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            # 已统计到上限且仍有其它文件时才视为未完整统计
+                            if max_files and file_count >= max_files:
+                                return total_size, file_count, False
+                            total_size += entry.stat().st_size
+                            file_count += 1
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total_size, file_count, True
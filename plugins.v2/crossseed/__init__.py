@@ -1,7 +1,9 @@
-import hashlib
 import os
 import re
+import sqlite3
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
 from pathlib import Path
 from threading import Event
@@ -11,7 +13,6 @@ import pytz
 import requests
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
-from bencode import bdecode, bencode
 
 from app.core.config import settings
 from app.core.event import eventmanager
@@ -21,6 +22,7 @@ from app.helper.sites import SitesHelper
 from app.helper.torrent import TorrentHelper
 from app.log import logger
 from app.plugins import _PluginBase
+from app.plugins.crossseed.torrent_parser import parse_torrent_data, parse_torrent_file
 from app.schemas import NotificationType, ServiceInfo
 from app.schemas.types import EventType
 from app.utils.string import StringUtils
@@ -96,15 +98,9 @@ class TorInfo:
     @staticmethod
     def from_data(data: bytes) -> Tuple[Optional[Any], Optional[str]]:
         try:
-            torrent = bdecode(data)
-            info = torrent["info"]
-            pieces = info["pieces"]
-            info_hash = hashlib.sha1(bencode(info)).hexdigest()
-            pieces_hash = hashlib.sha1(pieces).hexdigest()
+            info_hash, pieces_hash, announce = parse_torrent_data(data)
             local_tor = TorInfo(info_hash=info_hash, pieces_hash=pieces_hash)
-            # 从种子中获取 announce, qb可能存在获取不到的情况，会存在于fastresume文件中
-            if "announce" in torrent:
-                local_tor.torrent_announce = torrent["announce"]
+            local_tor.torrent_announce = announce
             return local_tor, None
         except Exception as err:
             return None, str(err)
@@ -116,6 +112,152 @@ class TorInfo:
         return f"{self.site_name}:{self.pieces_hash}"
 
 
+class TorrentFileCache(object):
+    """
+    本地种子文件解析缓存，按 (路径, 修改时间, 文件大小) 缓存解析结果，文件未变化时不再读取及解析
+    """
+
+    # 累计多少条新解析的结果后写入数据库
+    _flush_size = 500
+
+    def __init__(self, db_path: Path):
+        self._lock = threading.Lock()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS torrent_files (
+                    path TEXT PRIMARY KEY,
+                    mtime INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    info_hash TEXT NOT NULL,
+                    pieces_hash TEXT NOT NULL,
+                    announce TEXT
+                )
+            """)
+        # 待写入的解析结果
+        self._pending: List[tuple] = []
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get_stats(self) -> str:
+        return f"命中 {self.hits}，未命中 {self.misses}，命中率 {self.hit_ratio:.1%}，缓存条数 {self.count()}"
+
+    def get_cached(self, torrent_path: Path | str) -> Tuple[Optional[TorInfo], Optional[os.stat_result]]:
+        """
+        查询缓存，返回缓存的种子信息（文件已变化或未缓存时为None）及文件状态
+        """
+        path = str(torrent_path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None, None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT info_hash, pieces_hash, announce FROM torrent_files WHERE path = ? AND mtime = ? AND size = ?",
+                (path, stat.st_mtime_ns, stat.st_size)).fetchone()
+        if not row:
+            self.misses += 1
+            return None, stat
+        self.hits += 1
+        torrent_info = TorInfo.local(torrent_path=path, info_hash=row[0], pieces_hash=row[1])
+        torrent_info.torrent_announce = row[2]
+        return torrent_info, stat
+
+    def put(self, torrent_path: Path | str, stat: os.stat_result, torrent_info: TorInfo):
+        """
+        缓存种子文件解析结果
+        """
+        announce = torrent_info.torrent_announce
+        if isinstance(announce, bytes):
+            announce = announce.decode("utf-8", errors="ignore")
+        with self._lock:
+            self._pending.append((str(torrent_path), stat.st_mtime_ns, stat.st_size,
+                                  torrent_info.info_hash, torrent_info.pieces_hash, announce))
+            if len(self._pending) >= self._flush_size:
+                self.__flush()
+
+    def get_local_torrent_info(self, torrent_path: Path | str) -> Tuple[Optional[TorInfo], str]:
+        """
+        获取种子文件信息，文件未变化时直接使用缓存
+        """
+        torrent_info, stat = self.get_cached(torrent_path)
+        if torrent_info:
+            return torrent_info, ""
+        torrent_info, err = CrossSeedHelper.get_local_torrent_info(torrent_path)
+        if torrent_info and stat:
+            self.put(torrent_path, stat, torrent_info)
+        return torrent_info, err
+
+    def __flush(self):
+        if not self._pending:
+            return
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO torrent_files VALUES (?, ?, ?, ?, ?, ?)", self._pending)
+        self._pending = []
+
+    def flush(self):
+        """
+        写入待保存的解析结果
+        """
+        with self._lock:
+            self.__flush()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM torrent_files").fetchone()[0]
+
+    def clear(self):
+        """
+        清空缓存
+        """
+        with self._lock, self._conn:
+            self._pending = []
+            self._conn.execute("DELETE FROM torrent_files")
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+
+class SiteRateLimiter(object):
+    """
+    站点查询令牌桶限速器，每 query_gap 秒生成一个令牌，桶容量为1
+    """
+
+    def __init__(self, query_gap: float, stop_event: Optional[Event] = None):
+        self._interval = max(float(query_gap or 0), 0)
+        self._stop_event = stop_event
+        self._lock = threading.Lock()
+        # 下一个令牌可用的时间
+        self._next_time = 0.0
+
+    def acquire(self) -> bool:
+        """
+        获取令牌，令牌不足时等待，等待期间收到停止事件返回False
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self._next_time - now
+            self._next_time = max(now, self._next_time) + self._interval
+        if wait_time > 0:
+            if self._stop_event:
+                return not self._stop_event.wait(wait_time)
+            time.sleep(wait_time)
+        return True
+
+
 class CrossSeedHelper(object):
     _version = "0.2.0"
 
@@ -138,10 +280,14 @@ class CrossSeedHelper(object):
     @staticmethod
     def get_target_torrent(
             site: CSSiteConfig,
-            pieces_hash_set: List[str]
+            pieces_hash_set: List[str],
+            session: Optional[requests.Session] = None,
+            limiter: Optional[SiteRateLimiter] = None
     ) -> Tuple[Optional[List[TorInfo]], Optional[str]]:
         """
         返回pieces_hash对应的种子信息，包括站点id,pieces_hash,种子id
+        :param session: 复用连接的会话，为空时每次新建连接
+        :param limiter: 站点限速器，为空时每次请求后等待 query_gap 秒
         """
         headers = {
             "Content-Type": "application/json",
@@ -150,8 +296,10 @@ class CrossSeedHelper(object):
         }
         data = {"passkey": site.passkey, "pieces_hash": pieces_hash_set}
         remote_torrent_infos = []
+        if limiter and not limiter.acquire():
+            return None, f"站点{site.name}查询已停止"
         try:
-            response = requests.post(
+            response = (session or requests).post(
                 site.get_api_url(),
                 headers=headers,
                 json=data,
@@ -165,7 +313,8 @@ class CrossSeedHelper(object):
                     remote_torrent_infos.append(
                         TorInfo.remote(site.name, pieces_hash, torrent_id)
                     )
-            time.sleep(site.query_gap)
+            if not limiter:
+                time.sleep(site.query_gap)
         except requests.exceptions.RequestException as e:
             return None, f"站点{site.name}请求失败：{e}"
         return remote_torrent_infos, None
@@ -179,7 +328,7 @@ class CrossSeed(_PluginBase):
     # 插件图标
     plugin_icon = "qingwa.png"
     # 插件版本
-    plugin_version = "3.0.1"
+    plugin_version = "3.3.2"
     # 插件作者
     plugin_author = "233@qingwa"
     # 作者主页
@@ -206,6 +355,8 @@ class CrossSeed(_PluginBase):
     _downloaders = []
     _sites = []
     _torrentpath = None
+    # 解析种子文件的线程数
+    _scanworkers = 4
     _notify = False
     _nolabels = None
     _nopaths = None
@@ -224,6 +375,8 @@ class CrossSeed(_PluginBase):
     _permanent_error_caches = []
     _torrentpaths = []
     _site_cs_infos = []
+    # 本地种子文件解析缓存
+    _torrent_cache: Optional[TorrentFileCache] = None
     # 辅种计数
     total = 0
     realtotal = 0
@@ -247,6 +400,11 @@ class CrossSeed(_PluginBase):
             self._downloaders = config.get("downloaders")
             self._torrentpath = config.get("torrentpath")  # 种子路径和下载器对应  /qb,/tr
             self._torrentpaths = self._torrentpath.strip().split(",")
+            try:
+                self._scanworkers = max(int(config.get("scanworkers")), 0) \
+                    if config.get("scanworkers") not in (None, "") else 4
+            except (ValueError, TypeError):
+                self._scanworkers = 4
             self._sites = config.get("sites") or []
             self._notify = config.get("notify")
             self._nolabels = config.get("nolabels")
@@ -386,7 +544,19 @@ class CrossSeed(_PluginBase):
 
     @staticmethod
     def get_command() -> List[Dict[str, Any]]:
-        pass
+        """
+        定义远程控制命令
+        :return: 命令关键字、事件、描述、附带数据
+        """
+        return [{
+            "cmd": "/cross_seed_cache_rebuild",
+            "event": EventType.PluginAction,
+            "desc": "重建辅种种子文件缓存",
+            "category": "站点",
+            "data": {
+                "action": "cross_seed_cache_rebuild"
+            }
+        }]
 
     def get_api(self) -> List[Dict[str, Any]]:
         pass
@@ -589,7 +759,7 @@ class CrossSeed(_PluginBase):
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
-                                    'md': 12
+                                    'md': 8
                                 },
                                 'content': [
                                     {
@@ -601,6 +771,23 @@ class CrossSeed(_PluginBase):
                                         }
                                     }
                                 ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'scanworkers',
+                                            'label': '种子文件解析线程数',
+                                            'placeholder': '0或1为不并行解析'
+                                        }
+                                    }
+                                ]
                             }
                         ]
                     },
@@ -737,6 +924,7 @@ class CrossSeed(_PluginBase):
             "token": "",
             "downloaders": [],
             "torrentpath": "",
+            "scanworkers": 4,
             "sites": [],
             "nopaths": "",
             "nolabels": ""
@@ -754,6 +942,7 @@ class CrossSeed(_PluginBase):
             "token": self._token,
             "downloaders": self._downloaders,
             "torrentpath": self._torrentpath,
+            "scanworkers": self._scanworkers,
             "sites": self._sites,
             "notify": self._notify,
             "nolabels": self._nolabels,
@@ -779,6 +968,8 @@ class CrossSeed(_PluginBase):
         self.exist = 0
         self.fail = 0
         self.cached = 0
+        torrent_cache = self.__get_torrent_cache()
+        torrent_cache.reset_stats()
         # 扫描下载器辅种
         for idx, service in enumerate(self.service_infos.values()):
             downloader = service.name
@@ -791,7 +982,8 @@ class CrossSeed(_PluginBase):
             else:
                 logger.info(f"下载器 {downloader} 没有已完成种子")
                 continue
-            hash_strs = []
+            # 先按缓存及路径、标签等不需要种子文件的条件过滤
+            candidates = []
             for torrent in torrents:
                 if self._event.is_set():
                     logger.info("辅种服务停止")
@@ -802,32 +994,44 @@ class CrossSeed(_PluginBase):
                     logger.info(f"种子 {hash_str} 辅种失败且已缓存，跳过 ...")
                     continue
                 save_path = self.__get_save_path(torrent, service.type)
+
+                if self._nopaths and save_path:
+                    # 过滤不需要转移的路径
+                    nopath_skip = False
+                    for nopath in self._nopaths.split('\n'):
+                        if os.path.normpath(save_path).startswith(os.path.normpath(nopath)):
+                            logger.info(f"种子 {hash_str} 保存路径 {save_path} 不需要辅种，跳过 ...")
+                            nopath_skip = True
+                            break
+                    if nopath_skip:
+                        continue
+
+                # 获取种子标签
+                torrent_labels = self.__get_label(torrent, service.type)
+                if torrent_labels and self._nolabels:
+                    is_skip = False
+                    for label in self._nolabels.split(','):
+                        if label in torrent_labels:
+                            logger.info(f"种子 {hash_str} 含有不辅种标签 {label}，跳过 ...")
+                            is_skip = True
+                            break
+                    if is_skip:
+                        continue
+
                 # 获取种子文件路径
                 torrent_path = Path(self._torrentpaths[idx]) / f"{hash_str}.torrent"
-                torrent_info = None
                 if not torrent_path.exists():
-                    if False and service.type == "qbittorrent":
-                        # qb开启SQLite功能后将不再以hash命名的方式保存torrent文件
-                        # TODO 导出功能需要qb4.5.0以上版本才支持
-                        logger.warn(f"QB种子文件不存在：{torrent_path} 尝试远程导出种子")
-                        try:
-                            torrent_data = torrent.export()
-                            torrent_info, err = TorInfo.from_data(torrent_data)
-                        except Exception as e:
-                            err = str(e)
-                        if not torrent_info:
-                            logger.error(f"尝试远程导出种子 {hash_str} 出错 {err}")
-                            continue
-                    else:
-                        logger.error(f"种子文件不存在：{torrent_path}")
-                        continue
+                    logger.error(f"种子文件不存在：{torrent_path}")
+                    continue
+                candidates.append((torrent, hash_str, save_path, torrent_path))
 
-                # 读取种子文件具体信息
+            # 读取种子文件具体信息，未命中缓存的种子文件由线程池并行解析
+            hash_strs = []
+            for (torrent, hash_str, save_path, torrent_path), torrent_info, err in \
+                    self.__iter_torrent_infos(candidates=candidates, torrent_cache=torrent_cache):
                 if not torrent_info:
-                    torrent_info, err = self.cross_helper.get_local_torrent_info(torrent_path)
-                    if not torrent_info:
-                        logger.error(f"未能读取到种子文件具体信息：{torrent_path} {err}")
-                        continue
+                    logger.error(f"未能读取到种子文件具体信息：{torrent_path} {err}")
+                    continue
 
                 # 用站点+pieces_hash记录该站点是否已经在该下载器中,需要从tracker补充站点名字
                 tracker_urls = set()
@@ -856,33 +1060,16 @@ class CrossSeed(_PluginBase):
                         if site_info:
                             torrent_info.site_name = site_info.get("name")
 
-                if self._nopaths and save_path:
-                    # 过滤不需要转移的路径
-                    nopath_skip = False
-                    for nopath in self._nopaths.split('\n'):
-                        if os.path.normpath(save_path).startswith(os.path.normpath(nopath)):
-                            logger.info(f"种子 {hash_str} 保存路径 {save_path} 不需要辅种，跳过 ...")
-                            nopath_skip = True
-                            break
-                    if nopath_skip:
-                        continue
-
-                # 获取种子标签
-                torrent_labels = self.__get_label(torrent, service.type)
-                if torrent_labels and self._nolabels:
-                    is_skip = False
-                    for label in self._nolabels.split(','):
-                        if label in torrent_labels:
-                            logger.info(f"种子 {hash_str} 含有不辅种标签 {label}，跳过 ...")
-                            is_skip = True
-                            break
-                    if is_skip:
-                        continue
                 hash_strs.append({
                     "hash": hash_str,
                     "save_path": save_path,
                     "torrent_info": torrent_info
                 })
+            if self._event.is_set():
+                logger.info("辅种服务停止")
+                return
+            torrent_cache.flush()
+            logger.info(f"下载器 {downloader} 种子文件缓存{torrent_cache.get_stats()}")
             if hash_strs:
                 self.__seed_torrents(hash_strs=hash_strs, service=service)
                 # 触发校验检查
@@ -906,6 +1093,66 @@ class CrossSeed(_PluginBase):
                 )
         logger.info("辅种任务执行完成")
 
+    def __iter_torrent_infos(self, candidates: List[tuple], torrent_cache: TorrentFileCache):
+        """
+        依次返回 (候选种子, 种子信息, 错误信息)，命中缓存的直接返回，未命中的由线程池并行解析后按完成顺序返回
+        """
+        misses = []
+        for candidate in candidates:
+            torrent_info, stat = torrent_cache.get_cached(candidate[3])
+            if torrent_info:
+                yield candidate, torrent_info, ""
+            else:
+                misses.append((candidate, stat))
+        if not misses:
+            return
+
+        logger.info(f"共 {len(misses)} 个种子文件需要解析 ...")
+        # 未配置并行解析或数量较少时直接解析
+        if self._scanworkers <= 1 or len(misses) < self._scanworkers * 2:
+            for candidate, stat in misses:
+                if self._event.is_set():
+                    return
+                torrent_info, err = CrossSeedHelper.get_local_torrent_info(candidate[3])
+                if torrent_info and stat:
+                    torrent_cache.put(candidate[3], stat, torrent_info)
+                yield candidate, torrent_info, err
+            return
+
+        # 使用线程池，计算SHA1及读取文件时会释放GIL
+        executor = ThreadPoolExecutor(max_workers=self._scanworkers, thread_name_prefix="CrossSeedScan")
+        # 限制同时提交的任务数，避免一次性提交全部种子文件
+        pending = {}
+        misses_iter = iter(misses)
+        try:
+            while True:
+                while len(pending) < self._scanworkers * 2:
+                    item = next(misses_iter, None)
+                    if item is None:
+                        break
+                    pending[executor.submit(parse_torrent_file, str(item[0][3]))] = item
+                if not pending:
+                    break
+                done, _ = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+                if self._event.is_set():
+                    return
+                for future in done:
+                    candidate, stat = pending.pop(future)
+                    try:
+                        result, err = future.result()
+                    except Exception as e:
+                        result, err = None, str(e)
+                    torrent_info = None
+                    if result:
+                        torrent_info = TorInfo.local(torrent_path=str(candidate[3]),
+                                                     info_hash=result[0], pieces_hash=result[1])
+                        torrent_info.torrent_announce = result[2]
+                        if stat:
+                            torrent_cache.put(candidate[3], stat, torrent_info)
+                    yield candidate, torrent_info, err
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
     def check_recheck(self):
         """
         定时检查下载器中种子是否校验完成，校验完成且完整的自动开始辅种
@@ -978,35 +1225,33 @@ class CrossSeed(_PluginBase):
         logger.info(f"去重后，总共需要辅种查询的种子数：{len(pieces_hash_set)}")
         pieces_hashes = list(pieces_hash_set)
 
-        # 分站点逐个批次辅种
-        # 逐个站点查询可辅种数据
-        chunk_size = 100
+        # 检查站点是否已经停用
+        site_configs = []
         for site_config in self._site_cs_infos:
-            # 检查站点是否已经停用
             db_site = self.siteoper.get(site_config.id)
             if db_site and not db_site.is_active:
                 logger.info(f"站点{site_config.name}已停用，跳过辅种")
                 continue
-            remote_tors: List[TorInfo] = []
-            total_size = len(pieces_hashes)
-            for i in range(0, len(pieces_hashes), chunk_size):
-                if self._event.is_set():
-                    logger.info("辅种服务停止")
-                    return
-                # 切片操作
-                chunk = pieces_hashes[i:i + chunk_size]
-                # 处理分组
-                chunk_tors, err_msg = self.cross_helper.get_target_torrent(site_config, chunk)
-                if not chunk_tors and err_msg:
-                    logger.info(
-                        f"查询站点{site_config.name}可辅种的信息出错 {err_msg},进度={i + 1}/{total_size}"
-                    )
-                else:
-                    logger.info(
-                        f"站点{site_config.name}本批次的可辅种/查询数={len(chunk_tors)}/{len(chunk)},进度={i + 1}/{total_size}"
-                    )
-                    remote_tors = remote_tors + chunk_tors
+            site_configs.append(site_config)
+        if not site_configs:
+            return
+
+        # 各站点并发查询可辅种数据，站点内按查询间隔限速
+        with ThreadPoolExecutor(max_workers=min(len(site_configs), 8),
+                                thread_name_prefix="CrossSeedQuery") as executor:
+            site_futures = [(site_config, executor.submit(self.__query_site_torrents, site_config, pieces_hashes))
+                            for site_config in site_configs]
+            site_results = [(site_config, future.result()) for site_config, future in site_futures]
+        if self._event.is_set():
+            logger.info("辅种服务停止")
+            return
 
+        summary = "，".join(f"{site_config.name} {result['summary']}" for site_config, result in site_results)
+        logger.info(f"下载器 {service.name} 各站点查询完成：{summary}")
+
+        # 分站点逐个辅种
+        for site_config, result in site_results:
+            remote_tors: List[TorInfo] = result["torrents"]
             logger.info(f"站点{site_config.name}返回可以辅种的种子总数为{len(remote_tors)}")
 
             # 去除已经下载过的种子
@@ -1045,6 +1290,43 @@ class CrossSeed(_PluginBase):
 
         logger.info(f"下载器 {service.name} 辅种完成")
 
+    def __query_site_torrents(self, site_config: CSSiteConfig, pieces_hashes: List[str]) -> Dict[str, Any]:
+        """
+        分批查询站点可辅种数据，使用复用连接的会话及站点限速器
+        """
+        chunk_size = 100
+        remote_tors: List[TorInfo] = []
+        total_size = len(pieces_hashes)
+        start_time = time.time()
+        chunks = failed = 0
+        limiter = SiteRateLimiter(query_gap=site_config.query_gap, stop_event=self._event)
+        with requests.Session() as session:
+            for i in range(0, total_size, chunk_size):
+                if self._event.is_set():
+                    break
+                # 切片操作
+                chunk = pieces_hashes[i:i + chunk_size]
+                # 处理分组
+                chunk_tors, err_msg = self.cross_helper.get_target_torrent(site_config, chunk,
+                                                                           session=session, limiter=limiter)
+                chunks += 1
+                if not chunk_tors and err_msg:
+                    failed += 1
+                    logger.info(
+                        f"查询站点{site_config.name}可辅种的信息出错 {err_msg},进度={i + 1}/{total_size}"
+                    )
+                else:
+                    logger.info(
+                        f"站点{site_config.name}本批次的可辅种/查询数={len(chunk_tors)}/{len(chunk)},进度={i + 1}/{total_size}"
+                    )
+                    remote_tors.extend(chunk_tors)
+        elapsed = time.time() - start_time
+        return {
+            "torrents": remote_tors,
+            "summary": f"批次 {chunks}（失败 {failed}），可辅种 {len(remote_tors)}，耗时 {elapsed:.1f} 秒，"
+                       f"{min(chunks * chunk_size, total_size) / elapsed if elapsed else 0:.0f} 条/秒"
+        }
+
     def __download(self, service: ServiceInfo, content: Union[bytes, str],
                    save_path: str) -> Optional[str]:
         """
@@ -1223,9 +1505,61 @@ class CrossSeed(_PluginBase):
                     self._scheduler.shutdown()
                     self._event.clear()
                 self._scheduler = None
+            if self._torrent_cache:
+                self._torrent_cache.close()
+                self._torrent_cache = None
         except Exception as e:
             print(str(e))
 
+    def __get_torrent_cache(self) -> TorrentFileCache:
+        """
+        获取本地种子文件解析缓存
+        """
+        if not self._torrent_cache:
+            self._torrent_cache = TorrentFileCache(self.get_data_path() / "torrent_cache.db")
+        return self._torrent_cache
+
+    @eventmanager.register(EventType.PluginAction)
+    def rebuild_cache(self, event=None):
+        """
+        清空并重建本地种子文件解析缓存
+        """
+        if event:
+            event_data = event.event_data
+            if not event_data or event_data.get("action") != "cross_seed_cache_rebuild":
+                return
+        if not self._torrentpaths:
+            return
+
+        logger.info("开始重建辅种种子文件缓存 ...")
+        start_time = time.time()
+        torrent_cache = self.__get_torrent_cache()
+        torrent_cache.clear()
+        torrent_cache.reset_stats()
+        failed = 0
+        for torrentpath in self._torrentpaths:
+            torrent_dir = Path(torrentpath.strip())
+            if not torrent_dir.is_dir():
+                logger.warn(f"种子文件目录不存在：{torrent_dir}")
+                continue
+            for torrent_path in torrent_dir.glob("*.torrent"):
+                if self._event.is_set():
+                    logger.info("辅种服务停止")
+                    torrent_cache.flush()
+                    return
+                torrent_info, err = torrent_cache.get_local_torrent_info(torrent_path)
+                if not torrent_info:
+                    failed += 1
+                    logger.debug(f"未能读取到种子文件具体信息：{torrent_path} {err}")
+        torrent_cache.flush()
+        msg = (f"辅种种子文件缓存重建完成，共缓存 {torrent_cache.count()} 个种子文件，"
+               f"解析失败 {failed} 个，耗时 {time.time() - start_time:.1f} 秒")
+        logger.info(msg)
+        if event:
+            self.post_message(channel=event.event_data.get("channel"),
+                              title="【青蛙辅种助手】", text=msg,
+                              userid=event.event_data.get("user"))
+
     def __custom_sites(self) -> List[Any]:
         custom_sites = []
         custom_sites_config = self.get_config("CustomSites")
@@ -0,0 +1,28 @@
+import hashlib
+from typing import Any, Optional, Tuple
+
+from bencode import bdecode, bencode
+
+
+def parse_torrent_data(data: bytes) -> Tuple[str, str, Any]:
+    """
+    解析种子内容，返回 (info_hash, pieces_hash, announce)，announce不存在时为None
+    """
+    torrent = bdecode(data)
+    info = torrent["info"]
+    pieces = info["pieces"]
+    info_hash = hashlib.sha1(bencode(info)).hexdigest()
+    pieces_hash = hashlib.sha1(pieces).hexdigest()
+    # 从种子中获取 announce, qb可能存在获取不到的情况，会存在于fastresume文件中
+    return info_hash, pieces_hash, torrent.get("announce")
+
+
+def parse_torrent_file(torrent_path: str) -> Tuple[Optional[Tuple[str, str, Any]], str]:
+    """
+    解析种子文件，供线程池调用，返回 (info_hash, pieces_hash, announce) 及错误信息
+    """
+    try:
+        with open(torrent_path, "rb") as f:
+            return parse_torrent_data(f.read()), ""
+    except Exception as err:
+        return None, str(err)
@@ -1,7 +1,9 @@
 import os
+import queue
 import re
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta
-from threading import Event
+from threading import Event, Lock, Semaphore, Thread
 from typing import Any, Dict, List, Optional, Tuple
 
 import pytz
@@ -19,6 +21,7 @@ from app.helper.torrent import TorrentHelper
 from app.log import logger
 from app.plugins import _PluginBase
 from app.plugins.iyuuautoseed.iyuu_helper import IyuuHelper
+from app.plugins.iyuuautoseed.seed_cache import SeedHashCache, SeedQueryJournal
 from app.schemas import NotificationType, ServiceInfo
 from app.schemas.types import EventType
 from app.utils.http import RequestUtils
@@ -33,7 +36,7 @@ class IYUUAutoSeed(_PluginBase):
     # 插件图标
     plugin_icon = "IYUU.png"
     # 插件版本
-    plugin_version = "2.14"
+    plugin_version = "2.17.3"
     # 插件作者
     plugin_author = "jxxghp,CKun"
     # 作者主页
@@ -72,6 +75,14 @@ class IYUUAutoSeed(_PluginBase):
     _addhosttotag = False
     _size = None
     _clearcache = False
+    # 辅种失败缓存有效期（天），0为永久有效
+    _errorcachedays = 7
+    # 同时下载添加辅种的数量
+    _seedworkers = 4
+    # 单个站点同时下载种子的数量
+    _site_concurrency = 1
+    # IYUU查询预取的分组数量
+    _prefetch_chunks = 2
     # 退出事件
     _event = Event()
     # 种子链接xpaths
@@ -84,12 +95,14 @@ class IYUUAutoSeed(_PluginBase):
     # 待校全种子hash清单
     _recheck_torrents = {}
     _is_recheck_running = False
-    # 辅种缓存，出错的种子不再重复辅种，可清除
-    _error_caches = []
-    # 辅种缓存，辅种成功的种子，可清除
-    _success_caches = []
-    # 辅种缓存，出错的种子不再重复辅种，且无法清除。种子被删除404等情况
-    _permanent_error_caches = []
+    # 辅种缓存，记录辅种成功、出错（有效期内不再重复辅种）及永久出错（种子被删除404等情况）的种子
+    _seed_cache: Optional[SeedHashCache] = None
+    # 辅种查询记录，未到查询间隔的种子不再重复向IYUU查询
+    _query_journal: Optional[SeedQueryJournal] = None
+    # 并发辅种时保护计数器及校验任务列表
+    _lock = Lock()
+    # 站点域名 -> 站点下载并发信号量
+    _site_semaphores: Dict[str, Semaphore] = {}
     # 辅种计数
     total = 0
     realtotal = 0
@@ -123,9 +136,15 @@ class IYUUAutoSeed(_PluginBase):
             self._addhosttotag = config.get("addhosttotag")
             self._size = float(config.get("size")) if config.get("size") else 0
             self._clearcache = config.get("clearcache")
-            self._permanent_error_caches = [] if self._clearcache else config.get("permanent_error_caches") or []
-            self._error_caches = [] if self._clearcache else config.get("error_caches") or []
-            self._success_caches = [] if self._clearcache else config.get("success_caches") or []
+            try:
+                self._errorcachedays = max(float(config.get("errorcachedays")), 0) \
+                    if config.get("errorcachedays") not in (None, "") else 7
+            except (ValueError, TypeError):
+                self._errorcachedays = 7
+            try:
+                self._seedworkers = max(int(config.get("seedworkers") or 4), 1)
+            except (ValueError, TypeError):
+                self._seedworkers = 4
 
             # 过滤掉已删除的站点
             all_sites = [site.id for site in self.site_oper.list_order_by_pri()] + [site.get("id") for site in
@@ -136,6 +155,9 @@ class IYUUAutoSeed(_PluginBase):
         # 停止现有任务
         self.stop_service()
 
+        # 初始化辅种缓存
+        self.__init_seed_cache(config)
+
         # 启动定时任务 & 立即运行一次
         if self.get_state() or self._onlyonce:
             self.iyuu_helper = IyuuHelper(token=self._token)
@@ -331,7 +353,7 @@ class IYUUAutoSeed(_PluginBase):
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
-                                    'md': 6
+                                    'md': 4
                                 },
                                 'content': [
                                     {
@@ -347,7 +369,7 @@ class IYUUAutoSeed(_PluginBase):
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
-                                    'md': 6
+                                    'md': 4
                                 },
                                 'content': [
                                     {
@@ -360,6 +382,24 @@ class IYUUAutoSeed(_PluginBase):
                                     }
                                 ]
                             },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'seedworkers',
+                                            'label': '辅种并发数',
+                                            'type': 'number',
+                                            'placeholder': '同时下载添加的种子数，同一站点不并发'
+                                        }
+                                    }
+                                ]
+                            },
                         ]
                     },
                     {
@@ -369,7 +409,7 @@ class IYUUAutoSeed(_PluginBase):
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
-                                    'md': 4
+                                    'md': 3
                                 },
                                 'content': [
                                     {
@@ -390,7 +430,7 @@ class IYUUAutoSeed(_PluginBase):
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
-                                    'md': 4
+                                    'md': 3
                                 },
                                 'content': [
                                     {
@@ -410,7 +450,7 @@ class IYUUAutoSeed(_PluginBase):
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
-                                    'md': 4
+                                    'md': 3
                                 },
                                 'content': [
                                     {
@@ -422,6 +462,23 @@ class IYUUAutoSeed(_PluginBase):
                                         }
                                     }
                                 ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'errorcachedays',
+                                            'label': '失败缓存有效期(天)',
+                                            'placeholder': '过期后重新尝试辅种，0为永久有效'
+                                        }
+                                    }
+                                ]
                             }
                         ]
                     },
@@ -654,11 +711,92 @@ class IYUUAutoSeed(_PluginBase):
             "nolabels": "",
             "labelsafterseed": "",
             "categoryafterseed": "",
-            "size": ""
+            "size": "",
+            "errorcachedays": 7,
+            "seedworkers": 4
         }
 
     def get_page(self) -> List[dict]:
-        pass
+        """
+        拼装插件详情页面，展示辅种查询队列及缓存统计
+        """
+        if not self._query_journal or not self._seed_cache:
+            return [
+                {
+                    'component': 'div',
+                    'text': '暂无数据',
+                    'props': {
+                        'class': 'text-center',
+                    }
+                }
+            ]
+        journal_stats = self._query_journal.get_stats()
+        cache_counts = self._seed_cache.count()
+        query_stats = self.get_data(key="query_stats") or {}
+        items = [
+            ('已记录种子', journal_stats.get("total")),
+            ('待查询种子', journal_stats.get("due")),
+            ('有辅种结果', journal_stats.get("seeded")),
+            ('上次查询 / 跳过', f"{query_stats.get('queried', 0)} / {query_stats.get('skipped', 0)}"),
+            ('辅种成功缓存', cache_counts.get(SeedHashCache.SUCCESS)),
+            ('辅种失败缓存 / 永久', f"{cache_counts.get(SeedHashCache.ERROR)} / "
+                              f"{cache_counts.get(SeedHashCache.PERMANENT)}")
+        ]
+        schedule = "，".join(
+            f"{'其余' if max_age is None else f'{max_age // 86400}天内'}每"
+            f"{f'{interval // 86400}天' if interval >= 86400 else f'{interval // 3600}小时'}"
+            for max_age, interval in SeedQueryJournal.SCHEDULE)
+        return [
+            {
+                'component': 'VRow',
+                'content': [
+                    {
+                        'component': 'VCol',
+                        'props': {
+                            'cols': 12,
+                            'md': 4,
+                            'sm': 6
+                        },
+                        'content': [
+                            {
+                                'component': 'VCard',
+                                'props': {
+                                    'variant': 'tonal',
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VCardText',
+                                        'content': [
+                                            {
+                                                'component': 'span',
+                                                'props': {
+                                                    'class': 'text-caption'
+                                                },
+                                                'text': title
+                                            },
+                                            {
+                                                'component': 'div',
+                                                'props': {
+                                                    'class': 'text-h6'
+                                                },
+                                                'text': str(value)
+                                            }
+                                        ]
+                                    }
+                                ]
+                            }
+                        ]
+                    } for title, value in items
+                ]
+            },
+            {
+                'component': 'div',
+                'props': {
+                    'class': 'text-caption mt-3'
+                },
+                'text': f"上次运行：{query_stats.get('time') or '无'}。按种子加入时长降低重复查询频率：{schedule}"
+            }
+        ]
 
     def __update_config(self):
         self.update_config({
@@ -680,11 +818,32 @@ class IYUUAutoSeed(_PluginBase):
             "auto_category": self._auto_category,
             "auto_start": self._auto_start,
             "size": self._size,
-            "success_caches": self._success_caches,
-            "error_caches": self._error_caches,
-            "permanent_error_caches": self._permanent_error_caches
+            "errorcachedays": self._errorcachedays,
+            "seedworkers": self._seedworkers
         })
 
+    def __init_seed_cache(self, config: dict = None):
+        """
+        初始化辅种缓存，并迁移历史配置中的缓存列表
+        """
+        self._seed_cache = SeedHashCache(db_path=self.get_data_path() / "seed_cache.db",
+                                         error_ttl=int(max(self._errorcachedays or 0, 0) * 86400))
+        self._query_journal = SeedQueryJournal(db_path=self.get_data_path() / "seed_cache.db")
+        if self._clearcache:
+            self._seed_cache.clear()
+            self._query_journal.clear()
+            logger.info("辅种缓存及查询记录已清除")
+            return
+        if not config:
+            return
+        migrated = 0
+        for key, kind in (("success_caches", SeedHashCache.SUCCESS),
+                          ("error_caches", SeedHashCache.ERROR),
+                          ("permanent_error_caches", SeedHashCache.PERMANENT)):
+            migrated += self._seed_cache.migrate(kind=kind, hashes=config.get(key))
+        if migrated:
+            logger.info(f"已迁移 {migrated} 条历史辅种缓存")
+
     def auto_seed(self):
         """
         开始辅种
@@ -700,6 +859,13 @@ class IYUUAutoSeed(_PluginBase):
         self.exist = 0
         self.fail = 0
         self.cached = 0
+        self._site_semaphores = {}
+        # 本次辅种的查询统计
+        query_stats = {
+            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "queried": 0,
+            "skipped": 0
+        }
         # 扫描下载器辅种
         for service in self.service_infos.values():
             downloader = service.name
@@ -719,7 +885,7 @@ class IYUUAutoSeed(_PluginBase):
                     return
                 # 获取种子hash
                 hash_str = self.__get_hash(torrent=torrent, dl_type=service.type)
-                if hash_str in self._error_caches or hash_str in self._permanent_error_caches:
+                if self._seed_cache.is_failed(hash_str):
                     logger.info(f"种子 {hash_str} 辅种失败且已缓存，跳过 ...")
                     continue
                 save_path = self.__get_save_path(torrent=torrent, dl_type=service.type)
@@ -755,23 +921,29 @@ class IYUUAutoSeed(_PluginBase):
                 hash_strs.append({
                     "hash": hash_str,
                     "save_path": save_path,
-                    "category": category or self._categoryafterseed
+                    "category": category or self._categoryafterseed,
+                    "added_time": self.__get_added_time(torrent=torrent, dl_type=service.type)
                 })
+            if hash_strs:
+                # 未到查询间隔的种子不再重复查询，种子存在时长按下载器中的完成时间计算
+                due_hashes = self._query_journal.filter_due({item.get("hash"): item.get("added_time")
+                                                             for item in hash_strs})
+                skipped = len(hash_strs) - len(due_hashes)
+                if skipped:
+                    logger.info(f"{skipped} 个种子未到查询间隔，本次跳过 ...")
+                    hash_strs = [item for item in hash_strs if item.get("hash") in due_hashes]
+                query_stats["queried"] += len(hash_strs)
+                query_stats["skipped"] += skipped
             if hash_strs:
                 logger.info(f"总共需要辅种的种子数：{len(hash_strs)}")
-                # 分组处理，减少IYUU Api请求次数
-                chunk_size = 200
-                for i in range(0, len(hash_strs), chunk_size):
-                    # 切片操作
-                    chunk = hash_strs[i:i + chunk_size]
-                    # 处理分组
-                    self.__seed_torrents(hash_strs=chunk,
-                                         service=service)
+                self.__seed_torrents(hash_strs=hash_strs, service=service)
                 # 触发校验检查
                 self.check_recheck()
             else:
                 logger.info(f"没有需要辅种的种子")
 
+        # 保存查询统计
+        self.save_data(key="query_stats", value=query_stats)
         # 保存缓存
         self.__update_config()
         # 发送消息
@@ -846,19 +1018,136 @@ class IYUUAutoSeed(_PluginBase):
 
     def __seed_torrents(self, hash_strs: list, service: ServiceInfo):
         """
-        执行一批种子的辅种
+        执行下载器的辅种，查询线程按分组预取IYUU辅种数据，线程池并发下载添加种子，查询与下载互相重叠
         """
         if not hash_strs:
             return
+        # 分组处理，减少IYUU Api请求次数
+        chunk_size = 200
+        chunks = [hash_strs[i:i + chunk_size] for i in range(0, len(hash_strs), chunk_size)]
+        # 辅种使用的下载器，如果配置了主辅分离使用辅种下载器
+        seed_service = self.auto_service_info if self._auto_downloader else service
+        if not seed_service:
+            return
+        # 已查询的分组，限制预取数量
+        seed_queue = queue.Queue(maxsize=self._prefetch_chunks)
+        # 下载线程结束后通知查询线程退出
+        finished = Event()
+
+        def __put(item: Optional[tuple]) -> bool:
+            while not finished.is_set():
+                try:
+                    seed_queue.put(item, timeout=1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def __query():
+            try:
+                for chunk in chunks:
+                    if self._event.is_set() or finished.is_set():
+                        break
+                    seed_list = self.__query_seed_info(hash_strs=chunk, service=service)
+                    if seed_list is not None and not __put((chunk, seed_list)):
+                        break
+            except Exception as err:
+                logger.error(f"查询IYUU辅种数据出错：{str(err)}")
+            finally:
+                __put(None)
+
+        # 下载任务 -> (原种子Hash, 辅种Hash)
+        futures: Dict[Future, Tuple[str, str]] = {}
+        # 原种子Hash -> 本次辅种成功的种子
+        success_torrents: Dict[str, List[str]] = {}
+        # 本次已提交的辅种Hash，避免多个原种子对应同一辅种时重复下载
+        submitted = set()
+        # 已处理完的原种子Hash -> 可辅种数，辅种全部处理完成后才记录查询结果
+        query_results: Dict[str, int] = {}
+        # 存在未完成辅种（流控、下载失败、中途停止等）的原种子Hash，下次继续查询
+        unfinished = set()
+
+        def __collect(done_futures):
+            for future in done_futures:
+                current_hash, info_hash = futures.pop(future)
+                if future.cancelled():
+                    unfinished.add(current_hash)
+                    continue
+                try:
+                    result = future.result()
+                    if result:
+                        success_torrents.setdefault(current_hash, []).append(info_hash)
+                    elif result is False:
+                        unfinished.add(current_hash)
+                except Exception as err:
+                    logger.error(f"辅种 {info_hash} 出错：{str(err)}")
+                    unfinished.add(current_hash)
+                    with self._lock:
+                        self.fail += 1
+
+        query_thread = Thread(target=__query, name="IYUUAutoSeed-query", daemon=True)
+        query_thread.start()
+        executor = ThreadPoolExecutor(max_workers=self._seedworkers, thread_name_prefix="IYUUAutoSeed")
+        try:
+            while not self._event.is_set():
+                try:
+                    item = seed_queue.get(timeout=1)
+                except queue.Empty:
+                    continue
+                if item is None:
+                    break
+                chunk, seed_list = item
+                for current_hash, seed, save_path, save_category in self.__iter_seed_torrents(hash_strs=chunk,
+                                                                                             seed_list=seed_list):
+                    if self._event.is_set():
+                        break
+                    info_hash = seed.get("info_hash")
+                    if info_hash in submitted:
+                        continue
+                    submitted.add(info_hash)
+                    # 限制排队的下载任务数量
+                    while len(futures) >= self._seedworkers * 2:
+                        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                        __collect(done)
+                    future = executor.submit(self.__download_torrent,
+                                             seed=seed,
+                                             service=seed_service,
+                                             save_path=save_path,
+                                             save_category=save_category)
+                    futures[future] = (current_hash, info_hash)
+                if self._event.is_set():
+                    break
+                query_results.update(self.__count_seed_results(hash_strs=chunk, seed_list=seed_list))
+            if self._event.is_set():
+                logger.info(f"辅种服务停止")
+                for future in futures:
+                    future.cancel()
+            __collect(wait(list(futures)).done)
+        finally:
+            finished.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+            query_thread.join()
+
+        # 记录辅种已全部处理完成的种子的查询结果
+        added_times = {item.get("hash"): item.get("added_time") for item in hash_strs}
+        self._query_journal.record({torrent_hash: count for torrent_hash, count in query_results.items()
+                                    if torrent_hash not in unfinished}, added_times=added_times)
+
+        # 辅种成功的去重放入历史
+        for current_hash, torrents in success_torrents.items():
+            self.__save_history(current_hash=current_hash,
+                                downloader=service.name,
+                                success_torrents=torrents)
+
+        logger.info(f"下载器 {service.name} 辅种完成")
+
+    def __query_seed_info(self, hash_strs: list, service: ServiceInfo) -> Optional[dict]:
+        """
+        查询一批种子的可辅种数据
+        """
         logger.info(f"下载器 {service.name} 开始查询辅种，数量：{len(hash_strs)} ...")
         # 下载器中的Hashs
         hashs = [item.get("hash") for item in hash_strs]
-        # 每个Hash的保存目录
-        save_paths = {}
-        save_category = {}
-        for item in hash_strs:
-            save_paths[item.get("hash")] = item.get("save_path")
-            save_category[item.get("hash")] = item.get("category")
         # 查询可辅种数据
         seed_list, msg = self.iyuu_helper.get_seed_info(hashs)
         if not isinstance(seed_list, dict):
@@ -867,20 +1156,40 @@ class IYUUAutoSeed(_PluginBase):
                 logger.warn(f'IYUU辅种失败，疑似站点未绑定插件配置不完整，请先检查是否完成站点绑定！{msg}')
             else:
                 logger.warn(f"当前种子列表没有可辅种的站点：{msg}")
-            return
-        else:
-            logger.info(f"IYUU返回可辅种数：{len(seed_list)}")
-        # 遍历
+            return None
+        logger.info(f"IYUU返回可辅种数：{len(seed_list)}")
+        return seed_list
+
+    @staticmethod
+    def __count_seed_results(hash_strs: list, seed_list: dict) -> Dict[str, int]:
+        """
+        统计一批种子每个种子的可辅种数
+        """
+        results = {}
+        for item in hash_strs:
+            torrent_hash = item.get("hash")
+            seed_torrents = (seed_list.get(torrent_hash) or {}).get("torrent") or []
+            results[torrent_hash] = len(seed_torrents) if isinstance(seed_torrents, list) else 1
+        return results
+
+    def __iter_seed_torrents(self, hash_strs: list, seed_list: dict):
+        """
+        遍历一批种子中需要辅种的种子，返回 (原种子Hash, 辅种信息, 保存目录, 分类)
+        """
+        # 下载器中的Hashs
+        hash_set = {item.get("hash") for item in hash_strs}
+        # 每个Hash的保存目录
+        save_paths = {}
+        save_category = {}
+        for item in hash_strs:
+            save_paths[item.get("hash")] = item.get("save_path")
+            save_category[item.get("hash")] = item.get("category")
         for current_hash, seed_info in seed_list.items():
             if not seed_info:
                 continue
             seed_torrents = seed_info.get("torrent")
             if not isinstance(seed_torrents, list):
                 seed_torrents = [seed_torrents]
-
-            # 本次辅种成功的种子
-            success_torrents = []
-
             for seed in seed_torrents:
                 if not seed:
                     continue
@@ -888,36 +1197,26 @@ class IYUUAutoSeed(_PluginBase):
                     continue
                 if not seed.get("sid") or not seed.get("info_hash"):
                     continue
-                if seed.get("info_hash") in hashs:
+                if seed.get("info_hash") in hash_set:
                     logger.info(f"{seed.get('info_hash')} 已在下载器中，跳过 ...")
                     continue
-                if seed.get("info_hash") in self._success_caches:
+                if self._seed_cache.is_success(seed.get("info_hash")):
                     logger.info(f"{seed.get('info_hash')} 已处理过辅种，跳过 ...")
                     continue
-                if seed.get("info_hash") in self._error_caches or seed.get("info_hash") in self._permanent_error_caches:
+                if self._seed_cache.is_failed(seed.get("info_hash")):
                     logger.info(f"种子 {seed.get('info_hash')} 辅种失败且已缓存，跳过 ...")
                     continue
-                # 添加任务 如果配置了主辅分离使用辅种下载器
-                if self._auto_downloader:
-                    success = self.__download_torrent(seed=seed,
-                                                      service=self.auto_service_info,
-                                                      save_path=save_paths.get(current_hash),
-                                                      save_category=save_category.get(current_hash))
-                else:
-                    success = self.__download_torrent(seed=seed,
-                                                      service=service,
-                                                      save_path=save_paths.get(current_hash),
-                                                      save_category=save_category.get(current_hash))
-                if success:
-                    success_torrents.append(seed.get("info_hash"))
-
-            # 辅种成功的去重放入历史
-            if len(success_torrents) > 0:
-                self.__save_history(current_hash=current_hash,
-                                    downloader=service.name,
-                                    success_torrents=success_torrents)
+                yield current_hash, seed, save_paths.get(current_hash), save_category.get(current_hash)
 
-        logger.info(f"下载器 {service.name} 辅种完成")
+    def __get_site_semaphore(self, site_domain: str) -> Semaphore:
+        """
+        获取站点下载并发信号量
+        """
+        with self._lock:
+            semaphore = self._site_semaphores.get(site_domain)
+            if not semaphore:
+                semaphore = self._site_semaphores[site_domain] = Semaphore(self._site_concurrency)
+            return semaphore
 
     def __save_history(self, current_hash: str, downloader: str, success_torrents: []):
         """
@@ -1018,7 +1317,8 @@ class IYUUAutoSeed(_PluginBase):
         logger.error(f"不支持的下载器：{service.type}")
         return None
 
-    def __download_torrent(self, seed: dict, service: ServiceInfo, save_path: str, save_category: str):
+    def __download_torrent(self, seed: dict, service: ServiceInfo, save_path: str,
+                           save_category: str) -> Optional[bool]:
         """
         下载种子
         torrent: {
@@ -1026,24 +1326,18 @@ class IYUUAutoSeed(_PluginBase):
                     "torrent_id": 377467,
                     "info_hash": "a444850638e7a6f6220e2efdde94099c53358159"
                 }
+        :return: True 辅种成功，False 辅种失败或未完成，None 无需辅种（已存在、站点不在辅种范围）
         """
-
-        def __is_special_site(url):
-            """
-            判断是否为特殊站点（是否需要添加https）
-            """
-            if "hdsky.me" in url:
-                return False
-            return True
-
-        self.total += 1
+        with self._lock:
+            self.total += 1
         # 获取种子站点及下载地址模板
         site_url, download_page = self.iyuu_helper.get_torrent_url(seed.get("sid"))
         if not site_url or not download_page:
             # 加入缓存
-            self._error_caches.append(seed.get("info_hash"))
-            self.fail += 1
-            self.cached += 1
+            self._seed_cache.add(SeedHashCache.ERROR, seed.get("info_hash"))
+            with self._lock:
+                self.fail += 1
+                self.cached += 1
             return False
         # 查询站点
         site_domain = StringUtils.get_url_domain(site_url)
@@ -1051,23 +1345,50 @@ class IYUUAutoSeed(_PluginBase):
         site_info = self.sites_helper.get_indexer(site_domain)
         if not site_info or not site_info.get('url'):
             logger.debug(f"没有维护种子对应的站点：{site_url}")
-            return False
+            return None
         if self._sites and site_info.get('id') not in self._sites:
             logger.info("当前站点不在选择的辅种站点范围，跳过 ...")
-            return False
-        self.realtotal += 1
+            return None
+        with self._lock:
+            self.realtotal += 1
+        # 同一站点限制并发下载
+        with self.__get_site_semaphore(site_domain):
+            return self.__add_seed_torrent(seed=seed,
+                                           service=service,
+                                           site_info=site_info,
+                                           site_domain=site_domain,
+                                           download_page=download_page,
+                                           save_path=save_path,
+                                           save_category=save_category)
+
+    def __add_seed_torrent(self, seed: dict, service: ServiceInfo, site_info: dict, site_domain: str,
+                           download_page: str, save_path: str, save_category: str) -> Optional[bool]:
+        """
+        下载种子文件并添加到下载器，种子已在下载器中时返回None
+        """
+
+        def __is_special_site(url):
+            """
+            判断是否为特殊站点（是否需要添加https）
+            """
+            if "hdsky.me" in url:
+                return False
+            return True
+
         # 查询hash值是否已经在下载器中
         downloader_obj = service.instance
         torrent_info, _ = downloader_obj.get_torrents(ids=[seed.get("info_hash")])
         if torrent_info:
             logger.info(f"{seed.get('info_hash')} 已在下载器中，跳过 ...")
-            self.exist += 1
-            return False
+            with self._lock:
+                self.exist += 1
+            return None
         # 站点流控
         check, checkmsg = self.sites_helper.check(site_domain)
         if check:
             logger.warn(checkmsg)
-            self.fail += 1
+            with self._lock:
+                self.fail += 1
             return False
         # 下载种子
         torrent_url = self.__get_download_url(seed=seed,
@@ -1075,9 +1396,10 @@ class IYUUAutoSeed(_PluginBase):
                                               base_url=download_page)
         if not torrent_url:
             # 加入失败缓存
-            self._error_caches.append(seed.get("info_hash"))
-            self.fail += 1
-            self.cached += 1
+            self._seed_cache.add(SeedHashCache.ERROR, seed.get("info_hash"))
+            with self._lock:
+                self.fail += 1
+                self.cached += 1
             return False
         # 强制使用Https
         if __is_special_site(torrent_url):
@@ -1093,13 +1415,14 @@ class IYUUAutoSeed(_PluginBase):
             proxy=site_info.get("proxy"))
         if not content:
             # 下载失败
-            self.fail += 1
+            with self._lock:
+                self.fail += 1
             # 加入失败缓存
             if error_msg and ('无法打开链接' in error_msg or '触发站点流控' in error_msg):
-                self._error_caches.append(seed.get("info_hash"))
+                self._seed_cache.add(SeedHashCache.ERROR, seed.get("info_hash"))
             else:
                 # 种子不存在的情况
-                self._permanent_error_caches.append(seed.get("info_hash"))
+                self._seed_cache.add(SeedHashCache.PERMANENT, seed.get("info_hash"))
             logger.error(f"下载种子文件失败：{torrent_url}")
             return False
         # 添加下载，辅种任务默认暂停
@@ -1111,12 +1434,14 @@ class IYUUAutoSeed(_PluginBase):
                                       site_name=site_info.get("name"))
         if not download_id:
             # 下载失败
-            self.fail += 1
+            with self._lock:
+                self.fail += 1
             # 加入失败缓存
-            self._error_caches.append(seed.get("info_hash"))
+            self._seed_cache.add(SeedHashCache.ERROR, seed.get("info_hash"))
             return False
         else:
-            self.success += 1
+            with self._lock:
+                self.success += 1
             if service.type == "qbittorrent":
                 if self._skipverify:
                     if self._auto_start:
@@ -1134,15 +1459,16 @@ class IYUUAutoSeed(_PluginBase):
             # 下载成功
             logger.info(f"成功添加辅种下载，站点：{site_info.get('name')}，种子链接：{torrent_url}")
             # 成功也加入缓存，有一些改了路径校验不通过的，手动删除后，下一次又会辅上
-            self._success_caches.append(seed.get("info_hash"))
+            self._seed_cache.add(SeedHashCache.SUCCESS, seed.get("info_hash"))
             return True
 
     def __add_recheck_torrents(self, service: ServiceInfo, download_id: str):
         # 追加校验任务
         logger.info(f"添加校验检查任务：{download_id} ...")
-        if not self._recheck_torrents.get(service.name):
-            self._recheck_torrents[service.name] = []
-        self._recheck_torrents[service.name].append(download_id)
+        with self._lock:
+            if not self._recheck_torrents.get(service.name):
+                self._recheck_torrents[service.name] = []
+            self._recheck_torrents[service.name].append(download_id)
 
     @staticmethod
     def __get_hash(torrent: Any, dl_type: str):
@@ -1201,6 +1527,23 @@ class IYUUAutoSeed(_PluginBase):
             print(str(e))
             return ""
 
+    @staticmethod
+    def __get_added_time(torrent: Any, dl_type: str) -> Optional[float]:
+        """
+        获取种子完成时间，未记录完成时间时取添加时间，时间戳
+        """
+        try:
+            if dl_type == "qbittorrent":
+                added_time = torrent.get("completion_on") or 0
+                if added_time <= 0:
+                    added_time = torrent.get("added_on") or 0
+                return float(added_time) if added_time > 0 else None
+            date_done = torrent.date_done or torrent.date_added
+            return date_done.timestamp() if date_done else None
+        except Exception as e:
+            print(str(e))
+            return None
+
     @staticmethod
     def __get_torrent_size(torrent: Any, dl_type: str):
         """
@@ -1384,6 +1727,12 @@ class IYUUAutoSeed(_PluginBase):
                     self._scheduler.shutdown()
                     self._event.clear()
                 self._scheduler = None
+            if self._seed_cache:
+                self._seed_cache.close()
+                self._seed_cache = None
+            if self._query_journal:
+                self._query_journal.close()
+                self._query_journal = None
         except Exception as e:
             print(str(e))
 
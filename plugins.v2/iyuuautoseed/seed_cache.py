@@ -0,0 +1,237 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+
+class SeedHashCache(object):
+    """
+    辅种缓存，按种子Hash记录辅种成功、失败的种子，内存中使用集合判断，变更逐条写入数据库
+    """
+
+    # 辅种成功，可清除
+    SUCCESS = "success"
+    # 辅种失败，超过有效期后重新尝试，可清除
+    ERROR = "error"
+    # 辅种失败，种子被删除404等情况，不再尝试
+    PERMANENT = "permanent"
+
+    def __init__(self, db_path: Path, error_ttl: int = 0):
+        """
+        :param db_path: 数据库文件路径
+        :param error_ttl: 辅种失败缓存的有效期（秒），0为永久有效
+        """
+        self._lock = threading.Lock()
+        self._error_ttl = max(int(error_ttl or 0), 0)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS seed_caches (
+                    kind TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    expire_time REAL,
+                    PRIMARY KEY (kind, hash)
+                )
+            """)
+        # 缓存类型 -> {种子Hash: 过期时间，None为永久有效}
+        self._caches: Dict[str, Dict[str, Optional[float]]] = {
+            self.SUCCESS: {},
+            self.ERROR: {},
+            self.PERMANENT: {}
+        }
+        self.__load()
+
+    def __load(self):
+        """
+        加载缓存并清理已过期的记录
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM seed_caches WHERE expire_time IS NOT NULL AND expire_time <= ?", (now,))
+            for kind, torrent_hash, expire_time in self._conn.execute("SELECT kind, hash, expire_time "
+                                                                      "FROM seed_caches"):
+                if kind in self._caches:
+                    self._caches[kind][torrent_hash] = expire_time
+
+    def __expire_time(self, kind: str) -> Optional[float]:
+        if kind == self.ERROR and self._error_ttl:
+            return time.time() + self._error_ttl
+        return None
+
+    def contains(self, kind: str, torrent_hash: str) -> bool:
+        """
+        是否存在未过期的缓存
+        """
+        if torrent_hash not in self._caches[kind]:
+            return False
+        expire_time = self._caches[kind].get(torrent_hash)
+        return expire_time is None or expire_time > time.time()
+
+    def is_success(self, torrent_hash: str) -> bool:
+        return self.contains(self.SUCCESS, torrent_hash)
+
+    def is_failed(self, torrent_hash: str) -> bool:
+        return self.contains(self.ERROR, torrent_hash) or self.contains(self.PERMANENT, torrent_hash)
+
+    def add(self, kind: str, torrent_hash: str):
+        """
+        添加缓存并立即写入数据库
+        """
+        if not torrent_hash:
+            return
+        expire_time = self.__expire_time(kind)
+        with self._lock, self._conn:
+            self._caches[kind][torrent_hash] = expire_time
+            self._conn.execute("INSERT OR REPLACE INTO seed_caches (kind, hash, expire_time) VALUES (?, ?, ?)",
+                               (kind, torrent_hash, expire_time))
+
+    def migrate(self, kind: str, hashes: Iterable[str]) -> int:
+        """
+        从历史配置中的缓存列表迁移
+        """
+        expire_time = self.__expire_time(kind)
+        rows = [(kind, torrent_hash, expire_time) for torrent_hash in set(hashes or []) if torrent_hash]
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO seed_caches (kind, hash, expire_time) VALUES (?, ?, ?)",
+                                   rows)
+            for _, torrent_hash, _ in rows:
+                self._caches[kind].setdefault(torrent_hash, expire_time)
+        return len(rows)
+
+    def clear(self):
+        """
+        清空全部缓存
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM seed_caches")
+            for caches in self._caches.values():
+                caches.clear()
+
+    def count(self) -> Dict[str, int]:
+        return {kind: len(caches) for kind, caches in self._caches.items()}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SeedQueryJournal(object):
+    """
+    辅种查询记录，保存每个种子最近一次向IYUU查询的时间及可辅种数，按种子存在时长逐渐降低重复查询的频率
+    """
+
+    # (种子存在时长上限（秒），查询间隔（秒）)，超过最后一档上限的按最后一档间隔查询
+    SCHEDULE = (
+        (7 * 86400, 3600),
+        (30 * 86400, 86400),
+        (None, 7 * 86400)
+    )
+
+    def __init__(self, db_path: Path):
+        self._lock = threading.Lock()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS query_journal (
+                    hash TEXT PRIMARY KEY,
+                    first_seen REAL NOT NULL,
+                    last_query REAL NOT NULL,
+                    result_count INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+
+    @classmethod
+    def get_interval(cls, age: float) -> int:
+        """
+        根据种子存在时长获取查询间隔
+        """
+        for max_age, interval in cls.SCHEDULE:
+            if max_age is None or age < max_age:
+                return interval
+        return cls.SCHEDULE[-1][1]
+
+    @classmethod
+    def __interval_sql(cls) -> str:
+        """
+        查询间隔的SQL表达式，参数为当前时间
+        """
+        cases = " ".join(f"WHEN ? - first_seen < {max_age} THEN {interval}"
+                         for max_age, interval in cls.SCHEDULE if max_age is not None)
+        return f"CASE {cases} ELSE {cls.SCHEDULE[-1][1]} END"
+
+    def filter_due(self, hashes: Dict[str, Optional[float]]) -> Set[str]:
+        """
+        筛选需要查询的种子，从未查询过的种子均需要查询
+        :param hashes: 种子Hash -> 种子在下载器中的完成（添加）时间，未知时按首次查询时间计算存在时长
+        """
+        now = time.time()
+        due = set()
+        with self._lock:
+            records = {torrent_hash: (first_seen, last_query) for torrent_hash, first_seen, last_query
+                       in self._conn.execute("SELECT hash, first_seen, last_query FROM query_journal")}
+        for torrent_hash, added_time in hashes.items():
+            record = records.get(torrent_hash)
+            if not record:
+                due.add(torrent_hash)
+                continue
+            first_seen, last_query = record
+            if last_query + self.get_interval(now - (added_time or first_seen)) <= now:
+                due.add(torrent_hash)
+        return due
+
+    def record(self, results: Dict[str, int], added_times: Optional[Dict[str, Optional[float]]] = None):
+        """
+        记录一批种子的查询结果
+        :param results: 种子Hash -> 可辅种数
+        :param added_times: 种子Hash -> 种子在下载器中的完成（添加）时间，作为种子存在时长的起点
+        """
+        if not results:
+            return
+        now = time.time()
+        added_times = added_times or {}
+        with self._lock, self._conn:
+            self._conn.executemany("""
+                INSERT INTO query_journal (hash, first_seen, last_query, result_count) VALUES (?, ?, ?, ?)
+                ON CONFLICT(hash) DO UPDATE SET first_seen = MIN(first_seen, excluded.first_seen),
+                                                last_query = excluded.last_query,
+                                                result_count = excluded.result_count
+            """, [(torrent_hash, min(added_times.get(torrent_hash) or now, now), now, count)
+                  for torrent_hash, count in results.items()])
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        统计已记录及当前到期待查询的种子数
+        """
+        now = time.time()
+        interval_sql = self.__interval_sql()
+        params = [now] * (len(self.SCHEDULE) - 1)
+        with self._lock:
+            total, due, seeded = self._conn.execute(f"""
+                SELECT COUNT(*),
+                       COALESCE(SUM(CASE WHEN last_query + {interval_sql} <= ? THEN 1 ELSE 0 END), 0),
+                       COALESCE(SUM(CASE WHEN result_count > 0 THEN 1 ELSE 0 END), 0)
+                FROM query_journal
+            """, [*params, now]).fetchone()
+        return {
+            "total": total,
+            "due": due,
+            "seeded": seeded
+        }
+
+    def clear(self):
+        """
+        清空查询记录
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM query_journal")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
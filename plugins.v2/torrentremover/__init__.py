@@ -1,4 +1,3 @@
-import re
 import threading
 import time
 from datetime import datetime, timedelta
@@ -8,10 +7,12 @@ import pytz
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 
+from app import schemas
 from app.core.config import settings
 from app.helper.downloader import DownloaderHelper
 from app.log import logger
 from app.plugins import _PluginBase
+from app.plugins.torrentremover.remove_rules import TorrentRemoveRules
 from app.schemas import NotificationType, ServiceInfo
 from app.utils.string import StringUtils
 
@@ -26,7 +27,7 @@ class TorrentRemover(_PluginBase):
     # 插件图标
     plugin_icon = "delete.jpg"
     # 插件版本
-    plugin_version = "2.2"
+    plugin_version = "2.4.1"
     # 插件作者
     plugin_author = "jxxghp"
     # 作者主页
@@ -61,6 +62,10 @@ class TorrentRemover(_PluginBase):
     _errorkeywords = None
     _torrentstates = None
     _torrentcategorys = None
+    # 每批暂停/删除的种子数量
+    _batchsize = 100
+    # 预编译的删种规则
+    _rules: Optional[TorrentRemoveRules] = None
 
     def init_plugin(self, config: dict = None):
         self.downloader_helper = DownloaderHelper()
@@ -83,6 +88,25 @@ class TorrentRemover(_PluginBase):
             self._errorkeywords = config.get("errorkeywords") or ""
             self._torrentstates = config.get("torrentstates") or ""
             self._torrentcategorys = config.get("torrentcategorys") or ""
+            try:
+                self._batchsize = max(int(config.get("batchsize") or 100), 1)
+            except ValueError:
+                self._batchsize = 100
+
+        # 预编译删种规则，数值配置错误时不匹配任何种子
+        try:
+            self._rules = TorrentRemoveRules(size=self._size,
+                                             ratio=self._ratio,
+                                             seeding_time=self._time,
+                                             upspeed=self._upspeed,
+                                             pathkeywords=self._pathkeywords,
+                                             trackerkeywords=self._trackerkeywords,
+                                             errorkeywords=self._errorkeywords,
+                                             torrentstates=self._torrentstates,
+                                             torrentcategorys=self._torrentcategorys)
+        except ValueError as e:
+            logger.error(f"自动删种规则配置错误，请检查种子大小、分享率、做种时间、平均上传速度设置：{str(e)}")
+            self._rules = None
 
         self.stop_service()
 
@@ -115,8 +139,8 @@ class TorrentRemover(_PluginBase):
                     "trackerkeywords": self._trackerkeywords,
                     "errorkeywords": self._errorkeywords,
                     "torrentstates": self._torrentstates,
-                    "torrentcategorys": self._torrentcategorys
-
+                    "torrentcategorys": self._torrentcategorys,
+                    "batchsize": self._batchsize
                 })
                 if self._scheduler.get_jobs():
                     # 启动服务
@@ -131,7 +155,23 @@ class TorrentRemover(_PluginBase):
         pass
 
     def get_api(self) -> List[Dict[str, Any]]:
-        pass
+        """
+        获取插件API
+        [{
+            "path": "/xx",
+            "endpoint": self.xxx,
+            "methods": ["GET", "POST"],
+            "summary": "API说明"
+        }]
+        """
+        return [
+            {
+                "path": "/preview",
+                "endpoint": self.preview,
+                "methods": ["GET"],
+                "summary": "自动删种预演，返回符合条件的种子及规则筛选耗时，不执行删除"
+            }
+        ]
 
     def get_service(self) -> List[Dict[str, Any]]:
         """
@@ -426,6 +466,22 @@ class TorrentRemover(_PluginBase):
                                         }
                                     }
                                 ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 6
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'batchsize',
+                                            'label': '每批处理数量',
+                                            'placeholder': '每次请求下载器暂停/删除的种子数，默认100'
+                                        }
+                                    }
+                                ]
                             }
                         ]
                     },
@@ -563,7 +619,8 @@ class TorrentRemover(_PluginBase):
             "trackerkeywords": "",
             "errorkeywords": "",
             "torrentstates": "",
-            "torrentcategorys": ""
+            "torrentcategorys": "",
+            "batchsize": 100
         }
 
     def get_page(self) -> List[dict]:
@@ -631,158 +688,104 @@ class TorrentRemover(_PluginBase):
             try:
                 with lock:
                     # 获取需删除种子列表
+                    start_time = time.time()
                     torrents = self.get_remove_torrents(downloader)
-                    logger.info(f"自动删种任务 获取符合处理条件种子数 {len(torrents)}")
+                    logger.info(f"自动删种任务 获取符合处理条件种子数 {len(torrents)}，"
+                                f"耗时 {time.time() - start_time:.2f} 秒")
                     # 下载器
                     downlader_obj = self.__get_downloader(downloader)
                     if self._action == "pause":
                         message_text = f"{downloader.title()} 共暂停{len(torrents)}个种子"
-                        for torrent in torrents:
-                            if self._event.is_set():
-                                logger.info(f"自动删种服务停止")
-                                return
-                            text_item = f"{torrent.get('name')} " \
-                                        f"来自站点：{torrent.get('site')} " \
-                                        f"大小：{StringUtils.str_filesize(torrent.get('size'))}"
-                            # 暂停种子
-                            downlader_obj.stop_torrents(ids=[torrent.get("id")])
-                            logger.info(f"自动删种任务 暂停种子：{text_item}")
-                            message_text = f"{message_text}\n{text_item}"
+                        action_text = "暂停种子"
                     elif self._action == "delete":
                         message_text = f"{downloader.title()} 共删除{len(torrents)}个种子"
-                        for torrent in torrents:
-                            if self._event.is_set():
-                                logger.info(f"自动删种服务停止")
-                                return
-                            text_item = f"{torrent.get('name')} " \
-                                        f"来自站点：{torrent.get('site')} " \
-                                        f"大小：{StringUtils.str_filesize(torrent.get('size'))}"
-                            # 删除种子
-                            downlader_obj.delete_torrents(delete_file=False,
-                                                          ids=[torrent.get("id")])
-                            logger.info(f"自动删种任务 删除种子：{text_item}")
-                            message_text = f"{message_text}\n{text_item}"
+                        action_text = "删除种子"
                     elif self._action == "deletefile":
                         message_text = f"{downloader.title()} 共删除{len(torrents)}个种子及文件"
-                        for torrent in torrents:
-                            if self._event.is_set():
-                                logger.info(f"自动删种服务停止")
-                                return
+                        action_text = "删除种子及文件"
+                    else:
+                        continue
+                    message_items = [message_text]
+                    start_time = time.time()
+                    batch_count = 0
+                    # 按批次请求下载器，减少请求次数
+                    for i in range(0, len(torrents), self._batchsize):
+                        if self._event.is_set():
+                            logger.info(f"自动删种服务停止")
+                            return
+                        batch = torrents[i:i + self._batchsize]
+                        ids = [torrent.get("id") for torrent in batch]
+                        if self._action == "pause":
+                            result = downlader_obj.stop_torrents(ids=ids)
+                        else:
+                            result = downlader_obj.delete_torrents(delete_file=self._action == "deletefile",
+                                                                   ids=ids)
+                        batch_count += 1
+                        if result is False:
+                            logger.warn(f"自动删种任务 {action_text}失败，共 {len(ids)} 个种子")
+                        for torrent in batch:
                             text_item = f"{torrent.get('name')} " \
                                         f"来自站点：{torrent.get('site')} " \
                                         f"大小：{StringUtils.str_filesize(torrent.get('size'))}"
-                            # 删除种子
-                            downlader_obj.delete_torrents(delete_file=True,
-                                                          ids=[torrent.get("id")])
-                            logger.info(f"自动删种任务 删除种子及文件：{text_item}")
-                            message_text = f"{message_text}\n{text_item}"
-                    else:
-                        continue
-                    if torrents and message_text and self._notify:
+                            logger.info(f"自动删种任务 {action_text}：{text_item}")
+                            message_items.append(text_item)
+                    if torrents:
+                        logger.info(f"自动删种任务 {downloader} {action_text} {len(torrents)} 个，"
+                                    f"分 {batch_count} 批请求，耗时 {time.time() - start_time:.2f} 秒")
+                    if torrents and self._notify:
                         self.post_message(
                             mtype=NotificationType.SiteMessage,
                             title=f"【自动删种任务完成】",
-                            text=message_text
+                            text="\n".join(message_items)
                         )
             except Exception as e:
                 logger.error(f"自动删种任务异常：{str(e)}")
 
-    def __get_qb_torrent(self, torrent: Any) -> Optional[dict]:
+    def preview(self, apikey: str, downloader: Optional[str] = None) -> schemas.Response:
         """
-        检查QB下载任务是否符合条件
+        自动删种预演，返回各下载器符合条件的种子及规则筛选统计，不执行删除，可由API调用
         """
-        # 完成时间
-        date_done = torrent.completion_on if torrent.completion_on > 0 else torrent.added_on
-        # 现在时间
-        date_now = int(time.mktime(datetime.now().timetuple()))
-        # 做种时间
-        torrent_seeding_time = date_now - date_done if date_done else 0
-        # 平均上传速度
-        torrent_upload_avs = torrent.uploaded / torrent_seeding_time if torrent_seeding_time else 0
-        # 大小 单位：GB
-        sizes = self._size.split('-') if self._size else []
-        minsize = float(sizes[0]) * 1024 * 1024 * 1024 if sizes else 0
-        maxsize = float(sizes[-1]) * 1024 * 1024 * 1024 if sizes else 0
-        # 分享率
-        if self._ratio and torrent.ratio <= float(self._ratio):
-            return None
-        # 做种时间 单位：小时
-        if self._time and torrent_seeding_time <= float(self._time) * 3600:
-            return None
-        # 文件大小
-        if self._size and (torrent.size >= int(maxsize) or torrent.size <= int(minsize)):
-            return None
-        if self._upspeed and torrent_upload_avs >= float(self._upspeed) * 1024:
-            return None
-        if self._pathkeywords and not re.findall(self._pathkeywords, torrent.save_path, re.I):
-            return None
-        if self._trackerkeywords and not re.findall(self._trackerkeywords, torrent.tracker, re.I):
-            return None
-        if self._torrentstates and torrent.state not in self._torrentstates:
-            return None
-        if self._torrentcategorys and (not torrent.category or torrent.category not in self._torrentcategorys):
-            return None
-        return {
-            "id": torrent.hash,
-            "name": torrent.name,
-            "site": StringUtils.get_url_sld(torrent.tracker),
-            "size": torrent.size
-        }
+        if apikey != settings.API_TOKEN:
+            return schemas.Response(success=False, message="API密钥错误")
+        downloaders = [downloader] if downloader else self._downloaders
+        if not downloaders:
+            return schemas.Response(success=False, message="下载器未配置")
+        if not self._rules:
+            return schemas.Response(success=False, message="删种规则配置错误")
+        services = self.service_infos or {}
+        result = {}
+        for name in downloaders:
+            if name not in services:
+                result[name] = {"error": "下载器未连接"}
+                continue
+            torrents, stats = self.__get_remove_torrents(name)
+            result[name] = {
+                "torrents": torrents,
+                "stats": stats
+            }
+        return schemas.Response(success=True,
+                                message=f"共 {sum(len(item.get('torrents') or []) for item in result.values())} "
+                                        f"个种子符合{self._action}条件",
+                                data=result)
 
-    def __get_tr_torrent(self, torrent: Any) -> Optional[dict]:
+    def get_remove_torrents(self, downloader: str) -> List[dict]:
         """
-        检查TR下载任务是否符合条件
+        获取自动删种任务种子
         """
-        # 完成时间
-        date_done = torrent.date_done or torrent.date_added
-        # 现在时间
-        date_now = int(time.mktime(datetime.now().timetuple()))
-        # 做种时间
-        torrent_seeding_time = date_now - int(time.mktime(date_done.timetuple())) if date_done else 0
-        # 上传量
-        torrent_uploaded = torrent.ratio * torrent.total_size
-        # 平均上传速茺
-        torrent_upload_avs = torrent_uploaded / torrent_seeding_time if torrent_seeding_time else 0
-        # 大小 单位：GB
-        sizes = self._size.split('-') if self._size else []
-        minsize = float(sizes[0]) * 1024 * 1024 * 1024 if sizes else 0
-        maxsize = float(sizes[-1]) * 1024 * 1024 * 1024 if sizes else 0
-        # 分享率
-        if self._ratio and torrent.ratio <= float(self._ratio):
-            return None
-        if self._time and torrent_seeding_time <= float(self._time) * 3600:
-            return None
-        if self._size and (torrent.total_size >= int(maxsize) or torrent.total_size <= int(minsize)):
-            return None
-        if self._upspeed and torrent_upload_avs >= float(self._upspeed) * 1024:
-            return None
-        if self._pathkeywords and not re.findall(self._pathkeywords, torrent.download_dir, re.I):
-            return None
-        if self._trackerkeywords:
-            if not torrent.trackers:
-                return None
-            else:
-                tacker_key_flag = False
-                for tracker in torrent.trackers:
-                    if re.findall(self._trackerkeywords, tracker.get("announce", ""), re.I):
-                        tacker_key_flag = True
-                        break
-                if not tacker_key_flag:
-                    return None
-        if self._errorkeywords and not re.findall(self._errorkeywords, torrent.error_string, re.I):
-            return None
-        return {
-            "id": torrent.hashString,
-            "name": torrent.name,
-            "site": torrent.trackers[0].get("sitename") if torrent.trackers else "",
-            "size": torrent.total_size
-        }
+        remove_torrents, stats = self.__get_remove_torrents(downloader)
+        if stats:
+            logger.info(f"自动删种任务 {downloader} 检查种子 {stats.get('checked')} 个，"
+                        f"符合条件 {stats.get('matched')} 个，规则筛选耗时 {stats.get('elapsed')} 秒，"
+                        f"各规则排除数：{stats.get('hits')}")
+        return remove_torrents
 
-    def get_remove_torrents(self, downloader: str):
+    def __get_remove_torrents(self, downloader: str) -> Tuple[List[dict], Dict[str, Any]]:
         """
-        获取自动删种任务种子
+        获取自动删种任务种子及规则筛选统计
         """
-        remove_torrents = []
+        # 删种规则配置错误
+        if not self._rules:
+            return [], {}
         # 下载器对象
         downloader_obj = self.__get_downloader(downloader)
         downloader_config = self.__get_downloader_config(downloader)
@@ -796,46 +799,53 @@ class TorrentRemover(_PluginBase):
         # 查询种子
         torrents, error_flag = downloader_obj.get_torrents(tags=tags or None)
         if error_flag:
-            return []
-        # 处理种子
-        for torrent in torrents:
-            if downloader_config.type == "qbittorrent":
-                item = self.__get_qb_torrent(torrent)
-            else:
-                item = self.__get_tr_torrent(torrent)
-            if not item:
-                continue
-            remove_torrents.append(item)
+            return [], {}
+        # 按预编译规则筛选种子
+        matches, stats = self._rules.filter(torrents, downloader_config.type)
+        remove_torrents = [self.__get_torrent_info(torrent, downloader_config.type) for torrent in matches]
         # 处理辅种
         if self._samedata and remove_torrents:
-            remove_ids = [t.get("id") for t in remove_torrents]
+            start_time = time.time()
+            remove_ids = {t.get("id") for t in remove_torrents}
+            # 名称+大小 -> 种子列表，每次运行只构建一次
+            same_data_index: Dict[Tuple[str, int], List[Any]] = {}
+            for torrent in torrents:
+                if downloader_config.type == "qbittorrent":
+                    key = (torrent.name, torrent.size)
+                else:
+                    key = (torrent.name, torrent.total_size)
+                same_data_index.setdefault(key, []).append(torrent)
             remove_torrents_plus = []
             for remove_torrent in remove_torrents:
-                name = remove_torrent.get("name")
-                size = remove_torrent.get("size")
-                for torrent in torrents:
-                    if downloader_config.type == "qbittorrent":
-                        plus_id = torrent.hash
-                        plus_name = torrent.name
-                        plus_size = torrent.size
-                        plus_site = StringUtils.get_url_sld(torrent.tracker)
-                    else:
-                        plus_id = torrent.hashString
-                        plus_name = torrent.name
-                        plus_size = torrent.total_size
-                        plus_site = torrent.trackers[0].get("sitename") if torrent.trackers else ""
-                    # 比对名称和大小
-                    if plus_name == name \
-                            and plus_size == size \
-                            and plus_id not in remove_ids:
-                        remove_torrents_plus.append(
-                            {
-                                "id": plus_id,
-                                "name": plus_name,
-                                "site": plus_site,
-                                "size": plus_size
-                            }
-                        )
+                for torrent in same_data_index.get((remove_torrent.get("name"), remove_torrent.get("size")), []):
+                    plus_torrent = self.__get_torrent_info(torrent, downloader_config.type)
+                    # 同一辅种只处理一次
+                    if plus_torrent.get("id") in remove_ids:
+                        continue
+                    remove_ids.add(plus_torrent.get("id"))
+                    remove_torrents_plus.append(plus_torrent)
             if remove_torrents_plus:
                 remove_torrents.extend(remove_torrents_plus)
-        return remove_torrents
+            logger.info(f"自动删种任务 匹配辅种 {len(remove_torrents_plus)} 个，"
+                        f"耗时 {time.time() - start_time:.2f} 秒")
+            stats["samedata"] = len(remove_torrents_plus)
+        return remove_torrents, stats
+
+    @staticmethod
+    def __get_torrent_info(torrent: Any, downloader_type: str) -> dict:
+        """
+        获取种子的基本信息
+        """
+        if downloader_type == "qbittorrent":
+            return {
+                "id": torrent.hash,
+                "name": torrent.name,
+                "site": StringUtils.get_url_sld(torrent.tracker),
+                "size": torrent.size
+            }
+        return {
+            "id": torrent.hashString,
+            "name": torrent.name,
+            "site": torrent.trackers[0].get("sitename") if torrent.trackers else "",
+            "size": torrent.total_size
+        }
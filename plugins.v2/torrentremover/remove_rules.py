@@ -0,0 +1,178 @@
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.log import logger
+
+
+class TorrentRemoveRules:
+    """
+    自动删种规则，配置变更时预编译一次，按列快照对种子列表逐条规则筛选，开销低的规则先执行
+    """
+
+    # 下载器类型
+    QBITTORRENT = "qbittorrent"
+    TRANSMISSION = "transmission"
+
+    def __init__(self, size: Optional[str] = None, ratio: Any = None, seeding_time: Any = None,
+                 upspeed: Any = None, pathkeywords: Optional[str] = None, trackerkeywords: Optional[str] = None,
+                 errorkeywords: Optional[str] = None, torrentstates: Optional[str] = None,
+                 torrentcategorys: Optional[str] = None):
+        """
+        :param size: 种子大小范围（GB），如 1-10
+        :param ratio: 分享率，大于该值才删除
+        :param seeding_time: 做种时间（小时），大于该值才删除
+        :param upspeed: 平均上传速度（KB/s），小于该值才删除
+        :param pathkeywords: 保存路径正则表达式
+        :param trackerkeywords: Tracker正则表达式
+        :param errorkeywords: 错误信息正则表达式（TR）
+        :param torrentstates: 任务状态（QB）
+        :param torrentcategorys: 任务分类（QB）
+        """
+        # [(规则名称, 列名, 判断函数)]，判断函数返回True表示保留该种子继续筛选
+        self._numeric_rules: List[Tuple[str, str, Callable[[float], bool]]] = []
+        # [(规则名称, 适用的下载器类型，None为全部, 判断函数)]，判断函数参数为种子及是否为QB
+        self._torrent_rules: List[Tuple[str, Optional[str], Callable[[Any, bool], bool]]] = []
+        self.__compile(size=size, ratio=ratio, seeding_time=seeding_time, upspeed=upspeed,
+                       pathkeywords=pathkeywords, trackerkeywords=trackerkeywords, errorkeywords=errorkeywords,
+                       torrentstates=torrentstates, torrentcategorys=torrentcategorys)
+
+    @property
+    def rule_names(self) -> List[str]:
+        return [name for name, _, _ in self._numeric_rules] + [name for name, _, _ in self._torrent_rules]
+
+    @staticmethod
+    def __compile_pattern(pattern: str) -> Optional[re.Pattern]:
+        """
+        预编译正则表达式，表达式无效时返回None
+        """
+        try:
+            return re.compile(pattern, re.I)
+        except re.error as e:
+            logger.error(f"自动删种正则表达式 {pattern} 无效，错误详情: {e}")
+            return None
+
+    def __compile(self, size: Optional[str], ratio: Any, seeding_time: Any, upspeed: Any,
+                  pathkeywords: Optional[str], trackerkeywords: Optional[str], errorkeywords: Optional[str],
+                  torrentstates: Optional[str], torrentcategorys: Optional[str]):
+        """
+        编译规则，数值规则按列筛选，其余规则按开销从低到高排列
+        """
+        # 分享率
+        if ratio:
+            min_ratio = float(ratio)
+            self._numeric_rules.append(("分享率", "ratio", lambda value: value > min_ratio))
+        # 做种时间 单位：小时
+        if seeding_time:
+            min_seconds = float(seeding_time) * 3600
+            self._numeric_rules.append(("做种时间", "seeding_time", lambda value: value > min_seconds))
+        # 种子大小 单位：GB
+        if size:
+            sizes = size.split('-')
+            minsize = int(float(sizes[0]) * 1024 * 1024 * 1024)
+            maxsize = int(float(sizes[-1]) * 1024 * 1024 * 1024)
+            self._numeric_rules.append(("种子大小", "size", lambda value: minsize < value < maxsize))
+        # 平均上传速度 单位：KB/s
+        if upspeed:
+            max_speed = float(upspeed) * 1024
+            self._numeric_rules.append(("平均上传速度", "upload_avs", lambda value: value < max_speed))
+
+        # 任务状态、分类为字符串包含判断
+        if torrentstates:
+            self._torrent_rules.append(("任务状态", self.QBITTORRENT,
+                                        lambda torrent, _: torrent.state in torrentstates))
+        if torrentcategorys:
+            self._torrent_rules.append(("任务分类", self.QBITTORRENT,
+                                        lambda torrent, _: bool(torrent.category)
+                                        and torrent.category in torrentcategorys))
+        # 正则表达式无效时不删除任何种子
+        if pathkeywords:
+            path_pattern = self.__compile_pattern(pathkeywords)
+            self._torrent_rules.append(("保存路径", None,
+                                        lambda torrent, is_qb: bool(path_pattern)
+                                        and bool(path_pattern.search(
+                                            (torrent.save_path if is_qb else torrent.download_dir) or ""))))
+        if errorkeywords:
+            error_pattern = self.__compile_pattern(errorkeywords)
+            self._torrent_rules.append(("错误信息", self.TRANSMISSION,
+                                        lambda torrent, _: bool(error_pattern)
+                                        and bool(error_pattern.search(torrent.error_string or ""))))
+        # TR需遍历全部Tracker，放在最后
+        if trackerkeywords:
+            tracker_pattern = self.__compile_pattern(trackerkeywords)
+            self._torrent_rules.append(("Tracker", None,
+                                        lambda torrent, is_qb: bool(tracker_pattern)
+                                        and any(tracker_pattern.search(tracker or "")
+                                                for tracker in self.__get_trackers(torrent, is_qb))))
+
+    @staticmethod
+    def __get_trackers(torrent: Any, is_qb: bool) -> List[str]:
+        if is_qb:
+            return [torrent.tracker]
+        return [tracker.get("announce", "") for tracker in torrent.trackers or []]
+
+    @staticmethod
+    def snapshot(torrents: List[Any], is_qb: bool) -> Dict[str, List[float]]:
+        """
+        生成种子列表的列快照：分享率、做种时间（秒）、大小、平均上传速度
+        """
+        # 现在时间
+        date_now = int(time.time())
+        ratios, seeding_times, sizes, upload_avs = [], [], [], []
+        for torrent in torrents:
+            if is_qb:
+                # 完成时间
+                date_done = torrent.completion_on if torrent.completion_on > 0 else torrent.added_on
+                seeding_time = date_now - date_done if date_done else 0
+                size = torrent.size
+                uploaded = torrent.uploaded
+            else:
+                date_done = torrent.date_done or torrent.date_added
+                seeding_time = date_now - int(time.mktime(date_done.timetuple())) if date_done else 0
+                size = torrent.total_size
+                uploaded = torrent.ratio * torrent.total_size
+            ratios.append(torrent.ratio)
+            seeding_times.append(seeding_time)
+            sizes.append(size)
+            upload_avs.append(uploaded / seeding_time if seeding_time else 0)
+        return {
+            "ratio": ratios,
+            "seeding_time": seeding_times,
+            "size": sizes,
+            "upload_avs": upload_avs
+        }
+
+    def filter(self, torrents: List[Any], downloader_type: str) -> Tuple[List[Any], Dict[str, Any]]:
+        """
+        筛选符合删除条件的种子
+        :return: 符合条件的种子, 统计信息（检查数、命中数、各规则排除数、耗时）
+        """
+        start_time = time.perf_counter()
+        # 非QB的下载器均按TR处理
+        is_qb = downloader_type == self.QBITTORRENT
+        hits: Dict[str, int] = {}
+        indexes = list(range(len(torrents)))
+        if self._numeric_rules and indexes:
+            columns = self.snapshot(torrents, is_qb)
+            for name, column, rule in self._numeric_rules:
+                values = columns[column]
+                remains = [i for i in indexes if rule(values[i])]
+                hits[name] = len(indexes) - len(remains)
+                indexes = remains
+                if not indexes:
+                    break
+        matches = [torrents[i] for i in indexes]
+        for name, rule_type, rule in self._torrent_rules:
+            if not matches:
+                break
+            if rule_type and (rule_type == self.QBITTORRENT) != is_qb:
+                continue
+            remains = [torrent for torrent in matches if rule(torrent, is_qb)]
+            hits[name] = len(matches) - len(remains)
+            matches = remains
+        return matches, {
+            "checked": len(torrents),
+            "matched": len(matches),
+            "hits": hits,
+            "elapsed": round(time.perf_counter() - start_time, 4)
+        }
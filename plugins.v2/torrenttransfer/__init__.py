@@ -1,7 +1,9 @@
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime, timedelta
 from pathlib import Path
-from threading import Event
+from threading import Event, Lock
 from typing import Any, List, Dict, Tuple, Optional, Union
 
 import pytz
@@ -10,6 +12,7 @@ from apscheduler.triggers.cron import CronTrigger
 from bencode import bdecode, bencode
 from qbittorrentapi import TorrentDictionary
 
+from app import schemas
 from app.core.config import settings
 from app.helper.downloader import DownloaderHelper
 from app.helper.torrent import TorrentHelper
@@ -17,6 +20,8 @@ from app.log import logger
 from app.modules.qbittorrent import Qbittorrent
 from app.modules.transmission import Transmission
 from app.plugins import _PluginBase
+from app.plugins.torrenttransfer.fastresume_cache import FastresumeTrackerCache
+from app.plugins.torrenttransfer.transfer_state import TransferState
 from app.schemas import NotificationType, ServiceInfo
 from app.utils.string import StringUtils
 
@@ -29,7 +34,7 @@ class TorrentTransfer(_PluginBase):
     # 插件图标
     plugin_icon = "seed.png"
     # 插件版本
-    plugin_version = "1.10.2"
+    plugin_version = "1.12.2"
     # 插件作者
     plugin_author = "jxxghp"
     # 作者主页
@@ -67,8 +72,16 @@ class TorrentTransfer(_PluginBase):
     _add_torrent_tags = None
     _remainoldcat = False
     _remainoldtag = False
+    # 转移并发数
+    _transferworkers = 4
     # 退出事件
     _event = Event()
+    # 转移任务锁，同一时间只执行一个转移任务
+    _transfer_lock = Lock()
+    # 转移进度
+    _transfer_state: Optional[TransferState] = None
+    # fastresume文件Tracker缓存，重新加载配置时保留
+    _fastresume_cache = FastresumeTrackerCache()
     # 待检查种子清单
     _recheck_torrents = {}
     _is_recheck_running = False
@@ -102,10 +115,17 @@ class TorrentTransfer(_PluginBase):
             self._torrent_tags = self._add_torrent_tags.strip().split(",") if self._add_torrent_tags else []
             self._remainoldcat = config.get("remainoldcat")
             self._remainoldtag = config.get("remainoldtag")
+            try:
+                self._transferworkers = max(int(config.get("transferworkers") or 4), 1)
+            except ValueError:
+                self._transferworkers = 4
 
         # 停止现有任务
         self.stop_service()
 
+        # 转移进度
+        self._transfer_state = TransferState(self.get_data_path() / "transfer_state.db")
+
         # 启动定时任务 & 立即运行一次
         if self.get_state() or self._onlyonce:
             if not self.__validate_config():
@@ -131,6 +151,12 @@ class TorrentTransfer(_PluginBase):
                 self._onlyonce = False
                 config["onlyonce"] = self._onlyonce
                 self.update_config(config=config)
+            elif self._transfer_state.is_unfinished():
+                # 重启后继续上次中断的转移
+                logger.info(f"存在未完成的转移做种任务，继续转移")
+                self._scheduler.add_job(self.transfer, 'date',
+                                        run_date=datetime.now(tz=pytz.timezone(settings.TZ)) + timedelta(
+                                            seconds=3))
             # 启动服务
             if self._scheduler.get_jobs():
                 self._scheduler.print_jobs()
@@ -167,7 +193,23 @@ class TorrentTransfer(_PluginBase):
         pass
 
     def get_api(self) -> List[Dict[str, Any]]:
-        pass
+        """
+        获取插件API
+        [{
+            "path": "/xx",
+            "endpoint": self.xxx,
+            "methods": ["GET", "POST"],
+            "summary": "API说明"
+        }]
+        """
+        return [
+            {
+                "path": "/progress",
+                "endpoint": self.get_progress,
+                "methods": ["GET"],
+                "summary": "查询转移做种进度"
+            }
+        ]
 
     def get_service(self) -> List[Dict[str, Any]]:
         """
@@ -328,7 +370,7 @@ class TorrentTransfer(_PluginBase):
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
-                                    'md': 6
+                                    'md': 4
                                 },
                                 'content': [
                                     {
@@ -343,7 +385,7 @@ class TorrentTransfer(_PluginBase):
                                 'component': 'VCol',
                                 'props': {
                                     'cols': 12,
-                                    'md': 6
+                                    'md': 4
                                 },
                                 'content': [
                                     {
@@ -354,6 +396,22 @@ class TorrentTransfer(_PluginBase):
                                         }
                                     }
                                 ]
+                            }, {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'transferworkers',
+                                            'label': '转移并发数',
+                                            'placeholder': '同时处理的种子数，默认4'
+                                        }
+                                    }
+                                ]
                             }
                         ]
                     },
@@ -592,7 +650,8 @@ class TorrentTransfer(_PluginBase):
             "transferemptylabel": False,
             "add_torrent_tags": "已整理,转移做种",
             "remainoldcat": False,
-            "remainoldtag": False
+            "remainoldtag": False,
+            "transferworkers": 4
         }
 
     def get_page(self) -> List[dict]:
@@ -675,8 +734,24 @@ class TorrentTransfer(_PluginBase):
         """
         开始转移做种
         """
+        if not self._transfer_lock.acquire(blocking=False):
+            logger.info("转移做种任务正在执行中，跳过本次执行")
+            return
+        try:
+            self.__transfer()
+        finally:
+            self._transfer_lock.release()
+
+    def __transfer(self):
+        """
+        转移做种，一次性获取目的下载器种子判断是否已存在，种子文件解析及添加任务并发执行
+        """
         logger.info("开始转移做种任务 ...")
 
+        # 本次执行使用的转移进度存储，避免执行期间插件重新加载时被替换
+        transfer_state = self._transfer_state
+        if not transfer_state:
+            return
         if not self.__validate_config():
             return
 
@@ -768,162 +843,215 @@ class TorrentTransfer(_PluginBase):
 
         # 开始转移任务
         if trans_torrents:
+            # 存在相同配置下未完成的转移时继续上次进度，跳过已处理的种子
+            config_key = json.dumps([self._fromdownloader, self._todownloader, self._frompath, self._topath],
+                                    ensure_ascii=False)
+            if transfer_state.begin((torrent_item.get("hash") for torrent_item in trans_torrents),
+                                          config_key=config_key):
+                pending_hashes = transfer_state.get_pending()
+                trans_torrents = [torrent_item for torrent_item in trans_torrents
+                                  if torrent_item.get("hash") in pending_hashes]
+                logger.info(f"继续上次未完成的转移，剩余种子数：{len(trans_torrents)}")
             logger.info(f"需要转移的种子数：{len(trans_torrents)}")
-            # 记数
-            total = len(trans_torrents)
-            # 总成功数
-            success = 0
-            # 总失败数
-            fail = 0
-            # 跳过数
-            skip = 0
-            # 删除重复数
-            del_dup = 0
-
-            for torrent_item in trans_torrents:
-                # 检查种子文件是否存在
-                torrent_file = Path(self._fromtorrentpath) / f"{torrent_item.get('hash')}.torrent"
-                if not torrent_file.exists():
-                    logger.error(f"种子文件不存在：{torrent_file}")
-                    # 失败计数
-                    fail += 1
-                    continue
 
-                # 查询hash值是否已经在目的下载器中
-                torrent_info, _ = to_downloader.get_torrents(ids=[torrent_item.get('hash')])
-                if torrent_info:
+            # 一次性获取目的下载器中的全部种子，本地判断是否已存在
+            to_torrents, error_flag = to_downloader.get_torrents()
+            if error_flag:
+                logger.error(f"获取下载器 {to_service.name} 种子列表失败，下次继续转移")
+                return
+            to_hashes = {self.__get_hash(torrent, to_service.type) for torrent in to_torrents or []}
+            exist_hashes = [torrent_item.get("hash") for torrent_item in trans_torrents
+                            if torrent_item.get("hash") in to_hashes]
+            if exist_hashes:
+                if self._deleteduplicate:
                     # 删除重复的源种子，不能删除文件！
-                    if self._deleteduplicate:
-                        logger.info(f"删除重复的源下载器任务（不含文件）：{torrent_item.get('hash')} ...")
-                        to_downloader.delete_torrents(delete_file=False, ids=[torrent_item.get('hash')])
-                        del_dup += 1
-                    else:
-                        logger.info(f"{torrent_item.get('hash')} 已在目的下载器中，跳过 ...")
-                        # 跳过计数
-                        skip += 1
-                    continue
-
-                # 转换保存路径
-                download_dir = self.__convert_save_path(torrent_item.get('save_path'),
-                                                        self._frompath,
-                                                        self._topath)
-                if not download_dir:
-                    logger.error(f"转换保存路径失败：{torrent_item.get('save_path')}")
-                    # 失败计数
-                    fail += 1
-                    continue
-
-                # 如果源下载器是QB检查是否有Tracker，没有的话额外获取
-                if self.downloader_helper.is_downloader("qbittorrent", service=from_service):
-                    # 读取种子内容、解析种子文件
-                    content = torrent_file.read_bytes()
-                    if not content:
-                        logger.warn(f"读取种子文件失败：{torrent_file}")
-                        fail += 1
-                        continue
-                    # 读取trackers
-                    try:
-                        torrent_main = bdecode(content)
-                        main_announce = torrent_main.get('announce')
-                    except Exception as err:
-                        logger.warn(f"解析种子文件 {torrent_file} 失败：{str(err)}")
-                        fail += 1
-                        continue
-
-                    if not main_announce:
-                        logger.info(f"{torrent_item.get('hash')} 未发现tracker信息，尝试补充tracker信息...")
-                        # 读取fastresume文件
-                        fastresume_file = Path(self._fromtorrentpath) / f"{torrent_item.get('hash')}.fastresume"
-                        if not fastresume_file.exists():
-                            logger.warn(f"fastresume文件不存在：{fastresume_file}")
-                            fail += 1
-                            continue
-                        # 尝试补充trackers
+                    for torrent_hash in exist_hashes:
+                        logger.info(f"删除重复的源下载器任务（不含文件）：{torrent_hash} ...")
+                    from_downloader.delete_torrents(delete_file=False, ids=exist_hashes)
+                    exist_status = TransferState.DEL_DUP
+                else:
+                    for torrent_hash in exist_hashes:
+                        logger.info(f"{torrent_hash} 已在目的下载器中，跳过 ...")
+                    exist_status = TransferState.SKIP
+                for torrent_hash in exist_hashes:
+                    transfer_state.mark(torrent_hash, exist_status)
+                trans_torrents = [torrent_item for torrent_item in trans_torrents
+                                  if torrent_item.get("hash") not in to_hashes]
+
+            # 并发处理种子，限制同时提交的任务数量
+            success = 0
+            with ThreadPoolExecutor(max_workers=self._transferworkers,
+                                    thread_name_prefix="TorrentTransfer") as executor:
+                futures = {}
+                torrent_items = iter(trans_torrents)
+                while True:
+                    while not self._event.is_set() and len(futures) < self._transferworkers * 2:
+                        torrent_item = next(torrent_items, None)
+                        if not torrent_item:
+                            break
+                        futures[executor.submit(self.__transfer_torrent,
+                                                torrent_item, from_service, to_service)] = torrent_item
+                    if not futures:
+                        break
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        torrent_item = futures.pop(future)
                         try:
-                            # 解析fastresume文件
-                            fastresume = fastresume_file.read_bytes()
-                            torrent_fastresume = bdecode(fastresume)
-                            # 读取trackers
-                            fastresume_trackers = torrent_fastresume.get('trackers')
-                            if isinstance(fastresume_trackers, list) \
-                                    and len(fastresume_trackers) > 0 \
-                                    and fastresume_trackers[0]:
-                                # 重新赋值
-                                torrent_main['announce'] = fastresume_trackers[0][0]
-                                # 保留其他tracker，避免单一tracker无法连接
-                                if len(fastresume_trackers) > 1 or len(fastresume_trackers[0]) > 1:
-                                    torrent_main['announce-list'] = fastresume_trackers
-                                # 替换种子文件路径
-                                torrent_file = settings.TEMP_PATH / f"{torrent_item.get('hash')}.torrent"
-                                # 编码并保存到临时文件
-                                torrent_file.write_bytes(bencode(torrent_main))
+                            status, download_id, need_recheck = future.result()
                         except Exception as err:
-                            logger.error(f"解析fastresume文件 {fastresume_file} 出错：{str(err)}")
-                            fail += 1
+                            logger.error(f"转移种子 {torrent_item.get('hash')} 出错：{str(err)}")
+                            status, download_id, need_recheck = TransferState.FAIL, None, False
+                        transfer_state.mark(torrent_item.get("hash"), status)
+                        if status != TransferState.SUCCESS:
                             continue
-
-                # 发送到另一个下载器中下载：默认暂停、传输下载路径、关闭自动管理模式
-                logger.info(f"添加转移做种任务到下载器 {to_service.name}：{torrent_file}")
-                download_id = self.__download(service=to_service,
-                                              content=torrent_file.read_bytes(),
-                                              save_path=download_dir,
-                                              torrent=torrent_item.get('torrent'))
-                if not download_id:
-                    # 下载失败
-                    fail += 1
-                    logger.error(f"添加下载任务失败：{torrent_file}")
-                    continue
-                else:
-                    # 下载成功
-                    logger.info(f"成功添加转移做种任务，种子文件：{torrent_file}")
-
-                    # TR会自动校验，QB需要手动校验
-                    if self.downloader_helper.is_downloader("qbittorrent", service=to_service):
-                        if self._skipverify:
-                            if self._autostart:
-                                logger.info(f"{download_id} 跳过校验，开启自动开始，注意观察种子的完整性")
-                                self.__add_recheck_torrents(to_service, download_id)
-                            else:
-                                # 跳过校验
-                                logger.info(f"{download_id} 跳过校验，请自行检查手动开始任务...")
-                        else:
-                            logger.info(f"qbittorrent 开始校验 {download_id} ...")
-                            to_downloader.recheck_torrents(ids=[download_id])
+                        success += 1
+                        if need_recheck:
                             self.__add_recheck_torrents(to_service, download_id)
-                    else:
-                        self.__add_recheck_torrents(to_service, download_id)
-
-                    # 删除源种子，不能删除文件！
-                    if self._deletesource:
-                        logger.info(f"删除源下载器任务（不含文件）：{torrent_item.get('hash')} ...")
-                        from_downloader.delete_torrents(delete_file=False, ids=[torrent_item.get('hash')])
-
-                    # 成功计数
-                    success += 1
-                    # 插入转种记录
-                    history_key = f"{from_service.name}-{torrent_item.get('hash')}"
-                    self.save_data(key=history_key,
-                                   value={
-                                       "to_download": to_service.name,
-                                       "to_download_id": download_id,
-                                       "delete_source": self._deletesource,
-                                       "delete_duplicate": self._deleteduplicate,
-                                   })
+                        # 插入转种记录
+                        history_key = f"{from_service.name}-{torrent_item.get('hash')}"
+                        self.save_data(key=history_key,
+                                       value={
+                                           "to_download": to_service.name,
+                                           "to_download_id": download_id,
+                                           "delete_source": self._deletesource,
+                                           "delete_duplicate": self._deleteduplicate,
+                                       })
+
+            if self._event.is_set():
+                logger.info(f"转移服务停止，下次执行时继续转移")
+                return
+
             # 触发校验任务
             if success > 0 and self._autostart:
                 self.check_recheck()
 
+            # 本轮转移完成，统计包含中断前已处理的种子
+            progress = transfer_state.get_progress()
+            transfer_state.finish()
             # 发送通知
             if self._notify:
                 self.post_message(
                     mtype=NotificationType.SiteMessage,
                     title="【转移做种任务执行完成】",
-                    text=f"总数：{total}，成功：{success}，失败：{fail}，跳过：{skip}，删除重复：{del_dup}"
+                    text=f"总数：{progress.get('total')}，成功：{progress.get('success')}，"
+                         f"失败：{progress.get('fail')}，跳过：{progress.get('skip')}，"
+                         f"删除重复：{progress.get('del_dup')}"
                 )
         else:
             logger.info(f"没有需要转移的种子")
+            if transfer_state.is_unfinished():
+                transfer_state.finish()
         logger.info("转移做种任务执行完成")
 
+    def __transfer_torrent(self, torrent_item: dict, from_service: ServiceInfo,
+                           to_service: ServiceInfo) -> Tuple[str, Optional[str], bool]:
+        """
+        转移单个种子，在线程池中执行
+        :return: 处理状态, 目的下载器任务ID, 是否需要加入校验检查
+        """
+        from_downloader: Union[Qbittorrent, Transmission] = from_service.instance
+        to_downloader: Union[Qbittorrent, Transmission] = to_service.instance
+        # 检查种子文件是否存在
+        torrent_file = Path(self._fromtorrentpath) / f"{torrent_item.get('hash')}.torrent"
+        if not torrent_file.exists():
+            logger.error(f"种子文件不存在：{torrent_file}")
+            return TransferState.FAIL, None, False
+
+        # 转换保存路径
+        download_dir = self.__convert_save_path(torrent_item.get('save_path'),
+                                                self._frompath,
+                                                self._topath)
+        if not download_dir:
+            logger.error(f"转换保存路径失败：{torrent_item.get('save_path')}")
+            return TransferState.FAIL, None, False
+
+        # 读取种子内容
+        content = torrent_file.read_bytes()
+        # 如果源下载器是QB检查是否有Tracker，没有的话额外获取
+        if self.downloader_helper.is_downloader("qbittorrent", service=from_service):
+            # 解析种子文件
+            if not content:
+                logger.warn(f"读取种子文件失败：{torrent_file}")
+                return TransferState.FAIL, None, False
+            # 读取trackers
+            try:
+                torrent_main = bdecode(content)
+                main_announce = torrent_main.get('announce')
+            except Exception as err:
+                logger.warn(f"解析种子文件 {torrent_file} 失败：{str(err)}")
+                return TransferState.FAIL, None, False
+
+            if not main_announce:
+                logger.info(f"{torrent_item.get('hash')} 未发现tracker信息，尝试补充tracker信息...")
+                # 读取fastresume文件
+                fastresume_file = Path(self._fromtorrentpath) / f"{torrent_item.get('hash')}.fastresume"
+                if not fastresume_file.exists():
+                    logger.warn(f"fastresume文件不存在：{fastresume_file}")
+                    return TransferState.FAIL, None, False
+                # 尝试补充trackers
+                try:
+                    # 读取trackers，文件未变化时使用上次解析的结果
+                    fastresume_trackers = self._fastresume_cache.get_trackers(fastresume_file)
+                    if fastresume_trackers:
+                        # 重新赋值
+                        torrent_main['announce'] = fastresume_trackers[0][0]
+                        # 保留其他tracker，避免单一tracker无法连接
+                        if len(fastresume_trackers) > 1 or len(fastresume_trackers[0]) > 1:
+                            torrent_main['announce-list'] = fastresume_trackers
+                        # 在内存中重新编码，直接发送到目的下载器
+                        content = bencode(torrent_main)
+                except Exception as err:
+                    logger.error(f"解析fastresume文件 {fastresume_file} 出错：{str(err)}")
+                    return TransferState.FAIL, None, False
+
+        # 发送到另一个下载器中下载：默认暂停、传输下载路径、关闭自动管理模式
+        logger.info(f"添加转移做种任务到下载器 {to_service.name}：{torrent_file}")
+        download_id = self.__download(service=to_service,
+                                      content=content,
+                                      save_path=download_dir,
+                                      torrent=torrent_item.get('torrent'))
+        if not download_id:
+            # 下载失败
+            logger.error(f"添加下载任务失败：{torrent_file}")
+            return TransferState.FAIL, None, False
+
+        # 下载成功
+        logger.info(f"成功添加转移做种任务，种子文件：{torrent_file}")
+
+        # TR会自动校验，QB需要手动校验
+        need_recheck = True
+        if self.downloader_helper.is_downloader("qbittorrent", service=to_service):
+            if self._skipverify:
+                if self._autostart:
+                    logger.info(f"{download_id} 跳过校验，开启自动开始，注意观察种子的完整性")
+                else:
+                    # 跳过校验
+                    logger.info(f"{download_id} 跳过校验，请自行检查手动开始任务...")
+                    need_recheck = False
+            else:
+                logger.info(f"qbittorrent 开始校验 {download_id} ...")
+                to_downloader.recheck_torrents(ids=[download_id])
+
+        # 删除源种子，不能删除文件！
+        if self._deletesource:
+            logger.info(f"删除源下载器任务（不含文件）：{torrent_item.get('hash')} ...")
+            from_downloader.delete_torrents(delete_file=False, ids=[torrent_item.get('hash')])
+
+        return TransferState.SUCCESS, download_id, need_recheck
+
+    def get_progress(self, apikey: str) -> schemas.Response:
+        """
+        查询转移做种进度，可由API调用
+        """
+        if apikey != settings.API_TOKEN:
+            return schemas.Response(success=False, message="API密钥错误")
+        if not self._transfer_state:
+            return schemas.Response(success=False, message="插件未初始化")
+        progress = self._transfer_state.get_progress()
+        # 当前是否正在执行
+        progress["active"] = self._transfer_lock.locked()
+        return schemas.Response(success=True, data=progress)
+
     def __add_recheck_torrents(self, service: ServiceInfo, download_id: str):
         # 追加校验任务
         logger.info(f"添加校验检查任务：{download_id} ...")
@@ -1074,12 +1202,24 @@ class TorrentTransfer(_PluginBase):
         退出插件
         """
         try:
+            # 转移任务也可能由公共服务调度执行，总是通知其停止
+            self._event.set()
             if self._scheduler:
                 self._scheduler.remove_all_jobs()
                 if self._scheduler.running:
-                    self._event.set()
                     self._scheduler.shutdown()
-                    self._event.clear()
                 self._scheduler = None
+            if self._transfer_state:
+                # 等待执行中的转移处理完已提交的种子后再关闭进度存储，超时则交由执行中的任务继续使用
+                if self._transfer_lock.acquire(timeout=60):
+                    try:
+                        self._transfer_state.close()
+                    finally:
+                        self._transfer_lock.release()
+                else:
+                    logger.warning("转移做种任务仍在执行中，暂不关闭转移进度存储")
+                self._transfer_state = None
         except Exception as e:
             print(str(e))
+        finally:
+            self._event.clear()
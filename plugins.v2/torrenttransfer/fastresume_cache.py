@@ -0,0 +1,46 @@
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from bencode import bdecode
+
+
+class FastresumeTrackerCache(object):
+    """
+    fastresume文件Tracker缓存，文件未变化（修改时间及大小相同）时直接返回上次解析的Tracker列表
+    """
+
+    def __init__(self, max_size: int = 50000):
+        """
+        :param max_size: 最大缓存文件数，超过后清空重新缓存
+        """
+        self._lock = threading.Lock()
+        self._max_size = max_size
+        # 文件路径 -> (修改时间, 文件大小, Tracker列表)
+        self._caches: Dict[str, Tuple[int, int, Optional[List[List[str]]]]] = {}
+
+    def get_trackers(self, fastresume_file: Path) -> Optional[List[List[str]]]:
+        """
+        获取fastresume文件中的Tracker分层列表，文件中没有有效Tracker时返回None
+        """
+        stat = fastresume_file.stat()
+        key = str(fastresume_file)
+        with self._lock:
+            cache = self._caches.get(key)
+        if cache and cache[0] == stat.st_mtime_ns and cache[1] == stat.st_size:
+            return cache[2]
+        # 解析fastresume文件
+        fastresume_trackers = bdecode(fastresume_file.read_bytes()).get('trackers')
+        if not isinstance(fastresume_trackers, list) \
+                or len(fastresume_trackers) == 0 \
+                or not fastresume_trackers[0]:
+            fastresume_trackers = None
+        with self._lock:
+            if len(self._caches) >= self._max_size:
+                self._caches.clear()
+            self._caches[key] = (stat.st_mtime_ns, stat.st_size, fastresume_trackers)
+        return fastresume_trackers
+
+    def clear(self):
+        with self._lock:
+            self._caches.clear()
@@ -0,0 +1,125 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+
+class TransferState(object):
+    """
+    转移进度，记录本轮转移每个种子的处理结果，中断后下次执行时跳过已处理的种子
+    """
+
+    # 种子处理状态
+    PENDING = "pending"
+    SUCCESS = "success"
+    FAIL = "fail"
+    SKIP = "skip"
+    DEL_DUP = "del_dup"
+
+    def __init__(self, db_path: Path):
+        self._lock = threading.Lock()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS transfer_state (
+                    hash TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    updated REAL
+                );
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+
+    def __get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def __set_meta(self, key: str, value: str):
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def is_unfinished(self) -> bool:
+        """
+        是否存在未完成的转移
+        """
+        with self._lock:
+            return self.__get_meta("running") == "1"
+
+    def begin(self, hashes: Iterable[str], config_key: str) -> bool:
+        """
+        开始转移，存在相同配置下未完成的转移时继续上次进度，只追加新的种子
+        :param hashes: 本轮需要转移的种子
+        :param config_key: 转移配置标识（源、目的下载器及路径），与上次不同时重新开始
+        :return: 是否为继续上次进度
+        """
+        now = time.time()
+        rows = [(torrent_hash, self.PENDING, now) for torrent_hash in hashes]
+        with self._lock, self._conn:
+            resumed = self.__get_meta("running") == "1" and self.__get_meta("config") == config_key
+            if not resumed:
+                self._conn.execute("DELETE FROM transfer_state")
+                self.__set_meta("started", str(now))
+                self.__set_meta("config", config_key)
+            self._conn.executemany("INSERT OR IGNORE INTO transfer_state (hash, status, updated) VALUES (?, ?, ?)",
+                                   rows)
+            self.__set_meta("running", "1")
+        return resumed
+
+    def get_pending(self) -> Set[str]:
+        """
+        获取本轮尚未处理的种子
+        """
+        with self._lock:
+            cursor = self._conn.execute("SELECT hash FROM transfer_state WHERE status = ?", (self.PENDING,))
+            return {row[0] for row in cursor}
+
+    def mark(self, torrent_hash: str, status: str):
+        """
+        记录种子处理结果
+        """
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE transfer_state SET status = ?, updated = ? WHERE hash = ?",
+                               (status, time.time(), torrent_hash))
+
+    def finish(self):
+        """
+        本轮转移完成
+        """
+        with self._lock, self._conn:
+            self.__set_meta("running", "0")
+            self.__set_meta("finished", str(time.time()))
+
+    def get_progress(self) -> Dict[str, Optional[float]]:
+        """
+        获取本轮转移进度
+        """
+        with self._lock:
+            counts = {status: count for status, count in
+                      self._conn.execute("SELECT status, COUNT(*) FROM transfer_state GROUP BY status")}
+            running = self.__get_meta("running") == "1"
+            started = self.__get_meta("started")
+            finished = self.__get_meta("finished")
+        total = sum(counts.values())
+        return {
+            "running": running,
+            "total": total,
+            "done": total - counts.get(self.PENDING, 0),
+            "pending": counts.get(self.PENDING, 0),
+            "success": counts.get(self.SUCCESS, 0),
+            "fail": counts.get(self.FAIL, 0),
+            "skip": counts.get(self.SKIP, 0),
+            "del_dup": counts.get(self.DEL_DUP, 0),
+            "started": float(started) if started else None,
+            "finished": float(finished) if finished and not running else None
+        }
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
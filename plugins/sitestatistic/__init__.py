@@ -1,4 +1,3 @@
-import json
 import re
 import warnings
 from datetime import datetime, timedelta
@@ -25,7 +24,6 @@ from app.plugins import _PluginBase
 from app.plugins.sitestatistic.siteuserinfo import ISiteUserInfo
 from app.schemas.types import EventType, NotificationType
 from app.utils.http import RequestUtils
-from app.utils.object import ObjectUtils
 from app.utils.string import StringUtils
 from app.utils.timer import TimerUtils
 
@@ -42,7 +40,7 @@ class SiteStatistic(_PluginBase):
     # 插件图标
     plugin_icon = "statistic.png"
     # 插件版本
-    plugin_version = "4.0.1"
+    plugin_version = "4.2.2"
     # 插件作者
     plugin_author = "lightolly"
     # 作者主页
@@ -61,6 +59,10 @@ class SiteStatistic(_PluginBase):
     _last_update_time: Optional[datetime] = None
     _sites_data: dict = {}
     _site_schema: List[ISiteUserInfo] = None
+    # 最近两天的站点数据缓存，刷新站点数据后失效
+    _latest_data: Optional[Tuple[str, dict, dict]] = None
+    # 站点数据快照日期索引的数据Key
+    _snapshot_dates_key: str = "snapshot_dates"
 
     # 配置属性
     _enabled: bool = False
@@ -73,12 +75,15 @@ class SiteStatistic(_PluginBase):
     _statistic_type: str = None
     _statistic_sites: list = []
     _dashboard_type: str = "today"
+    # 保留每日快照的天数，更早的快照每月只保留最后一份，0为不压缩（默认）
+    _compact_days: int = 0
 
     def init_plugin(self, config: dict = None):
         self.sites = SitesHelper()
         self.siteoper = SiteOper()
         # 停止现有任务
         self.stop_service()
+        self._latest_data = None
 
         # 配置
         if config:
@@ -92,6 +97,10 @@ class SiteStatistic(_PluginBase):
             self._statistic_type = config.get("statistic_type") or "all"
             self._statistic_sites = config.get("statistic_sites") or []
             self._dashboard_type = config.get("dashboard_type") or "today"
+            try:
+                self._compact_days = max(int(config.get("compact_days") or 0), 0)
+            except (ValueError, TypeError):
+                self._compact_days = 0
 
             # 过滤掉已删除的站点
             all_sites = [site.id for site in self.siteoper.list_order_by_pri()] + [site.get("id") for site in
@@ -410,6 +419,23 @@ class SiteStatistic(_PluginBase):
                                     }
                                 ]
                             },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 4
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'compact_days',
+                                            'label': '每日数据保留天数',
+                                            'placeholder': '更早的数据每月只保留一份，留空或0为不压缩'
+                                        }
+                                    }
+                                ]
+                            },
                         ]
                     }
                 ]
@@ -424,39 +450,93 @@ class SiteStatistic(_PluginBase):
             "remove_failed": False,
             "statistic_type": "all",
             "statistic_sites": [],
-            "dashboard_type": 'today'
+            "dashboard_type": 'today',
+            "compact_days": 0
         }
 
     def __get_data(self) -> Tuple[str, dict, dict]:
         """
         获取今天的日期、今天的站点数据、昨天的站点数据
         """
-        # 最近一天的签到数据
-        stattistic_data: Dict[str, Dict[str, Any]] = {}
-        # 昨天数据
-        yesterday_sites_data: Dict[str, Dict[str, Any]] = {}
-        # 获取最近所有数据
-        data_list: List[PluginData] = self.get_data(key=None)
-        if not data_list:
+        if self._latest_data is not None:
+            return self._latest_data
+        # 最近两天的数据，按时间降序排序
+        snapshots = self.__get_latest_snapshots(count=2)
+        if not snapshots:
             return "", {}, {}
-        # 取key符合日期格式的数据
-        data_list = [data for data in data_list if re.match(r"\d{4}-\d{2}-\d{2}", data.key)]
-        # 按日期倒序排序
-        data_list.sort(key=lambda x: x.key, reverse=True)
-        # 今天的日期
-        today = data_list[0].key
-        # 数据按时间降序排序
-        datas = [json.loads(data.value) for data in data_list if ObjectUtils.is_obj(data.value)]
-        if len(data_list) > 0:
-            stattistic_data = datas[0]
-        if len(data_list) > 1:
-            yesterday_sites_data = datas[1]
+        # 今天的日期及数据
+        today, stattistic_data = snapshots[0]
+        # 昨天数据
+        yesterday_sites_data = snapshots[1][1] if len(snapshots) > 1 else {}
 
         # 数据按时间降序排序
         stattistic_data = dict(sorted(stattistic_data.items(),
                                       key=lambda item: item[1].get('upload') or 0,
                                       reverse=True))
-        return today, stattistic_data, yesterday_sites_data
+        self._latest_data = (today, stattistic_data, yesterday_sites_data)
+        return self._latest_data
+
+    def __get_snapshot_dates(self) -> List[str]:
+        """
+        获取站点数据快照的日期（升序），索引不存在时从历史数据建立
+        """
+        dates = self.get_data(self._snapshot_dates_key)
+        if isinstance(dates, list):
+            return dates
+        data_list: List[PluginData] = self.get_data(key=None) or []
+        # 取key符合日期格式的数据
+        dates = sorted(data.key for data in data_list if re.match(r"\d{4}-\d{2}-\d{2}", data.key))
+        self.save_data(self._snapshot_dates_key, dates)
+        return dates
+
+    def __get_latest_snapshots(self, count: int) -> List[Tuple[str, dict]]:
+        """
+        按日期倒序获取最近的站点数据快照
+        """
+        snapshots = []
+        for date in reversed(self.__get_snapshot_dates()):
+            data = self.get_data(date)
+            if isinstance(data, dict):
+                snapshots.append((date, data))
+            if len(snapshots) >= count:
+                break
+        return snapshots
+
+    def __save_snapshot(self, date: str, sites_data: dict):
+        """
+        保存站点数据快照，更新日期索引并压缩历史快照
+        """
+        self.save_data(date, sites_data)
+        dates = self.__get_snapshot_dates()
+        if date not in dates:
+            dates = sorted(dates + [date])
+        dates = self.__compact_snapshots(dates)
+        self.save_data(self._snapshot_dates_key, dates)
+        self._latest_data = None
+
+    def __compact_snapshots(self, dates: List[str]) -> List[str]:
+        """
+        压缩历史快照，保留天数内的快照全部保留，更早的快照每月只保留最后一份，返回保留的日期
+        """
+        if not self._compact_days or self._compact_days <= 0:
+            return dates
+        boundary = (datetime.now() - timedelta(days=self._compact_days)).strftime('%Y-%m-%d')
+        # 每月最后一份快照
+        month_last = {}
+        for date in dates:
+            if date < boundary:
+                month_last[date[:7]] = date
+        keep_dates = []
+        removed = 0
+        for date in dates:
+            if date >= boundary or month_last.get(date[:7]) == date:
+                keep_dates.append(date)
+            else:
+                self.del_data(date)
+                removed += 1
+        if removed:
+            logger.info(f"已压缩 {removed} 份 {self._compact_days} 天前的站点数据快照")
+        return keep_dates
 
     @staticmethod
     def __get_total_elements(today: str, stattistic_data: dict, yesterday_sites_data: dict,
@@ -1443,7 +1523,7 @@ class SiteStatistic(_PluginBase):
                                       title="站点数据统计", text="\n".join(sorted_messages))
 
             # 保存数据
-            self.save_data(today_date, self._sites_data)
+            self.__save_snapshot(today_date, self._sites_data)
 
             # 更新时间
             self.save_data("last_update_time", today_date)
@@ -1472,7 +1552,8 @@ class SiteStatistic(_PluginBase):
             "remove_failed": self._remove_failed,
             "statistic_type": self._statistic_type,
             "statistic_sites": self._statistic_sites,
-            "dashboard_type": self._dashboard_type
+            "dashboard_type": self._dashboard_type,
+            "compact_days": self._compact_days
         })
 
     @eventmanager.register(EventType.SiteDeleted)
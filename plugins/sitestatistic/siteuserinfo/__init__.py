@@ -3,9 +3,10 @@ import json
 import re
 from abc import ABCMeta, abstractmethod
 from enum import Enum
-from typing import Optional
+from typing import Any, Callable, Dict, Optional
 from urllib.parse import urljoin, urlsplit
 
+from lxml import etree
 from requests import Session
 
 from app.core.config import settings
@@ -43,6 +44,8 @@ class ISiteUserInfo(metaclass=ABCMeta):
     order = SITE_BASE_ORDER
     # 请求模式 cookie/apikey
     request_mode = "cookie"
+    # 缓存的页面数量，当前页面的各解析步骤共享处理结果
+    _page_cache_size = 2
 
     def __init__(self, site_name: str,
                  url: str,
@@ -98,6 +101,10 @@ class ISiteUserInfo(metaclass=ABCMeta):
         self.err_msg = None
         # 内部数据
         self._addition_headers = None
+        # 页面内容 -> 处理干扰部分后的页面内容
+        self._prepared_texts: Dict[str, str] = {}
+        # 页面内容 -> 解析后的文档
+        self._html_docs: Dict[str, Any] = {}
 
         # 站点页面
         self._brief_page = "index.php"
@@ -151,45 +158,50 @@ class ISiteUserInfo(metaclass=ABCMeta):
         解析站点信息
         :return:
         """
-        # 检查是否已经登录
-        if not self._parse_logged_in(self._index_html):
-            return
-        # 解析站点页面
-        self._parse_site_page(self._index_html)
-        # 解析用户基础信息
-        if self._user_basic_page:
-            self._parse_user_base_info(
-                self._get_page_content(
-                    url=urljoin(self._base_url, self._user_basic_page),
-                    params=self._user_basic_params,
-                    headers=self._user_basic_headers
+        try:
+            # 检查是否已经登录
+            if not self._parse_logged_in(self._index_html):
+                return
+            # 解析站点页面
+            self._parse_site_page(self._index_html)
+            # 解析用户基础信息
+            if self._user_basic_page:
+                self._parse_user_base_info(
+                    self._get_page_content(
+                        url=urljoin(self._base_url, self._user_basic_page),
+                        params=self._user_basic_params,
+                        headers=self._user_basic_headers
+                    )
                 )
-            )
-        else:
-            self._parse_user_base_info(self._index_html)
-        # 解析用户详细信息
-        if self._user_detail_page:
-            self._parse_user_detail_info(
-                self._get_page_content(
-                    url=urljoin(self._base_url, self._user_detail_page),
-                    params=self._user_detail_params,
-                    headers=self._user_detail_headers
+            else:
+                self._parse_user_base_info(self._index_html)
+            # 解析用户详细信息
+            if self._user_detail_page:
+                self._parse_user_detail_info(
+                    self._get_page_content(
+                        url=urljoin(self._base_url, self._user_detail_page),
+                        params=self._user_detail_params,
+                        headers=self._user_detail_headers
+                    )
                 )
-            )
-        # 解析用户未读消息
-        self._pase_unread_msgs()
-        # 解析用户上传、下载、分享率等信息
-        if self._user_traffic_page:
-            self._parse_user_traffic_info(
-                self._get_page_content(
-                    url=urljoin(self._base_url, self._user_traffic_page),
-                    params=self._user_traffic_params,
-                    headers=self._user_traffic_headers
+            # 解析用户未读消息
+            self._pase_unread_msgs()
+            # 解析用户上传、下载、分享率等信息
+            if self._user_traffic_page:
+                self._parse_user_traffic_info(
+                    self._get_page_content(
+                        url=urljoin(self._base_url, self._user_traffic_page),
+                        params=self._user_traffic_params,
+                        headers=self._user_traffic_headers
+                    )
                 )
-            )
-        # 解析用户做种信息
-        self._parse_seeding_pages()
-        self.seeding_info = json.dumps(self.seeding_info)
+            # 解析用户做种信息
+            self._parse_seeding_pages()
+            self.seeding_info = json.dumps(self.seeding_info)
+        finally:
+            # 解析完成后释放页面缓存
+            self._prepared_texts.clear()
+            self._html_docs.clear()
 
     def _pase_unread_msgs(self):
         """
@@ -260,12 +272,35 @@ class ISiteUserInfo(metaclass=ABCMeta):
                     ),
                     multi_page=True)
 
-    @staticmethod
-    def _prepare_html_text(html_text):
+    def _prepare_html_text(self, html_text: str) -> str:
+        """
+        处理掉HTML中的干扰部分，同一页面只处理一次
+        """
+        return self.__get_cached(self._prepared_texts, html_text,
+                                 lambda text: re.sub(r"#\d+", "", re.sub(r"\d+px", "", text)))
+
+    def _get_html(self, html_text: str, prepare: bool = False) -> Any:
+        """
+        获取页面解析后的文档，同一页面只解析一次，各解析步骤共享，不可修改
+        :param html_text: 页面内容
+        :param prepare: 是否先处理掉HTML中的干扰部分
+        :return: etree.HTML 解析结果
+        """
+        if prepare:
+            html_text = self._prepare_html_text(html_text)
+        return self.__get_cached(self._html_docs, html_text, etree.HTML)
+
+    def __get_cached(self, cache: Dict[str, Any], html_text: str, func: Callable[[str], Any]) -> Any:
         """
-        处理掉HTML中的干扰部分
+        按页面内容缓存处理结果，超过缓存数量时丢弃最早的页面
         """
-        return re.sub(r"#\d+", "", re.sub(r"\d+px", "", html_text))
+        if html_text in cache:
+            return cache[html_text]
+        result = func(html_text)
+        if len(cache) >= self._page_cache_size:
+            cache.pop(next(iter(cache)))
+        cache[html_text] = result
+        return result
 
     @abstractmethod
     def _parse_message_unread_links(self, html_text: str, msg_links: list) -> Optional[str]:
@@ -2,8 +2,6 @@
 import re
 from typing import Optional
 
-from lxml import etree
-
 from app.log import logger
 from app.plugins.sitestatistic.siteuserinfo import ISiteUserInfo, SITE_BASE_ORDER, SiteSchema
 from app.utils.string import StringUtils
@@ -43,7 +41,7 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         :param html_text:
         :return:
         """
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return
 
@@ -70,7 +68,7 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
 
         self._parse_message_unread(html_text)
 
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return
 
@@ -107,7 +105,7 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         leeching_match = re.search(r"(Torrents leeching|下载中)[\u4E00-\u9FA5\D\s]+(\d+)[\s\S]+<", html_text)
         self.leeching = StringUtils.str_int(leeching_match.group(2)) if leeching_match and leeching_match.group(
             2).strip() else 0
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         has_ucoin, self.bonus = self._parse_ucoin(html)
         if has_ucoin:
             return
@@ -164,7 +162,7 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         :param multi_page: 是否多页数据
         :return: 下页地址
         """
-        html = etree.HTML(str(html_text).replace(r'\/', '/'))
+        html = self._get_html(str(html_text).replace(r'\/', '/'))
         if not html:
             return None
 
@@ -232,7 +230,7 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         :param html_text:
         :return:
         """
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return
 
@@ -355,7 +353,7 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
                     break
 
     def _parse_message_unread_links(self, html_text: str, msg_links: list) -> Optional[str]:
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return None
 
@@ -370,7 +368,7 @@ class NexusPhpSiteUserInfo(ISiteUserInfo):
         return next_page
 
     def _parse_message_content(self, html_text):
-        html = etree.HTML(html_text)
+        html = self._get_html(html_text)
         if not html:
             return None, None, None
         # 标题